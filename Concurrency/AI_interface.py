@@ -10,6 +10,7 @@ from Models.MuZero_torch_agent import MuZeroNetwork as TFTNetwork
 from Models.Muzero_default_agent import MuZeroDefaultNetwork as DefaultNetwork
 from Models.rllib_ppo import PPO_Models
 from Concurrency.data_worker import DataWorker
+from Concurrency.inference_server import InferenceServer
 from Concurrency.training_manager import TrainingManager
 from Concurrency.queue_storage import QueueStorage
 
@@ -23,6 +24,18 @@ class AIInterface:
     def __init__(self):
         ...
 
+    '''
+    Description - Creates the data workers. With config.INFERENCE_SERVER, the workers share the models of one
+                  InferenceServer and do not need a gpu of their own.
+    '''
+    @staticmethod
+    def create_data_workers():
+        if config.INFERENCE_SERVER:
+            inference_server = InferenceServer.remote()
+            return [DataWorker.options(num_gpus=0).remote(rank, inference_server)
+                    for rank in range(config.CONCURRENT_GAMES)]
+        return [DataWorker.remote(rank) for rank in range(config.CONCURRENT_GAMES)]
+
     '''
     Description - Global train model method. This is what gets called from main.
     Inputs - starting_train_step: int
@@ -34,7 +47,7 @@ class AIInterface:
             train_step = starting_train_step
 
             workers = []
-            data_workers = [DataWorker.remote(rank) for rank in range(config.CONCURRENT_GAMES)]
+            data_workers = self.create_data_workers()
             storage = Storage.remote(train_step)
             if config.CHAMP_DECIDER:
                 global_agent = DefaultNetwork()
@@ -45,7 +58,7 @@ class AIInterface:
             global_agent.set_weights(global_agent_weights)
             global_agent.to(config.DEVICE)
 
-            training_manager = TrainingManager(global_agent, storage)
+            training_manager = TrainingManager(global_agent, storage, resume=train_step > 0)
 
             # Keeping this line commented because this tells us the number of parameters that our current model has.
             # total_params = sum(p.numel() for p in global_agent.parameters())
@@ -74,7 +87,7 @@ class AIInterface:
             train_step = starting_train_step
 
             workers = []
-            data_workers = [DataWorker.remote(rank) for rank in range(config.CONCURRENT_GAMES)]
+            data_workers = self.create_data_workers()
             storage = Storage.remote(train_step)
             if config.CHAMP_DECIDER:
                 global_agent = DefaultNetwork()
@@ -85,7 +98,7 @@ class AIInterface:
             global_agent.set_weights(global_agent_weights)
             global_agent.to(config.DEVICE)
 
-            training_manager = TrainingManager(global_agent, storage)
+            training_manager = TrainingManager(global_agent, storage, resume=train_step > 0)
 
             # Keeping this line commented because this tells us the number of parameters that our current model has.
             # total_params = sum(p.numel() for p in global_agent.parameters())
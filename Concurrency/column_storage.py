@@ -0,0 +1,195 @@
+import os
+import numpy as np
+
+
+class ColumnStorage(object):
+    """
+    Fixed number of slots with one array per column, split into segments of segment_size slots.
+
+    With a directory, every column of every segment is a .npy file there, opened as a memory map, so the storage can
+    be much larger than memory. The last hot_segments segments that were written to are held in memory and written
+    to their files when another segment takes their place or on save. Writes go to the slots of the ring of the sum
+    tree, so the hot segments are the newest samples, which are also the ones most likely to be drawn.
+    save also writes a small index with the state the owner passes in. A storage opened with resume picks up the
+    files and the index of the last save again.
+    The files of a segment carry the number of the save they belong to. A segment written out after a save goes to
+    files of the next save, never over the ones the index names, so a run that stops between two saves resumes
+    from the last save as it was.
+
+    Without a directory every segment stays in memory and nothing is saved.
+
+    Args:
+        capacity (int): Number of slots.
+        columns (dict): name -> (shape of one slot, dtype).
+        directory (str): Where the files go, None to stay in memory.
+        segment_size (int): Slots per segment file.
+        hot_segments (int): Segments held in memory.
+        resume (bool): Open the files of an earlier run instead of starting empty.
+    """
+    def __init__(self, capacity, columns, directory=None, segment_size=4096, hot_segments=2, resume=False):
+        self.capacity = capacity
+        self.columns = columns
+        self.directory = directory
+        self.segment_size = min(segment_size, capacity)
+        self.num_segments = -(-capacity // self.segment_size)
+        self.hot_segments = hot_segments if directory else self.num_segments
+        # per segment the arrays in use, in memory when hot and the memory maps otherwise
+        self.segments = [None] * self.num_segments
+        # per segment the memory maps of its files, once it has some, and the save those files belong to
+        self.files = [None] * self.num_segments
+        self.file_generations = [-1] * self.num_segments
+        # the generations of the files the index names
+        self.saved_generations = [-1] * self.num_segments
+        # number of the last save, the files of the segments that the index names are at most this one
+        self.generation = 0
+        # hot segments, least recently written first
+        self.hot = []
+        self.index = None
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            if resume:
+                self.index = self.load()
+            if self.index is None:
+                # a new run, the index and files left behind are not needed anymore
+                if os.path.exists(self.index_path()):
+                    os.remove(self.index_path())
+                for file_name in os.listdir(directory):
+                    if file_name.endswith(".npy") and file_name.rsplit("_", 2)[0] in columns:
+                        os.remove(os.path.join(directory, file_name))
+                self.files = [None] * self.num_segments
+                self.file_generations = [-1] * self.num_segments
+                self.segments = [None] * self.num_segments
+
+    def segment_slots(self, segment):
+        return min(self.segment_size, self.capacity - segment * self.segment_size)
+
+    def file_path(self, name, segment, generation):
+        return os.path.join(self.directory, "{}_{}_{}.npy".format(name, segment, generation))
+
+    def index_path(self):
+        return os.path.join(self.directory, "index.npz")
+
+    '''
+    Description -
+        Rows of the column for the slots, in the order of the slots. slots can be of any shape, the rows are
+        slots.shape + the shape of the column.
+    '''
+    def get(self, name, slots):
+        slots = np.asarray(slots)
+        shape, dtype = self.columns[name]
+        rows = np.zeros(slots.shape + tuple(shape), dtype=dtype)
+        segments, offsets = np.divmod(slots, self.segment_size)
+        for segment in np.unique(segments):
+            if self.segments[segment] is not None:
+                in_segment = segments == segment
+                rows[in_segment] = self.segments[segment][name][offsets[in_segment]]
+        return rows
+
+    '''
+    Description -
+        Writes the rows into the column at the slots. The segments of the slots become hot.
+    '''
+    def set(self, name, slots, rows):
+        slots = np.asarray(slots)
+        rows = np.asarray(rows)
+        segments, offsets = np.divmod(slots, self.segment_size)
+        for segment in np.unique(segments).tolist():
+            self.make_hot(segment)
+            in_segment = segments == segment
+            self.segments[segment][name][offsets[in_segment]] = rows[in_segment]
+
+    def make_hot(self, segment):
+        if segment in self.hot:
+            self.hot.remove(segment)
+            self.hot.append(segment)
+            return
+        if len(self.hot) >= self.hot_segments:
+            self.spill(self.hot.pop(0))
+        if self.files[segment] is not None:
+            self.segments[segment] = {name: np.array(self.files[segment][name]) for name in self.columns}
+        else:
+            self.segments[segment] = {name: np.zeros((self.segment_slots(segment),) + tuple(shape), dtype=dtype)
+                                      for name, (shape, dtype) in self.columns.items()}
+        self.hot.append(segment)
+
+    '''
+    Description -
+        Writes a hot segment to its files and serves it from the memory maps from now on.
+    '''
+    def spill(self, segment):
+        self.write(segment)
+        self.segments[segment] = self.files[segment]
+
+    def write(self, segment):
+        # the files of the last save stay as they are, the segment gets new ones for the next save
+        if self.file_generations[segment] <= self.generation:
+            self.files[segment] = {
+                name: np.lib.format.open_memmap(self.file_path(name, segment, self.generation + 1), mode='w+',
+                                                dtype=dtype, shape=(self.segment_slots(segment),) + tuple(shape))
+                for name, (shape, dtype) in self.columns.items()}
+            self.file_generations[segment] = self.generation + 1
+        for name, memory_map in self.files[segment].items():
+            memory_map[:] = self.segments[segment][name]
+            memory_map.flush()
+
+    '''
+    Description -
+        Writes the hot segments to their files and the index next to them, then removes the files that no save
+        names anymore. The hot segments stay in memory.
+        This writes up to hot_segments whole segments and blocks the caller, the training loop, until it is done.
+        It can not run next to store or sample calls since those change the hot segments.
+    Inputs      -
+        index
+            dict of arrays the owner needs to pick up where it left off, given back by resume.
+    '''
+    def save(self, index):
+        if not self.directory:
+            return
+        for segment in self.hot:
+            self.write(segment)
+        # the index names the files of every segment, written last and in one step so it never points at
+        # files that are not there
+        temporary = os.path.join(self.directory, "index_tmp.npz")
+        np.savez(temporary, generations=np.array(self.file_generations, dtype=np.int64),
+                 layout=np.array([self.capacity, self.segment_size]), **index)
+        os.replace(temporary, self.index_path())
+        self.generation += 1
+        for segment, generation in enumerate(self.saved_generations):
+            if 0 <= generation != self.file_generations[segment]:
+                for name in self.columns:
+                    os.remove(self.file_path(name, segment, generation))
+        self.saved_generations = list(self.file_generations)
+
+    '''
+    Description -
+        Opens the files named in the index of the last save. Returns the index, or None when there is no index
+        or the files do not fit the columns.
+    '''
+    def load(self):
+        if not os.path.exists(self.index_path()):
+            return None
+        with np.load(self.index_path()) as saved:
+            index = {key: saved[key] for key in saved.files}
+        if index.pop("layout").tolist() != [self.capacity, self.segment_size]:
+            print("Replay buffer in {} has a different size, starting a new one".format(self.directory))
+            return None
+        generations = index.pop("generations").tolist()
+        for segment, generation in enumerate(generations):
+            if generation < 0:
+                continue
+            files = {}
+            for name, (shape, dtype) in self.columns.items():
+                path = self.file_path(name, segment, generation)
+                memory_map = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+                if memory_map is None or memory_map.shape != (self.segment_slots(segment),) + tuple(shape) \
+                        or memory_map.dtype != np.dtype(dtype):
+                    print("Replay buffer in {} does not fit the columns, starting a new one".format(self.directory))
+                    return None
+                files[name] = memory_map
+            self.files[segment] = files
+            self.file_generations[segment] = generation
+            self.segments[segment] = files
+        self.saved_generations = list(self.file_generations)
+        self.generation = max(generations)
+        return index
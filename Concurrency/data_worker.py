@@ -4,8 +4,10 @@ import ray
 import copy
 import numpy as np
 from Simulator import utils
+import Models.MCTS_Util as util
 from Models.MCTS_torch import MCTS
 from Models.MCTS_default_torch import Default_MCTS
+from Concurrency.inference_server import InferenceClient
 from Models.MuZero_torch_agent import MuZeroNetwork as TFTNetwork
 from Models.Muzero_default_agent import MuZeroDefaultNetwork as DefaultNetwork
 from Simulator.tft_item_simulator import TFT_Item_Simulator
@@ -19,16 +21,29 @@ Description -
 '''
 @ray.remote(num_gpus=config.GPU_SIZE_PER_WORKER)
 class DataWorker(object):
-    def __init__(self, rank):
-        if config.CHAMP_DECIDER:
+    def __init__(self, rank, inference_server=None):
+        if inference_server:
+            # The models live in the inference server, the worker talks to them through clients.
+            # The live model gets its version in set_live_weights
+            self.temp_model = InferenceClient(inference_server)
+            self.past_model = InferenceClient(inference_server, "past_{}".format(rank))
+        elif config.CHAMP_DECIDER:
             self.temp_model = DefaultNetwork()
+            self.past_model = self.temp_model
+        else:
+            self.temp_model = TFTNetwork()
+            self.past_model = self.temp_model
+
+        # the first GUMBEL_WORKERS workers search with Gumbel MuZero
+        self.gumbel = rank < config.GUMBEL_WORKERS
+
+        if config.CHAMP_DECIDER:
             self.agent_network = Default_MCTS(self.temp_model)
-            self.past_network = Default_MCTS(self.temp_model)
+            self.past_network = Default_MCTS(self.past_model)
             self.default_agent = [False for _ in range(config.NUM_PLAYERS)]
         else:
-            self.temp_model = TFTNetwork()
-            self.agent_network = MCTS(self.temp_model)
-            self.past_network = MCTS(self.temp_model)
+            self.agent_network = MCTS(self.temp_model, self.gumbel)
+            self.past_network = MCTS(self.past_model, self.gumbel)
             self.default_agent = [False for _ in range(config.NUM_PLAYERS)]
             # self.default_agent = [np.random.rand() < 0.5 for _ in range(config.NUM_PLAYERS)]
             # Ensure we have at least one model player and for testing
@@ -61,7 +76,7 @@ class DataWorker(object):
             Weights of the initial model for the agent to play the game with.
     '''
     def collect_gameplay_experience(self, env, buffers, global_buffer, storage, weights):
-        self.agent_network.network.set_weights(weights)
+        self.set_live_weights(weights, "initial")
         self.past_network.network.set_weights(weights)
         while True:
             # Reset the environment
@@ -85,8 +100,8 @@ class DataWorker(object):
             # While the game is still going on.
             while not all(terminated.values()):
                 # Ask our model for an action and policy. Use on normal case or if we only have current versions left
-                actions, policy, string_samples, root_values = self.model_call(player_observation, info)
-                storage_actions = utils.decode_action(actions)
+                actions, policy, sampled_actions, root_values = self.model_call(player_observation, info)
+                storage_actions = util.action_vectors(actions)
                 step_actions = self.getStepActions(terminated, storage_actions)
 
                 # Take that action within the environment and return all of our information for the next player
@@ -102,7 +117,7 @@ class DataWorker(object):
                             # Store the information in a buffer to train on later.
                             buffers.store_replay_buffer.remote(key, self.get_obs_idx(player_observation[0], i),
                                                                storage_actions[i], reward[key], policy[i],
-                                                               string_samples[i], root_values[i], current_comp[key],
+                                                               sampled_actions[i], root_values[i], current_comp[key],
                                                                current_champs[key])
 
                 offset = 0
@@ -135,7 +150,7 @@ class DataWorker(object):
             self.past_version = [False for _ in range(config.NUM_PLAYERS)]
             if not self.live_game:
                 [past_weights, self.past_episode, self.prob] = ray.get(storage.sample_past_model.remote())
-                self.past_network = MCTS(self.temp_model)
+                self.past_network = MCTS(self.past_model, self.gumbel)
                 self.past_network.network.set_weights(past_weights)
                 self.past_version[0:4] = [True, True, True, True]
                 self.past_update = False
@@ -155,10 +170,10 @@ class DataWorker(object):
             # So if I do not have a live game, I need to sample a past model
             # Which means I need to create a list within the storage and sample from that.
             # All the probability distributions will be within the storage class as well.
-            temp_weights = ray.get(storage.get_model.remote())
+            temp_weights, episode = ray.get(storage.get_model_and_episode.remote())
             weights = copy.deepcopy(temp_weights)
-            self.agent_network = MCTS(self.temp_model)
-            self.agent_network.network.set_weights(weights)
+            self.agent_network = MCTS(self.temp_model, self.gumbel)
+            self.set_live_weights(weights, episode)
             self.rank += config.CONCURRENT_GAMES
 
     '''
@@ -180,7 +195,7 @@ class DataWorker(object):
     '''
     def collect_default_experience(self, env, buffers, global_buffer, storage, weights,
                                    item_storage, positioning_storage):
-        self.agent_network.network.set_weights(weights)
+        self.set_live_weights(weights, "initial")
         while True:
             # Reset the environment
             player_observation, info = env.reset(options={"default_agent": self.default_agent})
@@ -207,8 +222,8 @@ class DataWorker(object):
                 if info_values[0]['start_turn']:
                     # Ask our model for an action and policy.
                     # Use on normal case or if we only have current versions left
-                    c_actions, policy, string_samples, root_values = self.agent_network.policy(player_observation[:2])
-                    storage_actions = utils.decode_action(c_actions)
+                    c_actions, policy, sampled_actions, root_values = self.agent_network.policy(player_observation[:2])
+                    storage_actions = util.action_vectors(c_actions)
                     step_actions = self.getStepActions(terminated, storage_actions)
                     for player_id in step_actions.keys():
                         info[player_id]['player'].default_guide(step_actions[player_id])
@@ -221,14 +236,14 @@ class DataWorker(object):
                         # Store the information in a buffer to train on later.
                         buffers.store_replay_buffer.remote(key, self.get_obs_idx(player_observation[0], i),
                                                            storage_actions[i], reward[key], policy[i],
-                                                           string_samples[i], root_values[i], current_comp[key],
+                                                           sampled_actions[i], root_values[i], current_comp[key],
                                                            current_champs[key])
 
                 actions = ["0"] * len(self.default_agent)
                 for i, _ in enumerate(self.default_agent):
                     actions[i] = info_values[i]["player"].default_policy(info_values[i]["game_round"],
                                                                          info_values[i]["shop"])
-                storage_actions = utils.decode_action(actions)
+                storage_actions = util.action_vectors(actions)
                 step_actions = self.getStepActions(terminated, storage_actions)
                 # Take that action within the environment and return all of our information for the next player
                 next_observation, reward, terminated, _, info = env.step(step_actions)
@@ -277,12 +292,29 @@ class DataWorker(object):
             buffers.reset_buffers.remote()
 
             # All the probability distributions will be within the storage class as well.
-            temp_weights = ray.get(storage.get_model.remote())
+            temp_weights, episode = ray.get(storage.get_model_and_episode.remote())
             weights = copy.deepcopy(temp_weights)
             self.agent_network = Default_MCTS(self.temp_model)
-            self.agent_network.network.set_weights(weights)
+            self.set_live_weights(weights, episode)
             self.rank += config.CONCURRENT_GAMES
 
+    '''
+    Description -
+        Gives the model of the live players new weights. With an inference server that model is shared by all of
+        the workers, so every version is kept under its own name there and the games of the other workers keep
+        playing with the version they started with.
+    Inputs
+        weights
+            Weights of the model.
+        version
+            Episode of the checkpoint the weights are from, "initial" for the weights the worker started with.
+    '''
+    def set_live_weights(self, weights, version):
+        if isinstance(self.temp_model, InferenceClient):
+            self.temp_model.use_version("live_{}".format(version), weights)
+        else:
+            self.temp_model.set_weights(weights)
+
 
     '''
     Description -
@@ -390,26 +422,26 @@ class DataWorker(object):
     """
     def model_call(self, player_observation, info):
         if config.IMITATION:
-            actions, policy, string_samples, root_values = self.imitation_learning(info)
+            actions, policy, sampled_actions, root_values = self.imitation_learning(info)
         # If all of our agents are current versions
         elif (self.live_game or not any(self.past_version)) and not any(self.default_agent):
-            actions, policy, string_samples, root_values = self.agent_network.policy(player_observation[:2])
+            actions, policy, sampled_actions, root_values = self.agent_network.policy(player_observation)
         # Ff all of our agents are past versions. (Should exceedingly rarely come here)
         elif all(self.past_version) and not any(self.default_agent):
-            actions, policy, string_samples, root_values = self.past_network.policy(player_observation[:2])
+            actions, policy, sampled_actions, root_values = self.past_network.policy(player_observation)
         # If all of our versions are default agents
         elif all(self.default_agent):
-            actions, policy, string_samples, root_values = self.default_model_call(info)
+            actions, policy, sampled_actions, root_values = self.default_model_call(info)
         # If there are no default agents but a mix of past and present
         elif not any(self.default_agent):
-            actions, policy, string_samples, root_values = self.mixed_ai_model_call(player_observation[:2])
+            actions, policy, sampled_actions, root_values = self.mixed_ai_model_call(player_observation)
         # Implement the remaining mixes of agents here.
         elif not any(self.past_version):
-            actions, policy, string_samples, root_values = self.live_default_model_call(player_observation[:2], info)
+            actions, policy, sampled_actions, root_values = self.live_default_model_call(player_observation[:2], info)
         # If we only have default_agents remaining.
         else:
-            actions, policy, string_samples, root_values = self.default_model_call(info)
-        return actions, policy, string_samples, root_values
+            actions, policy, sampled_actions, root_values = self.default_model_call(info)
+        return actions, policy, sampled_actions, root_values
 
     """
     Description - 
@@ -417,27 +449,27 @@ class DataWorker(object):
     """
     def mixed_ai_model_call(self, player_observation):
         live_observation, past_observation = self.split_live_past_observations(player_observation)
-        live_actions, live_policy, live_string_samples, live_root_values = self.agent_network.policy(live_observation)
-        past_actions, past_policy, past_string_samples, past_root_values = self.past_network.policy(past_observation)
+        live_actions, live_policy, live_sampled_actions, live_root_values = self.agent_network.policy(live_observation)
+        past_actions, past_policy, past_sampled_actions, past_root_values = self.past_network.policy(past_observation)
         actions = [None] * len(self.past_version)
         policy = [None] * len(self.past_version)
-        string_samples = [None] * len(self.past_version)
+        sampled_actions = [None] * len(self.past_version)
         root_values = [None] * len(self.past_version)
         counter_live, counter_past = 0, 0
         for i, past_version in enumerate(self.past_version):
             if past_version:
                 actions[i] = past_actions[counter_past]
                 policy[i] = past_policy[counter_past]
-                string_samples[i] = past_string_samples[counter_past]
+                sampled_actions[i] = past_sampled_actions[counter_past]
                 root_values[i] = past_root_values[counter_past]
                 counter_past += 1
             else:
                 actions[i] = live_actions[counter_live]
                 policy[i] = live_policy[counter_live]
-                string_samples[i] = live_string_samples[counter_live]
+                sampled_actions[i] = live_sampled_actions[counter_live]
                 root_values[i] = live_root_values[counter_live]
                 counter_live += 1
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     def split_live_past_observations(self, player_observation):
         live_agent_observations = {
@@ -458,6 +490,9 @@ class DataWorker(object):
         }
         live_agent_masks = []
         past_agent_masks = []
+        # the keys of the players, so that MCTS knows whose tree it can reuse
+        live_agent_keys = []
+        past_agent_keys = []
 
         for i, past_version in enumerate(self.past_version):
             local_obs = self.get_obs_idx(player_observation[0], i)
@@ -466,10 +501,12 @@ class DataWorker(object):
                 for key in live_agent_observations.keys():
                     live_agent_observations[key].append(local_obs[key])
                 live_agent_masks.append(local_mask)
+                live_agent_keys.append(player_observation[2][i])
             else:
                 for key in past_agent_observations.keys():
                     past_agent_observations[key].append(local_obs[key])
                 past_agent_masks.append(local_mask)
+                past_agent_keys.append(player_observation[2][i])
 
         for key in live_agent_observations.keys():
             live_agent_observations[key] = np.asarray(live_agent_observations[key])
@@ -477,8 +514,8 @@ class DataWorker(object):
         for key in past_agent_observations.keys():
             past_agent_observations[key] = np.asarray(past_agent_observations[key])
 
-        live_observation = [live_agent_observations, live_agent_masks]
-        past_observation = [past_agent_observations, past_agent_masks]
+        live_observation = [live_agent_observations, live_agent_masks, live_agent_keys]
+        past_observation = [past_agent_observations, past_agent_masks, past_agent_keys]
         return live_observation, past_observation
 
     """
@@ -488,7 +525,7 @@ class DataWorker(object):
     def live_default_model_call(self, player_observation, info):
         actions = ["0"] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [0] * len(self.default_agent)
 
         live_agent_observations = []
@@ -501,7 +538,7 @@ class DataWorker(object):
 
         live_observation = [live_agent_observations, live_agent_masks]
         if len(live_observation[0]) != 0:
-            live_actions, live_policy, live_string_samples, live_root_values = \
+            live_actions, live_policy, live_sampled_actions, live_root_values = \
                 self.agent_network.policy(live_observation)
 
             counter_live, counter_default = 0, 0
@@ -514,7 +551,7 @@ class DataWorker(object):
                 else:
                     actions[i] = live_actions[counter_live]
                     policy[i] = live_policy[counter_live]
-                    string_samples[i] = live_string_samples[counter_live]
+                    sampled_actions[i] = live_sampled_actions[counter_live]
                     root_values[i] = live_root_values[counter_live]
                     counter_live += 1
         else:
@@ -527,7 +564,7 @@ class DataWorker(object):
                                                                         local_info[i]["shop"])
                     # Turn action into one hot policy
                     counter_default += 1
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     """
     Description - 
@@ -536,9 +573,9 @@ class DataWorker(object):
     def past_default_model_call(self, info):
         actions = [None] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [None] * len(self.default_agent)
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     """
     Description - 
@@ -547,9 +584,9 @@ class DataWorker(object):
     def live_past_default_model_call(self, info):
         actions = [None] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [None] * len(self.default_agent)
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     """
     Description - 
@@ -558,13 +595,13 @@ class DataWorker(object):
     def default_model_call(self, info):
         actions = ["0"] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [1] * len(self.default_agent)
         local_info = list(info.values())
         for i, default_agent in enumerate(self.default_agent):
             if default_agent:
                 actions[i] = local_info[i]["player"].default_policy(local_info[i]["game_round"], local_info[i]["shop"])
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     """
     Description - 
@@ -572,16 +609,16 @@ class DataWorker(object):
     """
     def imitation_learning(self, info):
         policy = [[1.0] for _ in range(len(self.default_agent))]
-        string_samples = [[] for _ in range(len(self.default_agent))]
+        sampled_actions = [[] for _ in range(len(self.default_agent))]
         root_values = [0 for _ in range(len(self.default_agent))]
         actions = ["0" for _ in range(len(self.default_agent))]
 
         local_info = list(info.values())
         for i, default_agent in enumerate(self.default_agent):
-            string_samples[i] = \
+            sampled_actions[i] = \
                 [local_info[i]["player"].default_policy(local_info[i]["game_round"], local_info[i]["shop"])]
-            actions[i] = string_samples[i][0]
-        return actions, policy, string_samples, root_values
+            actions[i] = sampled_actions[i][0]
+        return actions, policy, sampled_actions, root_values
 
     '''
     Description -
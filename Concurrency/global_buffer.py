@@ -2,115 +2,207 @@ import config
 import time
 import numpy as np
 import asyncio
-from Concurrency.priority_queue import PriorityBuffer
+from Concurrency.priority_queue import SumTree
+from Models.replay_muzero_buffer import unroll_priority
+import Models.MCTS_Util as util
+from Concurrency.column_storage import ColumnStorage
+
+
+# Size of each part of an observation, in the order of config.OBSERVATION_LABELS
+OBSERVATION_SIZES = [config.SHOP_INPUT_SIZE, config.BOARD_INPUT_SIZE, config.BENCH_INPUT_SIZE, config.STATE_INPUT_SIZE,
+                     config.COMP_INPUT_SIZE, config.OTHER_PLAYER_INPUT_SIZE]
+ACTION_SIZE = len(config.CHAMP_DECIDER_ACTION_DIM) if config.CHAMP_DECIDER else 3
+STEPS = config.UNROLL_STEPS + 1
+
+# name -> (shape of one step, dtype) of every column of the buffer
+COLUMNS = {
+    **{"observation_" + label: ((size,), np.float32) for label, size in zip(config.OBSERVATION_LABELS,
+                                                                            OBSERVATION_SIZES)},
+    "action": ((ACTION_SIZE,), np.int64),
+    "value": ((), np.float32),
+    "reward": ((), np.float32),
+    # unused entries point at the extra column past the last head, which is dropped from the batch
+    "policy_columns": ((util.MAX_POLICY_TARGET_ENTRIES,), np.int32),
+    "policy_values": ((util.MAX_POLICY_TARGET_ENTRIES,), np.float32),
+    "tier": ((config.TIERS_FLATTEN_LENGTH,), np.float32),
+    "champion": ((len(config.CHAMPION_LIST_DIM), 2), np.float32),
+    # the ending position of the game the step came from
+    "position": ((), np.float32),
+    # where the step is in its game and how many steps of the game are stored, the game starts offset slots back
+    "offset": ((), np.int32),
+    "length": ((), np.int32),
+}
 
 
 class GlobalBuffer(object):
     """
     Global Buffer that all of the data workers send samples from completed games to.
-    Uses a priority buffer. Also does all batch assembly for the trainer.
+    Uses a sum tree for prioritized sampling. Also does all batch assembly for the trainer.
+
+    Games are stored once, one step per slot of the sum tree, in consecutive slots of its ring. Every step is also
+    the sample that starts an unroll there, and the unroll steps of a batch are gathered from the slots that follow
+    it, using the (offset, length) of the step in its game for the masks. That is UNROLL_STEPS + 1 times less
+    memory than storing the whole window of every sample.
+    Steps are stored by column, one array per field with a row for every slot, so a batch is put together by
+    indexing every column. The policy targets are kept as the (column, policy) entries of their dense target, see
+    MCTS_Util.policy_target_entries, and only made dense for the batch.
+    With config.GLOBAL_BUFFER_DIRECTORY the columns are memory mapped files, see ColumnStorage. save writes the
+    buffer out with the priorities, and a buffer created with resume starts from the last save.
 
     Args:
         storage_ptr (pointer): Pointer to the storage object to keep track of the current trainer status.
+        resume (bool): Pick up the buffer of the last save, when resuming training from a checkpoint.
+        directory (str): Where the buffer is kept on disk, None to keep it in memory.
     """
 
-    def __init__(self, storage_ptr):
-        self.gameplay_experiences = PriorityBuffer(config.GLOBAL_BUFFER_SIZE)
+    def __init__(self, storage_ptr, resume=False, directory=config.GLOBAL_BUFFER_DIRECTORY):
+        self.gameplay_experiences = SumTree(config.GLOBAL_BUFFER_SIZE)
+        self.storage = ColumnStorage(config.GLOBAL_BUFFER_SIZE, COLUMNS, directory,
+                                     config.GLOBAL_BUFFER_SEGMENT_SIZE, config.GLOBAL_BUFFER_HOT_SEGMENTS, resume)
+        # samples stored that the trainer has not caught up with yet, every batch takes off batch_size
+        self.unused_samples = 0
+        if self.storage.index is not None:
+            self.gameplay_experiences.update(np.arange(config.GLOBAL_BUFFER_SIZE), self.storage.index["priorities"])
+            self.gameplay_experiences.size, self.gameplay_experiences.position, self.unused_samples = \
+                self.storage.index["counters"].tolist()
+            print("Resuming with {} samples in the global buffer".format(self.gameplay_experiences.size))
         self.batch_size = config.BATCH_SIZE
         self.storage_ptr = storage_ptr
-        self.average_position = PriorityBuffer(config.GLOBAL_BUFFER_SIZE)
-        self.current_batch = []
-        self.batch_full = False
         self.ckpt_time = time.time_ns()
 
     async def sample_batch(self):
         """
         Prepares a batch for training. All preprocessing done here to avoid problems with data transfer between CPU
         and GPU causing slowdowns.
+        Samples are drawn with replacement in proportion to their priority and stay in the buffer, so the same
+        sample can be trained on again until its slot is written over.
 
         Conditions:
             - There is enough data in the buffer to train on.
 
         Returns:
-            A prepared batch ready for training.
-        """
-        obs_tensor_batch, action_history_batch, target_value_batch, policy_mask_batch = [], [], [], []
-        target_reward_batch, target_policy_batch, value_mask_batch, reward_mask_batch = [], [], [], []
-        sample_set_batch, tier_batch, final_tier_batch, champion_batch, position_batch = [], [], [], [], []
-        importance_weights = []
-        for batch_num in range(self.batch_size):
-            # Setting the position gameplay_experiences get and position get next to each other to minimize
-            # the number of multiprocessing errors that could occur by having them too far apart.
-            # If these two commands become out of sync, it would cause the position logging to not match the rest
-            # of the training logs, but it would not break training.
-            [observation, action_history, value_mask, reward_mask, policy_mask, value, reward, policy,
-             sample_set, tier_set, final_tier_set, champion_set], priority = self.gameplay_experiences.extractMax()
-            position, _ = self.average_position.extractMax()
-            position_batch.append(position)
-            obs_tensor_batch.append(observation)
-            action_history_batch.append(action_history[1:])
-            value_mask_batch.append(value_mask)
-            reward_mask_batch.append(reward_mask)
-            policy_mask_batch.append(policy_mask)
-            target_value_batch.append(value)
-            target_reward_batch.append(reward)
-            target_policy_batch.append(policy)
-            sample_set_batch.append(sample_set)
-            tier_batch.append(tier_set)
-            final_tier_batch.append(final_tier_set)
-            champion_batch.append(champion_set)
-            importance_weights.append(1 / self.batch_size / priority)
-
-        observation_batch = self.reshape_observation(obs_tensor_batch)
-        action_history_batch = np.asarray(action_history_batch)
-        target_value_batch = np.asarray(target_value_batch).astype('float32')
-        target_reward_batch = np.asarray(target_reward_batch).astype('float32')
-        value_mask_batch = np.asarray(value_mask_batch).astype('float32')
-        reward_mask_batch = np.asarray(reward_mask_batch).astype('float32')
-        policy_mask_batch = np.asarray(policy_mask_batch).astype('float32')
-        importance_weights_batch = np.asarray(importance_weights).astype('float32')
-        importance_weights_batch = importance_weights_batch / np.max(importance_weights_batch)
-        position_batch = np.asarray(position_batch)
-        position_batch = np.mean(position_batch)
+            A prepared batch ready for training and the slots it was drawn from, for update_priorities.
+        """
+        return self.assemble_batch()
 
+    def assemble_batch(self):
+        """
+        Description:
+            The work of sample_batch, outside of the event loop for callers without one.
+        """
+        slots, probabilities = self.gameplay_experiences.sample(self.batch_size)
+        self.unused_samples = max(self.unused_samples - self.batch_size, 0)
+
+        # (N * P(i)) ^ -beta, scaled so that the largest weight is 1. N counts the samples that can be drawn, not the
+        # steps that are only there for the unroll windows
+        importance_weights = (self.gameplay_experiences.drawable * probabilities) ** -config.PRIORITY_BETA
+        importance_weights = (importance_weights / np.max(importance_weights)).astype('float32')
+
+        # [batch, unroll steps + 1] slots of the unroll window and where they are in the game of the sample.
+        # Slots past the end of the game hold another game or nothing, they are masked out or read from last.
+        unroll = np.arange(STEPS)
+        windows = (slots[:, None] + unroll) % config.GLOBAL_BUFFER_SIZE
+        offset, length = self.storage.get("offset", slots), self.storage.get("length", slots)
+        game_steps = offset[:, None] + unroll
+        # steps with a move to learn from, the last step of the game only keeps its reward
+        in_game = game_steps < length[:, None] - 1
+        in_trajectory = game_steps < length[:, None]
+        last = (slots - offset + length - 1) % config.GLOBAL_BUFFER_SIZE
+        # past the end of the game the labels stay on the last step
+        label_slots = np.where(in_game, windows, last[:, None])
+
+        column = self.storage.get
+        # the action into each unroll step, nothing past the end of the game
+        action_history = np.where(in_game[:, 1:, None], column("action", windows[:, 1:]), 0)
+        final_tier = np.repeat(column("tier", last)[:, None], STEPS, axis=1)
         data_list = [
-            observation_batch, action_history_batch, value_mask_batch, reward_mask_batch,
-            policy_mask_batch, target_value_batch, target_reward_batch, target_policy_batch, sample_set_batch,
-            importance_weights_batch, tier_batch, final_tier_batch, champion_batch, np.array(position_batch)
+            {label: column("observation_" + label, slots) for label in config.OBSERVATION_LABELS},
+            action_history, in_game.astype(np.float32), (in_trajectory & (unroll > 0)).astype(np.float32),
+            in_game.astype(np.float32), np.where(in_game, column("value", windows), 0).astype(np.float32),
+            np.where(in_trajectory, column("reward", windows), 0).astype(np.float32),
+            self.dense_policy(windows, in_game), importance_weights, column("tier", label_slots), final_tier,
+            column("champion", label_slots), np.mean(column("position", slots))
         ]
-        return np.array(data_list, dtype=object)
+        return np.array(data_list, dtype=object), slots
 
-    def reshape_observation(self, obs_batch):
+    def dense_policy(self, windows, in_game):
         """
         Description:
-            Switches the batch and dictionary axis.
-            The model requires the dictionary to be in the first axis and the batch to be the second axis.
+            Scatters the stored policy entries of the window slots into [batch, unroll steps + 1, all policy head
+            entries]. Steps out of the game are left at zero, their policy is masked out.
         """
-        obs_reshaped = {}
+        columns = self.storage.get("policy_columns", windows)
+        values = np.where(in_game[:, :, None], self.storage.get("policy_values", windows), 0)
+        policy = np.zeros(columns.shape[:2] + (sum(util.POLICY_TARGET_HEADS) + 1,), dtype=np.float32)
+        np.put_along_axis(policy, columns, values, axis=2)
+        return policy[:, :, :-1]
 
-        for obs in obs_batch:
-            for key in obs:
-                if key not in obs_reshaped:
-                    obs_reshaped[key] = []
-                obs_reshaped[key].append(obs[key])
-
-        for key in obs_reshaped:
-            obs_reshaped[key] = np.stack(obs_reshaped[key], axis=0)
+    def update_priorities(self, slots, value_errors):
+        """
+        Description:
+            Gives the samples of the last batch new priorities from the value errors of the train step, computed the
+            same way as when they were stored.
 
-        return obs_reshaped
+        Args:
+            slots (np.ndarray): The slots returned by sample_batch.
+            value_errors (np.ndarray): [batch_size, unroll steps + 1] errors returned by Trainer.train_network.
+        """
+        priorities = unroll_priority(value_errors) ** config.PRIORITY_ALPHA
+        self.gameplay_experiences.update(slots, priorities)
 
     async def store_replay_sequence(self, samples):
         """
         Description:
             Async method to store data into the global buffer. Some quick checking to ensure data validity.
+            The steps of the game go into the next slots of the ring, writing over the oldest ones once the buffer
+            is full.
 
         Args:
-            samples (list): All samples from one game from one agent.
+            samples (list): [priorities, trajectory, ending position] of one game from one agent, see
+                ReplayBuffer.store_global_buffer.
+        """
+        self.store_samples(samples)
+
+    def store_samples(self, samples):
+        """
+        Description:
+            The work of store_replay_sequence, outside of the event loop for callers without one.
+        """
+        priorities, trajectory, position = samples
+        priorities = np.asarray(priorities)
+        kept = priorities > 1
+        if not kept.any():
+            return
+        # a game longer than the buffer keeps its last steps
+        start = max(len(priorities) - config.GLOBAL_BUFFER_SIZE, 0)
+        # the steps below the priority threshold are still stored for the unroll windows of the steps before them,
+        # they are just never drawn
+        slots = self.gameplay_experiences.insert(np.where(kept, priorities, 0)[start:] ** config.PRIORITY_ALPHA)
+        [observation, action, value, reward, policy_columns, policy_values, tier, champion] = trajectory
+
+        for label in config.OBSERVATION_LABELS:
+            self.storage.set("observation_" + label, slots, observation[label][start:])
+        self.storage.set("action", slots, action[start:])
+        self.storage.set("value", slots, value[start:])
+        self.storage.set("reward", slots, reward[start:])
+        self.storage.set("policy_columns", slots, policy_columns[start:])
+        self.storage.set("policy_values", slots, policy_values[start:])
+        self.storage.set("tier", slots, tier[start:])
+        self.storage.set("champion", slots, champion[start:])
+        self.storage.set("position", slots, np.full(len(slots), position))
+        self.storage.set("offset", slots, np.arange(len(slots)))
+        self.storage.set("length", slots, np.full(len(slots), len(slots)))
+        self.unused_samples += int(kept[start:].sum())
+
+    def save(self):
+        """
+        Description:
+            Writes the buffer and its priorities to config.GLOBAL_BUFFER_DIRECTORY, for a later resume.
+            Runs on the event loop and blocks it while the hot segments are written, see ColumnStorage.save.
         """
-        for sample in samples[0]:
-            if sample[0] > 1:
-                self.gameplay_experiences.insert(sample[0], sample[1])
-                self.average_position.insert(sample[0], samples[1])
+        tree = self.gameplay_experiences
+        self.storage.save({"priorities": tree.priorities(np.arange(tree.maxsize)),
+                           "counters": np.array([tree.size, tree.position, self.unused_samples])})
 
     async def available_batch(self):
         """
@@ -120,7 +212,7 @@ class GlobalBuffer(object):
         Outputs:
             - True if there is enough data and the trainer is free, false otherwise.
         """
-        queue_length = self.gameplay_experiences.size
+        queue_length = self.gameplay_experiences.drawable
         if queue_length >= self.batch_size and not await self.storage_ptr.get_trainer_busy.remote():
             print("QUEUE_LENGTH {} at time {}".format(queue_length, time.time_ns()))
             await self.storage_ptr.set_trainer_busy.remote(True)
@@ -0,0 +1,184 @@
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import ray
+import torch
+import config
+from Models.MuZero_torch_agent import MuZeroNetwork as TFTNetwork
+from Models.Muzero_default_agent import MuZeroDefaultNetwork as DefaultNetwork
+
+'''
+Description -
+    Evaluates the models of all data workers in one place. Every worker used to hold its own copy of the model and
+    call it with at most 8 players at a time. Here the requests of all workers are gathered and evaluated together,
+    one batch per (call, model version). A request waits at most config.INFERENCE_DEADLINE seconds for others to
+    join its batch, or less if config.INFERENCE_MAX_BATCH players are already waiting.
+    Workers talk to it through an InferenceClient, which MCTS uses like a network.
+    Models are kept by version. The current model is shared by the workers with one version per checkpoint,
+    "live_<episode>", which stays until the last game that started with it is done (see use_version). Past
+    checkpoints get one version per worker.
+'''
+class InferenceBatcher:
+    def __init__(self, max_batch=config.INFERENCE_MAX_BATCH, deadline=config.INFERENCE_DEADLINE):
+        self.max_batch = max_batch
+        self.deadline = deadline
+        self.networks = {}
+        # shared version -> number of clients using it
+        self.users = {}
+        # [call, version, inputs, number of players, time of the request, future]
+        self.pending = []
+        self.pending_lock = threading.Condition()
+        # held while a network runs or gets new weights
+        self.network_lock = threading.Lock()
+        threading.Thread(target=self.loop, daemon=True).start()
+
+    @staticmethod
+    def load_model():
+        if config.CHAMP_DECIDER:
+            return DefaultNetwork()
+        else:
+            return TFTNetwork()
+
+    def set_weights(self, version, weights):
+        with self.network_lock:
+            if version not in self.networks:
+                self.networks[version] = self.load_model().to(config.DEVICE)
+            self.networks[version].set_weights(weights)
+
+    '''
+    Description -
+        Moves a client from its shared version of the model to another one. The version is loaded from weights
+        when no client has it yet and dropped when its last client moves on, so new weights never change the
+        model of a game that is still running. previous is None for a client without a shared version yet.
+    '''
+    def use_version(self, version, weights, previous=None):
+        with self.network_lock:
+            if version not in self.networks:
+                self.networks[version] = self.load_model().to(config.DEVICE)
+                self.networks[version].set_weights(weights)
+            self.users[version] = self.users.get(version, 0) + 1
+            if previous is not None:
+                self.users[previous] -= 1
+                if self.users[previous] == 0:
+                    del self.users[previous], self.networks[previous]
+
+    def initial_inference(self, version, observation):
+        return self.submit("initial_inference", version, [observation], len(observation["shop"])).result()
+
+    def recurrent_inference(self, version, hidden_state, action):
+        return self.submit("recurrent_inference", version, [hidden_state, action], len(action)).result()
+
+    def submit(self, call, version, inputs, rows):
+        if version not in self.networks:
+            raise ValueError('The inference server has no model version {}, give it weights first'.format(version))
+        future = Future()
+        with self.pending_lock:
+            self.pending.append([call, version, inputs, rows, time.monotonic(), future])
+            self.pending_lock.notify()
+        return future
+
+    def loop(self):
+        while True:
+            with self.pending_lock:
+                while not self.pending:
+                    self.pending_lock.wait()
+                # wait for the oldest request to reach its deadline, or for a full batch
+                deadline = self.pending[0][4] + self.deadline
+                while sum(request[3] for request in self.pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.pending_lock.wait(remaining)
+                requests, self.pending = self.pending, []
+
+            batches = {}
+            for request in requests:
+                batches.setdefault((request[0], request[1]), []).append(request)
+            for (call, version), batch in batches.items():
+                try:
+                    self.run_batch(call, version, batch)
+                except Exception as error:
+                    for request in batch:
+                        request[5].set_exception(error)
+
+    def run_batch(self, call, version, batch):
+        # stack the inputs of every request, run the network once and hand each request back its rows
+        inputs = [concatenate([request[2][i] for request in batch]) for i in range(len(batch[0][2]))]
+        if call == "recurrent_inference":
+            inputs[0] = to_torch(inputs[0], config.DEVICE)
+        with self.network_lock, torch.no_grad():
+            outputs = to_numpy(getattr(self.networks[version], call)(*inputs))
+        bounds = np.cumsum([0] + [request[3] for request in batch])
+        for request, start, end in zip(batch, bounds[:-1], bounds[1:]):
+            request[5].set_result(take_rows(outputs, start, end))
+
+
+# The ray actor, threaded so that requests from many workers are waiting in the batcher at the same time
+InferenceServer = ray.remote(num_gpus=config.INFERENCE_SERVER_GPU_SIZE,
+                             max_concurrency=config.CONCURRENT_GAMES * 2 + 2)(InferenceBatcher)
+
+
+'''
+Description -
+    Stands in for the network of a data worker. MCTS calls it like a network and the calls go to the server.
+    server can be an InferenceServer actor or an InferenceBatcher in the same process.
+'''
+class InferenceClient:
+    def __init__(self, server, version=None):
+        self.server = server
+        self.version = version
+
+    def call(self, method, *args):
+        if isinstance(self.server, InferenceBatcher):
+            return getattr(self.server, method)(*args)
+        return ray.get(getattr(self.server, method).remote(*args))
+
+    def set_weights(self, weights):
+        self.call("set_weights", self.version, weights)
+
+    # Switches to a version of the model that other clients can share, see InferenceBatcher.use_version
+    def use_version(self, version, weights):
+        self.call("use_version", version, weights, self.version)
+        self.version = version
+
+    def initial_inference(self, observation):
+        return to_torch(self.call("initial_inference", self.version, observation), "cpu")
+
+    def recurrent_inference(self, hidden_state, action):
+        outputs = self.call("recurrent_inference", self.version, to_numpy(hidden_state), np.asarray(action))
+        return to_torch(outputs, "cpu")
+
+
+# The outputs of the networks are tensors, lists of tensors (policy heads) and dicts of tensors (hidden states)
+def to_numpy(value):
+    if isinstance(value, dict):
+        return {key: to_numpy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_numpy(item) for item in value]
+    if isinstance(value, torch.Tensor):
+        return value.cpu().numpy()
+    return value
+
+
+def to_torch(value, device):
+    if isinstance(value, dict):
+        return {key: to_torch(item, device) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_torch(item, device) for item in value]
+    # arrays that come back from ray are read only, so copy them
+    return torch.tensor(value, device=device)
+
+
+def concatenate(values):
+    if isinstance(values[0], dict):
+        return {key: concatenate([value[key] for value in values]) for key in values[0]}
+    return np.concatenate(values)
+
+
+def take_rows(value, start, end):
+    if isinstance(value, dict):
+        return {key: take_rows(item, start, end) for key, item in value.items()}
+    if isinstance(value, list):
+        return [take_rows(item, start, end) for item in value]
+    return value[start:end]
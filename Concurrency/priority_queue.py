@@ -130,3 +130,79 @@ class PriorityBuffer(object):
         self.size -= 1
         self.maxHeapify(self.FRONT)
         return popped, priority_popped
+
+
+"""
+Description - 
+    Sum tree over the priorities of a fixed number of slots. Every node holds the sum of its two children, so a slot
+    can be drawn with probability proportional to its priority by walking down from the root, O(log n) per draw.
+    Draws are with replacement and do not remove anything, a sample stays until its slot is written over.
+    Slots are handed out in a ring, when all of them are used the oldest one is written over first.
+    Everything works on arrays of slots so a whole batch is drawn or updated with a few numpy calls per tree level.
+Inputs      -
+    maxsize
+        The number of slots.
+"""
+class SumTree(object):
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.size = 0
+        # slots with a priority above 0, the ones sample can draw
+        self.drawable = 0
+        # next slot to write to
+        self.position = 0
+        # leaves start at self.leaves, padded to a power of two so that every leaf has the same depth
+        self.depth = int(np.ceil(np.log2(max(maxsize, 2))))
+        self.leaves = 2 ** self.depth
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    def qsize(self):
+        return self.size
+
+    def total(self):
+        return self.tree[1]
+
+    def priorities(self, slots):
+        return self.tree[self.leaves + np.asarray(slots)]
+
+    '''
+    Description - 
+        Takes the next len(priorities) slots of the ring and gives them the priorities. Returns the slots.
+    '''
+    def insert(self, priorities):
+        priorities = np.asarray(priorities, dtype=np.float64).reshape(-1)
+        slots = (self.position + np.arange(len(priorities))) % self.maxsize
+        self.position = (self.position + len(priorities)) % self.maxsize
+        self.size = min(self.size + len(priorities), self.maxsize)
+        self.update(slots, priorities)
+        return slots
+
+    '''
+    Description - 
+        Sets the priorities of the slots and the sums above them. A slot that is given twice keeps the last priority.
+    '''
+    def update(self, slots, priorities):
+        nodes = self.leaves + np.asarray(slots, dtype=np.int64)
+        changed = np.unique(nodes)
+        self.drawable -= np.count_nonzero(self.tree[changed])
+        self.tree[nodes] = priorities
+        self.drawable += np.count_nonzero(self.tree[changed])
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    '''
+    Description - 
+        Draws batch_size slots, each with probability priority / total. Returns the slots and those probabilities.
+    '''
+    def sample(self, batch_size, rng=np.random):
+        values = rng.random(batch_size) * self.total()
+        nodes = np.ones(batch_size, dtype=np.int64)
+        for _ in range(self.depth):
+            nodes *= 2
+            # rounding can leave a value a little past the last priority, never walk into an empty subtree for it
+            right = (values >= self.tree[nodes]) & (self.tree[nodes + 1] > 0)
+            values -= self.tree[nodes] * right
+            nodes += right
+        slots = nodes - self.leaves
+        return slots, self.tree[nodes] / self.total()
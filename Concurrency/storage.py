@@ -40,6 +40,17 @@ class Storage:
         """
         return self.checkpoint_list[-1].get_model()
 
+    def get_model_and_episode(self):
+        """
+        Returns the most recent checkpoint and its episode, which names the version of the model.
+
+        Returns:
+            Pytorch Model Weights, int:
+                Model related to the most recent checkpoint and the episode of that checkpoint
+        """
+        checkpoint = self.checkpoint_list[-1]
+        return checkpoint.get_model(), checkpoint.epoch
+
     def load_model(self):
         """
         Returns a new model.
@@ -37,9 +37,10 @@ class TrainingLoop:
     async def loop(self, global_agent, storage, train_step):
         while True:
             if await self.global_buffer.available_batch():
-                gameplay_experience_batch = await self.global_buffer.sample_batch()
+                gameplay_experience_batch, slots = await self.global_buffer.sample_batch()
 
-                self.trainer.train_network(gameplay_experience_batch, train_step)
+                value_errors = self.trainer.train_network(gameplay_experience_batch, train_step)
+                self.global_buffer.update_priorities(slots, value_errors)
                 # Leaving these comments here because they are benchmarking times for debugging.
                 # print("One round in the trainer took {} time".format(time.time_ns() - self.ckpt_time))
                 # self.ckpt_time = time.time_ns()
@@ -53,3 +54,4 @@ class TrainingLoop:
                         (config.CHAMP_DECIDER and train_step % config.CHECKPOINT_STEPS % 10 == 0):
                     storage.store_checkpoint.remote(train_step)
                     global_agent.tft_save_model(train_step)
+                    self.global_buffer.save()
@@ -22,10 +22,12 @@ Inputs      -
         the global model that is sent to the trainer to update. 
     storage
         An object that stores global information like the weights of the global model and current training progress
+    resume
+        Start from the global buffer saved with the last checkpoint instead of an empty one.
 """
 class TrainingManager:
-    def __init__(self, global_agent, storage):
-        self.training_ray_manager = _TrainActor.remote(global_agent, storage)
+    def __init__(self, global_agent, storage, resume=False):
+        self.training_ray_manager = _TrainActor.remote(global_agent, storage, resume)
         self.global_agent = global_agent
 
     """
@@ -52,7 +54,8 @@ class TrainingManager:
 
     """
     Description - 
-        Outward facing buffer size call.
+        Outward facing buffer size call. The buffer keeps its samples after training on them, so this is the number
+        of stored samples that the trainer has not caught up with yet.
     Outputs     - 
         Buffer size - int
     """
@@ -69,11 +72,13 @@ Inputs      -
         the global model that is sent to the trainer to update. 
     storage
         An object that stores global information like the weights of the global model and current training progress
+    resume
+        Start from the global buffer saved with the last checkpoint instead of an empty one.
 """
 @ray.remote(num_gpus=config.TRAINER_GPU_SIZE)
 class _TrainActor:
-    def __init__(self, global_agent, storage):
-        self.global_buffer = GlobalBuffer(storage)
+    def __init__(self, global_agent, storage, resume):
+        self.global_buffer = GlobalBuffer(storage, resume)
         self.training_loop = TrainingLoop(global_agent, self.global_buffer)
 
     """
@@ -108,4 +113,4 @@ class _TrainActor:
         Buffer size - int
     """
     def buffer_size(self):
-        return self.global_buffer.gameplay_experiences.size
+        return self.global_buffer.unused_samples
@@ -45,178 +45,273 @@ def create_default_mapping():
 
     return mappings
 
+
+# The default mapping as static tables, built once instead of on every call.
+# policy head -> the label of each entry of that head
+POLICY_LABELS = [np.array(head[0], dtype=object) for head in create_default_mapping()]
+# [from slot, to slot] of every board move and [slot, item] of every item move, in policy head order.
+# slots 0 - 27 are the board, 28 - 36 the bench
+BOARD_MOVES = np.array([label.split('_')[1:] for label in POLICY_LABELS[2]], dtype=np.int64)
+ITEM_MOVES = np.array([label.split('_')[1:] for label in POLICY_LABELS[3]], dtype=np.int64)
+
+
+# Every action the MuZero policy can pick as one integer id, so MCTS, the c++ tree, the replay buffer and the
+# trainer pass around ints instead of building and parsing strings like "2_13_30".
+# Ids run over the types in order and the types that need a second head take one id per entry of that head:
+#   0 pass | 1 - 5 shop | 6 - 635 board moves | 636 - 1005 item moves | 1006 - 1014 sells | 1015 level | 1016 refresh
+ACTION_OFFSETS = np.cumsum([0] + [config.POLICY_HEAD_SIZES[t] if t in config.NEEDS_2ND_DIM else 1
+                                  for t in range(config.POLICY_HEAD_SIZES[0])])
+NUM_ACTIONS = int(ACTION_OFFSETS[-1])
+# action id -> the type of the action, its index in the policy head of that type (0 for types without a head),
+# the [type, a, b] vector the simulator and the dynamics network take and the old string label
+ACTION_TYPES = np.repeat(np.arange(config.POLICY_HEAD_SIZES[0]), np.diff(ACTION_OFFSETS))
+ACTION_HEAD_INDEX = np.arange(NUM_ACTIONS) - ACTION_OFFSETS[ACTION_TYPES]
+ACTION_VECTORS = np.zeros((NUM_ACTIONS, 3), dtype=np.int64)
+ACTION_VECTORS[:, 0] = ACTION_TYPES
+ACTION_VECTORS[ACTION_OFFSETS[1]:ACTION_OFFSETS[2], 1] = np.arange(config.POLICY_HEAD_SIZES[1])
+ACTION_VECTORS[ACTION_OFFSETS[2]:ACTION_OFFSETS[3], 1:] = BOARD_MOVES
+ACTION_VECTORS[ACTION_OFFSETS[3]:ACTION_OFFSETS[4], 1:] = ITEM_MOVES
+ACTION_VECTORS[ACTION_OFFSETS[4]:ACTION_OFFSETS[5], 1] = np.arange(config.POLICY_HEAD_SIZES[4])
+ACTION_STRINGS = np.array([POLICY_LABELS[0][t] + (POLICY_LABELS[t][i] if t in config.NEEDS_2ND_DIM else "")
+                           for t, i in zip(ACTION_TYPES, ACTION_HEAD_INDEX)], dtype=object)
+
+# [type, a, b] -> action id, -1 where there is no such action.
+# A board move is the same swap whichever way round the slots are written, and a move between two bench slots
+# does nothing, so it is a pass. The default agent writes board moves both ways.
+VECTOR_TO_ID = np.full((config.ACTION_DIM[0], config.ACTION_DIM[1], config.ACTION_DIM[1]), -1, dtype=np.int64)
+for t in range(config.ACTION_DIM[0]):
+    if t not in config.NEEDS_2ND_DIM:
+        VECTOR_TO_ID[t] = ACTION_OFFSETS[t]
+VECTOR_TO_ID[2, 28:, 28:] = 0
+VECTOR_TO_ID[tuple(ACTION_VECTORS.T)] = np.arange(NUM_ACTIONS)
+VECTOR_TO_ID[2, BOARD_MOVES[:, 1], BOARD_MOVES[:, 0]] = np.arange(ACTION_OFFSETS[2], ACTION_OFFSETS[3])
+
+
+# "2_13_30" -> [2, 13, 30], "5" -> [5, 0, 0]. The champion decider strings keep all of their parts
+def string_to_vector(action):
+    parts = [int(part) for part in action.split('_')]
+    return parts + [0] * (3 - len(parts))
+
+
+# Action ids from a list that can also hold strings, which is what the default agents and imitation learning give.
+# Raises a ValueError for a vector that is not an action instead of letting -1 wrap around to the last one
+def action_ids(actions):
+    vectors = np.asarray([ACTION_VECTORS[action] if not isinstance(action, str) else string_to_vector(action)
+                          for action in actions], dtype=np.int64).reshape(-1, 3)
+    in_range = ((vectors >= 0) & (vectors < VECTOR_TO_ID.shape)).all(axis=1)
+    ids = np.full(len(vectors), -1, dtype=np.int64)
+    ids[in_range] = VECTOR_TO_ID[tuple(vectors[in_range].T)]
+    if (ids < 0).any():
+        raise ValueError('{} is not an action'.format(actions[int(np.argmax(ids < 0))]))
+    return ids
+
+
+# Action vectors for the simulator and the dynamics network from a list of action ids or strings
+def action_vectors(actions):
+    if not any(isinstance(action, str) for action in actions):
+        return ACTION_VECTORS[np.asarray(actions, dtype=np.int64)]
+    return np.asarray([ACTION_VECTORS[action] if not isinstance(action, str) else string_to_vector(action)
+                       for action in actions])
+
+
+# Turns the 11 masks of every player (see MCTS.encode_action_to_str for what they are) into one boolean
+# [num_players, head size] array per policy head, True where the action is legal
+def legal_action_masks(mask):
+    decision, shop, board, bench, item, space, thieves_glove, sparring_glove, glove, dummy, full_items = \
+        [np.array([player_mask[k] for player_mask in mask], dtype=bool) for k in range(11)]
+    slots = np.concatenate([board, bench], axis=1)  # is there a unit in slot [0, 37)
+
+    shop_legal = shop & space[:, 1:2]
+
+    move_from, move_to = BOARD_MOVES[:, 0], BOARD_MOVES[:, 1]
+    to_bench = move_to > 27
+    board_legal = (slots[:, move_from] | slots[:, move_to]) \
+        & ~(to_bench & ~space[:, 0:1] & ~slots[:, move_from]) \
+        & ~(to_bench & ~slots[:, move_to])
+
+    # units that can hold another item: board units that are not dummies or full, and any unit on the bench
+    can_hold_item = np.concatenate([board & ~dummy & ~full_items, bench], axis=1)
+    item_slot, item_index = ITEM_MOVES[:, 0], ITEM_MOVES[:, 1]
+    item_legal = can_hold_item[:, item_slot] & item[:, item_index] \
+        & ~((sparring_glove[:, item_slot] & glove[:, item_index]) | thieves_glove[:, item_slot])
+
+    sell_legal = bench.copy()
+
+    # pass is always legal, the other types only when their head has a legal action
+    type_legal = np.stack([np.ones(len(mask), dtype=bool), shop_legal.any(axis=1), board_legal.any(axis=1),
+                           item_legal.any(axis=1), sell_legal.any(axis=1), decision[:, 4], decision[:, 5]], axis=1)
+
+    return [type_legal, shop_legal, board_legal, item_legal, sell_legal]
+
+
+# Logit of the padding past the end of a row, softmax gives it no weight
+PAD_LOGIT = -1e9
+
+# Most children a node of the tree can get: from MCTS.sample every sample plus the types without a head of their own,
+# which are always children, and at the root of a Gumbel search GUMBEL_NUM_CONSIDERED actions. The node pools of
+# tree.Roots and the policy target entries of a step are sized with it.
+MAX_CHILDREN = max(config.NUM_SAMPLES + config.POLICY_HEAD_SIZES[0] - len(config.NEEDS_2ND_DIM),
+                   config.GUMBEL_NUM_CONSIDERED)
+
+
+# Draws num_samples indices from the softmax of every row of logits [N, L] at once with inverse transform sampling.
+# Only the first lengths[i] entries of row i can be drawn, the rest is padding. Returns [N, num_samples]
+def sample_categorical(logits, lengths, num_samples):
+    probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+    cdf = np.cumsum(probs, axis=1)
+    rows = np.arange(len(logits))[:, None]
+    # the cdf of all rows as one sorted array, row i covers [i, i + 1), so one searchsorted does every row
+    flat_cdf = (cdf / cdf[:, -1:] + rows).ravel()
+    draws = np.random.random((len(logits), num_samples)) + rows
+    samples = np.searchsorted(flat_cdf, draws, side='right') - rows * logits.shape[1]
+    # float error can push a draw past the last entry of a row
+    return np.minimum(samples, np.maximum(lengths - 1, 0)[:, None])
+
+
+# Lists of per row lists (the masked policy of the root) -> ([N, L] logits padded with PAD_LOGIT,
+# [N, L] index in the policy head padded with 0, [N] lengths) for one policy head
+def pad_head(logits, mapping):
+    lengths = np.array([len(row) for row in mapping], dtype=np.int64)
+    width = max(int(lengths.max()), 1)
+    in_row = np.arange(width) < lengths[:, None]
+    padded_logits = np.full((len(lengths), width), PAD_LOGIT, dtype=np.float32)
+    padded_logits[in_row] = np.concatenate([np.asarray(row, dtype=np.float32) for row in logits])
+    padded_index = np.zeros((len(lengths), width), dtype=np.int64)
+    padded_index[in_row] = np.concatenate([np.asarray(row, dtype=np.int64) for row in mapping])
+    return padded_logits, padded_index, lengths
+
+
+# The masked policy of the root (lists of per row lists for every head, see MCTS.encode_action_to_str) ->
+# [N, NUM_ACTIONS] log probability of every action id, log p(type) + log p(entry | type), -inf where it is illegal
+def joint_log_policy(policy_logits, mapping):
+    heads = [pad_head(logits, head_mapping) for logits, head_mapping in zip(policy_logits, mapping)]
+    rows = np.arange(len(heads[0][2]))[:, None]
+    joint = np.full((len(rows), NUM_ACTIONS), -np.inf)
+    type_log_policy = np.full((len(rows), config.POLICY_HEAD_SIZES[0]), -np.inf)
+    for head, (logits, index, lengths) in enumerate(heads):
+        logits = logits.astype(np.float64)
+        log_policy = logits - logits.max(axis=1, keepdims=True)
+        log_policy -= np.log(np.exp(log_policy).sum(axis=1, keepdims=True))
+        legal = np.arange(logits.shape[1]) < lengths[:, None]
+        if head == 0:
+            type_log_policy[np.broadcast_to(rows, index.shape)[legal], index[legal]] = log_policy[legal]
+        else:
+            joint_rows = np.broadcast_to(rows, index.shape)[legal]
+            joint[joint_rows, ACTION_OFFSETS[head] + index[legal]] = \
+                type_log_policy[joint_rows, head] + log_policy[legal]
+    for t in range(config.POLICY_HEAD_SIZES[0]):
+        if t not in config.NEEDS_2ND_DIM:
+            joint[:, ACTION_OFFSETS[t]] = type_log_policy[:, t]
+    return joint
+
+
+# The visit count a root child needs to be picked in each of num_simulations simulations of a Gumbel search
+# with num_considered children. Sequential halving: every phase gives each child left the same number of visits,
+# then the weaker half is dropped, until the simulations run out. Same as mctx.
+def considered_visits(num_considered, num_simulations):
+    if num_considered <= 1:
+        return list(range(num_simulations))
+    log2_considered = int(np.ceil(np.log2(num_considered)))
+    sequence = []
+    visits = [0] * num_considered
+    while len(sequence) < num_simulations:
+        extra_visits = max(1, int(num_simulations / (log2_considered * num_considered)))
+        for _ in range(extra_visits):
+            sequence.extend(visits[:num_considered])
+            for i in range(num_considered):
+                visits[i] += 1
+        num_considered = max(2, num_considered // 2)
+    return sequence[:num_simulations]
+
+
 def split_sample_decide(sample_mapping, target_policy):
     if config.CHAMP_DECIDER:
         return split_sample_set_champ_decider(sample_mapping, target_policy)
     else:
         return split_sample_set(sample_mapping, target_policy)
 
-# ["0", "1_0", "2_20_20", "3_4_20", "4_10", "5", "6"] ->
-# [["0", "1", "2", "3", "4", "5", "6"], ["_0"], ["_20_20"], ["_4_20"], ["_10"]]
+# [0, 1, 6, 1005, 1006, 1015, 1016] (action ids, or the same actions as strings) ->
+# [[0, 1, 2, 3, 4, 5, 6], [0], [0], [369], [0]]
+# The first list holds the sampled types, the others the sampled indices of each policy head.
+# The policy of a type with a second head is the sum of the policy of its samples.
 def split_sample_set(sample_mapping, target_policy):
-    split_sample = [[], [], [], [], []]
-    split_policy = [[], [], [], [], []]
-
-    # split_policy[0] = [0] * config.POLICY_HEAD_SIZES[0]
-
-    for i, sample in enumerate(sample_mapping):
-        base = sample[0]
-        idx = int(base)
-
-        if idx in config.NEEDS_2ND_DIM:
-            location = sample[1:]
-
-            if base not in split_sample[0]:
-                split_sample[0].append(base)
-                split_policy[0].append(0)
-
-            split_sample[idx].append(location)
-            split_policy[idx].append(target_policy[i])
-            # split_policy[0][idx] += target_policy[i]
-        else:
-            split_sample[0].append(sample)
-            split_policy[0].append(target_policy[i])
-
-    # Accumulate the policy for each multidim action
-    for i, base in enumerate(split_sample[0]):
-        idx = int(base)
-
-        if idx in config.NEEDS_2ND_DIM:
-            policy_sum = sum(split_policy[idx])
-            split_policy[0][i] += policy_sum
+    ids = action_ids(sample_mapping)
+    types = ACTION_TYPES[ids]
+    heads = ACTION_HEAD_INDEX[ids]
+    target_policy = np.asarray(target_policy, dtype=np.float64)
+
+    # types in the order they were first sampled
+    sampled_types, first = np.unique(types, return_index=True)
+    sampled_types = sampled_types[np.argsort(first)]
+    type_policy = np.bincount(types, weights=target_policy, minlength=config.POLICY_HEAD_SIZES[0])
+
+    split_sample = [sampled_types.tolist()]
+    split_policy = [type_policy[sampled_types].tolist()]
+    for dim in range(1, len(config.POLICY_HEAD_SIZES)):
+        in_dim = types == dim
+        split_sample.append(heads[in_dim].tolist())
+        split_policy.append(target_policy[in_dim].tolist())
 
     return split_sample, split_policy
 
 # Size is [# of samples, len of champion list]
+# "a_b_c_..." samples -> for every head all of its entries and the summed policy of the samples that picked each entry
 def split_sample_set_champ_decider(sample_mapping, target_policy):
-    split_sample = [["0", "1", "2", "3", "4"] for _ in range(len(config.CHAMPION_ACTION_DIM))] + [["0", "1"]] + \
-                   [["0", "1", "2"] for _ in range(len(config.ITEM_CHOICE_DIM))]
-    split_policy = [[0, 0, 0, 0, 0] for _ in range(len(config.CHAMPION_ACTION_DIM))] + [[0, 0]] + \
-                   [[0, 0, 0] for _ in range(len(config.ITEM_CHOICE_DIM))]
-    for i, sample in enumerate(sample_mapping):
-        for k in range(0, len(sample), 2):
-            base = sample[k]
-            idx = int(base)
-            split_policy[int(k/2)][idx] += target_policy[i]
+    head_sizes = config.CHAMP_DECIDER_ACTION_DIM
+    split_sample = [[str(i) for i in range(size)] for size in head_sizes]
+    # [samples, heads] entry picked in every head
+    picked = np.array([sample.split("_") for sample in sample_mapping], dtype=np.int64)
+    heads = np.broadcast_to(np.arange(len(head_sizes)), picked.shape)
+    policy = np.zeros((len(head_sizes), max(head_sizes)))
+    np.add.at(policy, (heads, picked), np.asarray(target_policy, dtype=np.float64)[:, None])
+    split_policy = [policy[head, :size].tolist() for head, size in enumerate(head_sizes)]
     return split_sample, split_policy
 
-# [batch_size, unroll_steps, num_samples] to [unroll_steps, num dims, (batch_size, dim)]
-def split_batch(mapping_batch, policy_batch):
-    batch_size = len(mapping_batch)  # config.BATCH_SIZE
-    unroll_steps = len(mapping_batch[0])  # config.UNROLL_STEPS
-
-    mapping = []
-    policy = []
-
-    for unroll_idx in range(unroll_steps):
-        if config.CHAMP_DECIDER:
-            unroll_mapping = [[] for _ in range(len(config.CHAMP_DECIDER_ACTION_DIM))]
-            unroll_policy = [[] for _ in range(len(config.CHAMP_DECIDER_ACTION_DIM))]
-        else:
-            unroll_mapping = [[], [], [], [], []]
-            unroll_policy = [[], [], [], [], []]
-
-        for batch_idx in range(batch_size):
-            local_mapping = mapping_batch[batch_idx][unroll_idx]
-            local_policy = policy_batch[batch_idx][unroll_idx]
-
-            for dim_idx in range(len(local_mapping)):
-                unroll_mapping[dim_idx].append(local_mapping[dim_idx])
-                unroll_policy[dim_idx].append(local_policy[dim_idx])
-
-        mapping.append(unroll_mapping)
-        policy.append(unroll_policy)
-
-    return mapping, policy
-
-def action_to_idx(action, dim):
-    mapped_idx = None
-
-    if dim == 0:  # type dim; 7; "0", "1", ... "6"
-        mapped_idx = int(action)
-
-    elif dim == 1:  # shop dim; 5; "_0", "_1", ... "_4"
-        mapped_idx = int(action[1])  # "_1" -> "1"
-
-    elif dim == 2:  # board dim; 630; "_0_1", "_0_2", ... "_37_28"
-        action = action.split('_')  # "_20_21" -> ["", "20", "21"]
-        from_loc = int(action[1])  # ["", "20", "21"] -> "20"
-        to_loc = int(action[2])  # ["", "20", "21"] -> "21"
-        if from_loc < 28:
-            mapped_idx = sum([35 - i for i in range(from_loc)]) + (to_loc - 1)
-        else:
-            mapped_idx = sum([35 - i for i in range(28)]) + (to_loc - 1)
-
-    elif dim == 3:  # item dim; 370; "_0_0", "_0_1", ... "_9_36"
-        action = action.split('_')  # "_10_9" -> ["", "10", "9"]
-        item_loc = int(action[1])  # "_0_20" -> "0"
-        champ_loc = int(action[2])  # "_0_20" -> "20"
-        mapped_idx = (10 * item_loc) + champ_loc
-
-    elif dim == 4:  # sell dim; 37; "_0", "_1", "_36"
-        mapped_idx = int(action[1:])  # "_15" -> "15
-
-    return mapped_idx
-
-# Sample set is [ [batch_size, dim], [batch_size, dim] ...]
-# Convert the sample set string to the corresponding idx
-def sample_set_to_idx(sample_set):
-    idx_set = []
-
-    for dim, batch in enumerate(sample_set):  # [batch_size, dim]
-        dim_idx = []
-        for sample in batch:  # [dim]
-            local_idx = []
-            for action in sample:  # single action
-                local_idx.append(action_to_idx(action, dim))
-            dim_idx.append(local_idx)
-        idx_set.append(dim_idx)
-
-    return idx_set
-
-# target [ [batch_size, sampled_dim], [batch_size, sampled_dim] ...]
-# idx_set [ [batch_size, sampled_dim], [batch_size, sampled_dim] ...]
-# Create filled target with zeros as well as mask
-def create_target_and_mask(target, idx_set):
-    batch_size = config.BATCH_SIZE
-    dim_sizes = config.POLICY_HEAD_SIZES
-
-    target_filled = [
-        np.zeros((batch_size, dim), dtype=np.float32) for dim in dim_sizes
-    ]
-
-    # TODO: Find a native numpy function to do this
-    for dim, batch in enumerate(idx_set):  # [batch_size, dim]
-        for batch_idx, sample in enumerate(batch):
-            for target_idx, mapped_idx in enumerate(sample):
-                target_filled[dim][batch_idx][mapped_idx] = target[dim][batch_idx][target_idx]
-
-    return target_filled
-
-
-# both are (num_dims, [(batch_size, dim) ...] )
-# TODO: Add a description of what this does
+# The policy heads the trainer learns. A dense policy target is all of these heads side by side.
+POLICY_TARGET_HEADS = config.CHAMP_DECIDER_ACTION_DIM if config.CHAMP_DECIDER else config.POLICY_HEAD_SIZES
+POLICY_TARGET_OFFSETS = np.cumsum([0] + POLICY_TARGET_HEADS[:-1])
+# Most entries a step can have: every entry of every head for the champion decider, otherwise every type and one
+# entry for each child of the root.
+MAX_POLICY_TARGET_ENTRIES = sum(POLICY_TARGET_HEADS) if config.CHAMP_DECIDER \
+    else config.POLICY_HEAD_SIZES[0] + MAX_CHILDREN
+
+# split_sample_decide outputs of several steps -> (columns in the dense target, policy at those columns), both
+# [steps, MAX_POLICY_TARGET_ENTRIES]. The rest of a row is padded with the column past the last head and 0.
+# [[[0, 3], [], [], [369], []]], [[[0.4, 0.6], [], [], [0.6], []]] -> [[0, 3, 1011, 1021, ...]], [[0.4, 0.6, 0.6, 0, ...]]
+def policy_target_entries(split_samples, split_policies):
+    heads = [head for split_sample in split_samples for head in split_sample]
+    lengths = np.fromiter((len(head) for head in heads), dtype=np.int64, count=len(heads))
+    # the champion decider gives its entries as strings
+    entries = np.asarray([entry for head in heads for entry in head], dtype=np.int64)
+    values = np.asarray([value for split_policy in split_policies for head in split_policy for value in head],
+                        dtype=np.float32)
+
+    offsets = np.tile(POLICY_TARGET_OFFSETS, len(split_samples))
+    step_lengths = lengths.reshape(len(split_samples), -1).sum(axis=1)
+    rows = np.repeat(np.arange(len(split_samples)), step_lengths)
+    positions = np.arange(len(entries)) - np.repeat(np.cumsum(step_lengths) - step_lengths, step_lengths)
+
+    columns = np.full((len(split_samples), MAX_POLICY_TARGET_ENTRIES), sum(POLICY_TARGET_HEADS), dtype=np.int32)
+    policy = np.zeros((len(split_samples), MAX_POLICY_TARGET_ENTRIES), dtype=np.float32)
+    columns[rows, positions] = np.repeat(offsets, lengths) + entries
+    policy[rows, positions] = values
+    return columns, policy
+
+
+# mapping is (num_dims, [(batch_size, sampled_dim) ...]) policy head indices, see split_sample_set
+# policy_logits is (num_dims, [(batch_size, dim) ...])
+# Returns the log softmax of the policy at the sampled indices, (num_dims, [(batch_size, sampled_dim) ...])
 def map_output_to_distribution(mapping, policy_logits):
     num_dims = len(config.POLICY_HEAD_SIZES)
     batch_size = len(mapping[0])
+    softmax_op = torch.nn.LogSoftmax(dim=-1)
 
     sampled_policy = []
 
     for dim in range(num_dims):
-        batch_sampled_dim = []
-        for batch_idx in range(batch_size):
-            softmax_op = torch.nn.LogSoftmax(dim=-1)  # This may be able to be called outside this loop
-            local_dim = softmax_op(policy_logits[dim][batch_idx])
-            local_mapping = mapping[dim][batch_idx]
-
-            sampled_dim = []
-
-            for action in local_mapping:
-                mapped_idx = action_to_idx(action, dim)
-                sampled_dim.append(local_dim[mapped_idx])
-
-            batch_sampled_dim.append(sampled_dim)
-
+        local_dim = softmax_op(policy_logits[dim])
+        batch_sampled_dim = [local_dim[batch_idx][torch.tensor(mapping[dim][batch_idx], dtype=torch.int64)]
+                             for batch_idx in range(batch_size)]
         sampled_policy.append(batch_sampled_dim)
 
     return sampled_policy
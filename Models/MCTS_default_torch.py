@@ -1,11 +1,29 @@
 import config
 import numpy as np
 from Models.MCTS_torch import MCTS
+import Models.MCTS_Util as util
 
 class Default_MCTS(MCTS):
     def __init__(self, network):
         super().__init__(network)
-        self.default_string_mapping = []
+        self.default_mapping = []
+        # The champion decider actions do not fit the action ids of MCTS_Util, so the tree gets the position of
+        # the action in this list instead. Filled by sample and cleared at the start of every policy call.
+        self.sampled_actions = []
+        # the positions in sampled_actions change from one policy call to the next, so a tree can not be carried over
+        self.tree_reuse = False
+        # the champion decider samples its own action space
+        self.native_search = False
+
+    def policy(self, observation):
+        self.sampled_actions = []
+        actions, target_policy, action_mapping, root_values = super().policy(observation)
+        actions = [self.sampled_actions[action] for action in actions]
+        action_mapping = [[self.sampled_actions[action] for action in local] for local in action_mapping]
+        return actions, target_policy, action_mapping, root_values
+
+    def action_vectors(self, action_ids):
+        return np.array([self.sampled_actions[action].split("_") for action in action_ids], dtype=np.int64)
 
     @staticmethod
     def encode_action_to_str(policy_logits, mask):
@@ -13,39 +31,38 @@ class Default_MCTS(MCTS):
 
     # TODO: Duplication value and shink size of array with duplicates.
     # I don't expect duplicates too often with an action space size of 2^57 but it's possible.
-    def sample(self, policy_logits, string_mapping, num_samples):
+    # Every head of every player is sampled at once: the heads are padded to the widest one and one inverse
+    # transform over [players, samples, heads] draws all of them.
+    def sample(self, policy_logits, mapping, num_samples):
         batch_size = len(policy_logits[0])  # 8
 
-        output_logits = []
-        output_string_mapping = []
-        output_byte_mapping = []
-        policy_sizes = []
-
-        for idx in range(batch_size):
-            local_byte = []
-            sampled_action = []
-            probs = self.softmax_stable(policy_logits[0][idx])
-            policy_range = np.arange(stop=len(policy_logits[0][idx]))
-
-            samples = np.random.choice(a=policy_range, p=probs, size=num_samples)
-            for sample in samples:
-                sampled_action.append(str(sample))
-
-            for i in range(1, len(config.CHAMP_DECIDER_ACTION_DIM)):
-                probs = self.softmax_stable(policy_logits[i][idx])
-                policy_range = np.arange(stop=len(policy_logits[i][idx]))
+        # [players, heads, widest head], the padding gets no weight
+        logits = np.concatenate([np.asarray(head, dtype=np.float32).reshape(batch_size, -1) for head in policy_logits]
+                                + [np.full((batch_size, 1), util.PAD_LOGIT, dtype=np.float32)], axis=1)
+        logits = logits[:, HEAD_COLUMNS]
+        probs = np.exp(logits - logits.max(axis=2, keepdims=True))
+        cdf = np.cumsum(probs, axis=2)
+        cdf /= cdf[:, :, -1:]
+        draws = np.random.random((batch_size, num_samples, len(HEAD_SIZES), 1))
+        samples = np.minimum((draws >= cdf[:, None]).sum(axis=3), HEAD_SIZES - 1)
 
-                samples = np.random.choice(a=policy_range, p=probs, size=num_samples)
+        # "a_b_c_..." with one digit per head
+        characters = np.full((batch_size * num_samples, 2 * len(HEAD_SIZES) - 1), ord("_"), dtype=np.uint8)
+        characters[:, ::2] = samples.reshape(batch_size * num_samples, -1) + ord("0")
+        sampled_action = characters.view("S{}".format(characters.shape[1])).ravel().astype(str).tolist()
 
-                for k, sample in enumerate(samples):
-                    sampled_action[k] = sampled_action[k] + "_" + str(sample)
+        output_logits = np.full((batch_size, num_samples), 1 / num_samples, dtype=np.float32)
+        output_mapping = len(self.sampled_actions) + np.arange(batch_size * num_samples).reshape(batch_size, -1)
+        self.sampled_actions.extend(sampled_action)
+        policy_sizes = np.full(batch_size, num_samples)
 
-            for sample in enumerate(sampled_action):
-                local_byte.append(bytes(str(sample[1]), "utf-8"))
+        return output_logits, output_mapping, policy_sizes
 
-            output_logits.append([((1 / num_samples) * num_samples)])
-            output_string_mapping.append(sampled_action)
-            output_byte_mapping.append(local_byte)
-            policy_sizes.append(num_samples)
 
-        return output_logits, output_string_mapping, output_byte_mapping, policy_sizes
+# The champion decider heads and, for each of them, the column of each of its entries in the concatenated heads.
+# Entries past the end of a head point to the padding column after the last head. Every head has fewer than 10
+# entries, so an action is written with one digit per head.
+HEAD_SIZES = np.array(config.CHAMP_DECIDER_ACTION_DIM)
+HEAD_COLUMNS = np.where(np.arange(HEAD_SIZES.max()) < HEAD_SIZES[:, None],
+                        (np.cumsum(HEAD_SIZES) - HEAD_SIZES)[:, None] + np.arange(HEAD_SIZES.max()), HEAD_SIZES.sum())
+assert HEAD_SIZES.max() <= 10
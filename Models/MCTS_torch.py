@@ -18,18 +18,31 @@ EXPLANATION OF MCTS:
 
 
 class MCTS:
-    def __init__(self, network):
+    def __init__(self, network, gumbel=False):
         self.network = network
         self.times = [0] * 6
         self.NUM_ALIVE = config.NUM_PLAYERS
         self.num_actions = 0
         self.ckpt_time = time.time_ns()
-        self.default_string_mapping = util.create_default_mapping()
         self.max_depth_search = 0
-
+        # Run the simulations inside the c++ tree (tree.batch_search), which samples the children itself the same
+        # way as sample. Subclasses with a sample of their own use the python loop.
+        self.native_search = True
+        # Gumbel MuZero instead of PUCT at the root, see gumbel_policy
+        self.gumbel = gumbel
+        self.num_simulations = config.GUMBEL_SIMULATIONS if gumbel else config.NUM_SIMULATIONS
+        # the sequential halving of a Gumbel search counts the visits of the root children from 0
+        self.tree_reuse = config.MCTS_TREE_REUSE and not gumbel
+        # [roots, hidden state pool, position of the chosen action per player, players] of the last search, for
+        # tree reuse
+        self.previous_search = None
+
+    # observation is [observations, masks] or [observations, masks, players] with the keys of the players of the
+    # rows, see DataWorker.observation_to_input. The tree is only reused for the same players in the same order.
     def policy(self, observation):
         with torch.no_grad():
             self.NUM_ALIVE = observation[0]["shop"].shape[0]
+            players = list(observation[2]) if len(observation) > 2 else None
 
             # 0.02 seconds
             network_output = self.network.initial_inference(observation[0])
@@ -39,59 +52,127 @@ class MCTS:
             policy_logits = [output_head.cpu().numpy() for output_head in network_output["policy_logits"]]
 
             # 0.01 seconds
-            policy_logits_pool, string_mapping = self.encode_action_to_str(policy_logits, observation[1])
+            policy_logits_pool, legal_mapping = self.encode_action_to_str(policy_logits, observation[1])
 
-            noises = [
-                [
-                    np.random.dirichlet([config.ROOT_DIRICHLET_ALPHA] * len(policy_logits_pool[i][j])
-                                        ).astype(np.float32).tolist()
-                    for j in range(self.NUM_ALIVE)
-                ]
-                for i in range(len(policy_logits_pool))
-            ]
+            if self.gumbel:
+                return self.gumbel_policy(network_output, reward_pool, policy_logits_pool, legal_mapping)
 
             # Policy Logits -> [ [], [], [], [], [], [], [], [],]
 
-            policy_logits_pool = self.add_exploration_noise(policy_logits_pool, noises)
+            policy_logits_pool = self.add_exploration_noise(policy_logits_pool)
 
             # 0.003 seconds
-            policy_logits_pool, string_mapping, mappings, policy_sizes = \
-                self.sample(policy_logits_pool, string_mapping, config.NUM_SAMPLES)
+            policy_logits_pool, action_mapping, policy_sizes = \
+                self.sample(policy_logits_pool, legal_mapping, config.NUM_SAMPLES)
 
             # less than 0.0001 seconds
             # Setup specialised roots datastructures, format: env_nums, action_space_size, num_simulations
             # Number of agents, previous action, number of simulations for memory purposes
-            roots_cpp = tree.Roots(self.NUM_ALIVE, config.NUM_SIMULATIONS, config.NUM_SAMPLES)
+            if self.tree_reuse:
+                # room for the subtree copied over from the previous search
+                roots_cpp = tree.Roots(self.NUM_ALIVE, 3 * self.num_simulations, util.MAX_CHILDREN)
+            else:
+                roots_cpp = tree.Roots(self.NUM_ALIVE, self.num_simulations, util.MAX_CHILDREN)
 
             # 0.0002 seconds
             # prepare the nodes to feed them into batch_mcts,
             # for statement to deal with different lengths due to masking.
-            roots_cpp.prepare_no_noise(reward_pool, policy_logits_pool, mappings, policy_sizes)
-
-            # Output for root node
-            hidden_state_pool = network_output["hidden_state"]
+            roots_cpp.prepare_no_noise(reward_pool, policy_logits_pool.tolist(), action_mapping.tolist(),
+                                       policy_sizes.tolist())
+
+            # minimax value storage data structure
+            min_max_stats_lst = tree.MinMaxStatsList(self.NUM_ALIVE)
+
+            # Start from what the previous search found below the action each player took. The copied nodes keep
+            # their hidden states in the rows after the ones this search fills.
+            reused_states = None
+            if self.tree_reuse and self.previous_search is not None and players is not None and \
+                    self.previous_search[3] == players:
+                previous_roots, previous_pool, previous_actions, _ = self.previous_search
+                reused_states = [previous_pool, roots_cpp.reuse(previous_roots, previous_actions,
+                                                                self.num_simulations + 1,
+                                                                2 * (self.num_simulations + 1), config.DISCOUNT,
+                                                                min_max_stats_lst)]
 
             # set up nodes to be able to find and select actions
-            self.run_batch_mcts(roots_cpp, hidden_state_pool)
+            hidden_state_pool = self.run_batch_mcts(roots_cpp, network_output["hidden_state"], min_max_stats_lst,
+                                                    reused_states)
             roots_distributions = roots_cpp.get_distributions()
 
             root_values = roots_cpp.get_values()
 
             actions = []
+            action_positions = []
             target_policy = []
             temp = self.visit_softmax_temperature()  # controls the way actions are chosen
             deterministic = False  # False = sample distribution, True = argmax
             for i in range(self.NUM_ALIVE):
                 distributions = roots_distributions[i]
                 action = self.select_action(distributions, temperature=temp, deterministic=deterministic)
-                actions.append(string_mapping[i][action])
-                target_policy.append([x / config.NUM_SIMULATIONS for x in distributions])
+                actions.append(int(action_mapping[i][action]))
+                action_positions.append(int(action))
+                # the visits add up to NUM_SIMULATIONS, plus the copied ones when the tree is reused
+                total_visits = sum(distributions)
+                target_policy.append([x / total_visits for x in distributions])
+
+            if self.tree_reuse:
+                self.previous_search = [roots_cpp, hidden_state_pool, action_positions, players]
 
             # Notes on possibilities for other dimensions at the bottom
             self.num_actions += 1
-            return actions, target_policy, string_mapping, root_values
+            sampled_actions = [action_mapping[i][:policy_sizes[i]].tolist() for i in range(self.NUM_ALIVE)]
+            return actions, target_policy, sampled_actions, root_values
+
+    """
+    Description - Gumbel MuZero (Danihelka et al. 2022, Policy improvement by planning with Gumbel).
+                  The root gets the GUMBEL_NUM_CONSIDERED actions with the highest log policy + Gumbel noise out of
+                  every legal action as its children, which samples them without replacement instead of adding
+                  Dirichlet noise. The simulations go to those children by sequential halving (see
+                  util.considered_visits), PUCT picks the path below them. The action is the child that is left
+                  at the end and the policy target is softmax(log policy + sigma(completed q)) over the children.
+                  Takes what policy has done before the sampling and returns what policy returns.
+    """
+    def gumbel_policy(self, network_output, reward_pool, policy_logits_pool, legal_mapping):
+        log_policy = util.joint_log_policy(policy_logits_pool, legal_mapping)
+        gumbels = np.random.gumbel(size=log_policy.shape)
+        policy_sizes = np.minimum(np.isfinite(log_policy).sum(axis=1), config.GUMBEL_NUM_CONSIDERED)
+        rows = np.arange(self.NUM_ALIVE)[:, None]
+        action_mapping = np.argsort(-(log_policy + gumbels), axis=1)[:, :policy_sizes.max()]
+
+        roots_cpp = tree.Roots(self.NUM_ALIVE, self.num_simulations, util.MAX_CHILDREN)
+        # the padding past policy_sizes is never read
+        roots_cpp.prepare_no_noise(reward_pool, log_policy[rows, action_mapping].tolist(), action_mapping.tolist(),
+                                   policy_sizes.tolist())
+        roots_cpp.prepare_gumbel(gumbels[rows, action_mapping].tolist(),
+                                 [util.considered_visits(int(size), self.num_simulations) for size in policy_sizes],
+                                 np.array(network_output["value"]).reshape(-1).tolist(),
+                                 config.GUMBEL_C_VISIT, config.GUMBEL_C_SCALE)
+
+        self.run_batch_mcts(roots_cpp, network_output["hidden_state"])
+
+        positions = roots_cpp.get_gumbel_actions(config.DISCOUNT)
+        target_policy = roots_cpp.get_gumbel_policies(config.DISCOUNT)
+        root_values = roots_cpp.get_values()
+        actions = [int(action_mapping[i][positions[i]]) for i in range(self.NUM_ALIVE)]
+
+        self.num_actions += 1
+        sampled_actions = [action_mapping[i][:policy_sizes[i]].tolist() for i in range(self.NUM_ALIVE)]
+        return actions, target_policy, sampled_actions, root_values
 
-    def run_batch_mcts(self, roots_cpp, hidden_state_pool):
+    """
+    Description - Runs self.num_simulations searches from the prepared roots.
+    Inputs      - roots_cpp: tree.Roots
+                  hidden_state_pool: Dict
+                      hidden states of the roots per label
+                  min_max_stats_lst: tree.MinMaxStatsList
+                      made here if None
+                  reused_states: List
+                      [hidden state pool of the previous search, [old x, old y, new x] from roots_cpp.reuse]
+                      or None if the tree is not reused
+    Outputs     - hidden_state_pool: Dict
+                      the hidden state of every node of the search per label
+    """
+    def run_batch_mcts(self, roots_cpp, hidden_state_pool, min_max_stats_lst=None, reused_states=None):
         # preparation
         num = roots_cpp.num
         # config variables
@@ -101,10 +182,67 @@ class MCTS:
         hidden_state_index_x = 0
 
         # minimax value storage data structure
-        min_max_stats_lst = tree.MinMaxStatsList(num)
-        hidden_state_pool = [hidden_state_pool]
-        # go through the tree NUM_SIMULATIONS times
-        for _ in range(config.NUM_SIMULATIONS):
+        if min_max_stats_lst is None:
+            min_max_stats_lst = tree.MinMaxStatsList(num)
+
+        # The hidden state of every node of the search, [num_simulations + 1, num, hidden] per label on the device.
+        # Row x holds the states the tree gives hidden_state_index_x = x, row 0 is the root.
+        # With tree reuse another num_simulations + 1 rows hold the states of the nodes copied from the last search.
+        root_states = hidden_state_pool
+        device = root_states[config.OBSERVATION_LABELS[0]].device
+        pool_rows = 2 * (self.num_simulations + 1) if self.tree_reuse else self.num_simulations + 1
+        hidden_state_pool = {label: torch.empty((pool_rows, num, config.HIDDEN_STATE_SIZE),
+                                                dtype=root_states[label].dtype, device=device)
+                             for label in config.OBSERVATION_LABELS}
+        for label in config.OBSERVATION_LABELS:
+            hidden_state_pool[label][0] = root_states[label]
+        # the same pools as one row per node for index_select
+        flat_hidden_state_pool = {label: pool.view(-1, config.HIDDEN_STATE_SIZE)
+                                  for label, pool in hidden_state_pool.items()}
+        if reused_states is not None and len(reused_states[1][0]) > 0:
+            previous_pool, (old_x, old_y, new_x) = reused_states
+            old_index = torch.as_tensor(np.asarray(old_x) * num + np.asarray(old_y), device=device)
+            new_index = torch.as_tensor(np.asarray(new_x) * num + np.asarray(old_y), device=device)
+            for label, pool in flat_hidden_state_pool.items():
+                pool[new_index] = previous_pool[label].view(-1, config.HIDDEN_STATE_SIZE)[old_index]
+        # One network call for the leaves of a simulation. The states it makes go to row hidden_state_index_x.
+        def evaluate(hidden_state_index_x, hidden_state_index_x_lst, hidden_state_index_y_lst, last_action):
+            # obtain the states for leaf nodes, one gather per label
+            leaf_index = np.asarray(hidden_state_index_x_lst) * num + np.asarray(hidden_state_index_y_lst)
+            leaf_index = torch.as_tensor(leaf_index, device=device)
+            tensors_states = {label: pool.index_select(0, leaf_index) for label, pool in flat_hidden_state_pool.items()}
+
+            # Inside the search tree we use the dynamics function to obtain the next
+            # hidden state given an action and the previous hidden state.
+            # 0.003 seconds
+            network_output = self.network.recurrent_inference(tensors_states, self.action_vectors(last_action))
+
+            value_max, value_min = network_output["value"].max().item(), network_output["value"].min().item()
+            if value_max - value_min > 150.:
+                print(f"EUREKA, VALUES MAX: {value_max}, AND MIN: {value_min}, RANGE {value_max - value_min}")
+
+            # add nodes to the pool after each search
+            for label in config.OBSERVATION_LABELS:
+                hidden_state_pool[label][hidden_state_index_x] = network_output["hidden_state"][label]
+            return network_output
+
+        if self.native_search:
+            # the tree runs every simulation itself and only comes back here for the network
+            def native_evaluate(hidden_state_index_x, hidden_state_index_x_lst, hidden_state_index_y_lst, last_action):
+                network_output = evaluate(hidden_state_index_x, hidden_state_index_x_lst, hidden_state_index_y_lst,
+                                          last_action)
+                return network_output["reward"].cpu().numpy(), network_output["value"].cpu().numpy(), \
+                    np.concatenate([output_head.cpu().numpy() for output_head in network_output["policy_logits"]],
+                                   axis=1)
+
+            self.max_depth_search = tree.batch_search(roots_cpp, self.num_simulations, pb_c_base, pb_c_init,
+                                                      discount, min_max_stats_lst, config.POLICY_HEAD_SIZES,
+                                                      util.ACTION_OFFSETS.tolist(), config.NUM_SAMPLES,
+                                                      np.random.randint(2 ** 31), native_evaluate)
+            return hidden_state_pool
+
+        # go through the tree num_simulations times
+        for _ in range(self.num_simulations):
             # prepare a result wrapper to transport results between python and c++ parts
             results = tree.ResultsWrapper(num)
             # 0.001 seconds
@@ -113,54 +251,54 @@ class MCTS:
                 tree.batch_traverse(roots_cpp, pb_c_base, pb_c_init, discount, min_max_stats_lst, results)
 
             self.max_depth_search = sum(results.get_search_len()) / len(results.get_search_len())
-            num_states = len(hidden_state_index_x_lst)
-            tensors_states = {label: torch.empty((num_states, config.HIDDEN_STATE_SIZE)).to(config.DEVICE)
-                              for label in config.OBSERVATION_LABELS}
-
-            # obtain the states for leaf nodes
-            for ix, iy, idx in zip(hidden_state_index_x_lst, hidden_state_index_y_lst, range(num_states)):
-                for label in config.OBSERVATION_LABELS:
-                    tensors_states[label][idx] = hidden_state_pool[ix][label][iy]
 
-            # Inside the search tree we use the dynamics function to obtain the next
-            # hidden state given an action and the previous hidden state.
-            last_action = np.asarray(last_action)
-
-            # 0.003 seconds
-            network_output = self.network.recurrent_inference(tensors_states, last_action)
+            hidden_state_index_x += 1
+            network_output = evaluate(hidden_state_index_x, hidden_state_index_x_lst, hidden_state_index_y_lst,
+                                      last_action)
 
             reward_pool = network_output["reward"].reshape(-1).tolist()
             value_pool = network_output["value"].reshape(-1).tolist()
-            diff = max(value_pool) - min(value_pool)
-            if diff > 150.:
-                print(f"EUREKA, VALUES MAX: {max(value_pool)}, AND MIN: {min(value_pool)}, RANGE {diff}")
 
             policy_logits = [output_head.cpu().numpy() for output_head in network_output["policy_logits"]]
 
             # 0.014 seconds
-            policy_logits, _, mappings, policy_sizes = \
-                self.sample(policy_logits, self.default_string_mapping, config.NUM_SAMPLES)
-
-            # These assignments take 0.0001 > time
-            # add nodes to the pool after each search
-            hidden_states_nodes = network_output["hidden_state"]
-            hidden_state_pool.append(hidden_states_nodes)
-
-            hidden_state_index_x += 1
+            policy_logits, mappings, policy_sizes = self.sample(policy_logits, None, config.NUM_SAMPLES)
 
             # 0.001 seconds
             # backpropagation along the search path to update the attributes
-            tree.batch_back_propagate(hidden_state_index_x, discount, reward_pool, value_pool, policy_logits,
-                                      min_max_stats_lst, results, mappings, policy_sizes)
+            tree.batch_back_propagate(hidden_state_index_x, discount, reward_pool, value_pool, policy_logits.tolist(),
+                                      min_max_stats_lst, results, mappings.tolist(), policy_sizes.tolist())
+
+        return hidden_state_pool
 
-    def add_exploration_noise(self, policy_logits, noises):
+    # action ids from the tree -> [type, a, b] actions for the dynamics network
+    def action_vectors(self, action_ids):
+        return util.ACTION_VECTORS[np.asarray(action_ids, dtype=np.int64)]
+
+    """
+    Description - Mixes Dirichlet noise into the legal policy of the root, one draw per (policy head, player).
+                  Every row of every head is drawn at once: a Dirichlet draw is a row of Gamma draws divided by
+                  their sum, so one gamma call covers all of them and one bincount gives the sums.
+    Inputs      - policy_logits: List
+                      per head, the policy of each player over its legal actions (from encode_action_to_str)
+    Outputs     - policy_logits: List
+                      the same shape, each row an array with the noise mixed in
+    """
+    @staticmethod
+    def add_exploration_noise(policy_logits):
         exploration_fraction = config.ROOT_EXPLORATION_FRACTION
-        for i in range(len(noises)):  # Batch
-            for j in range(len(noises[i])):  # Policy Dims
-                for k in range(len(noises[i][j])):
-                    policy_logits[i][j][k] = policy_logits[i][j][k] * (1 - exploration_fraction) + \
-                        noises[i][j][k] * exploration_fraction
-        return policy_logits
+        rows = [row for head in policy_logits for row in head]
+        lengths = np.array([len(row) for row in rows])
+        if lengths.sum() == 0:
+            return policy_logits
+        row_of_entry = np.repeat(np.arange(len(rows)), lengths)
+        noise = np.random.gamma(config.ROOT_DIRICHLET_ALPHA, size=lengths.sum())
+        noise /= np.bincount(row_of_entry, weights=noise, minlength=len(rows))[row_of_entry]
+        logits = np.concatenate([np.asarray(row, dtype=np.float64) for row in rows])
+        logits = logits * (1 - exploration_fraction) + noise * exploration_fraction
+        rows = np.split(logits.astype(np.float32), np.cumsum(lengths)[:-1])
+        heads = np.cumsum([0] + [len(head) for head in policy_logits])
+        return [rows[start:end] for start, end in zip(heads[:-1], heads[1:])]
 
     """
     Description - select action from the root visit counts.
@@ -202,11 +340,8 @@ class MCTS:
     Outputs     - Actions: List
                       A policy including actions that are legal in the field.
                   Mappings: List
-                      A byte mapping that maps those actions to a single 3 dimensional action that can be used in the 
-                      simulator as well as in the recurrent inference. This gets sent to the c++ side
-                  Seconds Mappings: List
-                      A string mapping that is used in the same way but for the python side. This gets used on the 
-                      values that get sent back to the AI_Interface
+                      The index in the policy head of each of those actions. Sample turns these into action ids,
+                      which is what the c++ side, the buffers and the trainer use.
     """
     @staticmethod
     def encode_action_to_str(policy_logits, mask):
@@ -231,133 +366,22 @@ class MCTS:
         # 6. if champion has FULL items on bench
         #
 
-        # policy_logits [(8, 7), (8, 5), (8, 667), (8, 370), (8, 38)]
+        # policy_logits [(8, 7), (8, 5), (8, 630), (8, 370), (8, 9)]
         batch_size = policy_logits[0].shape[0]  # 8
-        masked_policy_logits = [[]]  # Start with empty type_dim
-        masked_policy_mappings = [[]]
+        legal = util.legal_action_masks(mask)
+        masked_policy_logits = []
+        masked_policy_mappings = []
 
         for dim in range(len(policy_logits)):  # 5
             masked_dim = []  # (8, ?)
             masked_dim_mapping = []
-
-            if dim == 0:  # We deal with type masking at the end
-                continue
-
-            if dim == 1:  # Shop Masking
-                for idx in range(batch_size):
-                    local_shop = []
-                    local_shop_mapping = []
-                    for i in range(5):
-                        if mask[idx][1][i] and mask[idx][5][1]:
-                            local_shop.append(policy_logits[dim][idx][i])
-                            local_shop_mapping.append(f"_{i}")
-                    masked_dim.append(local_shop)
-                    masked_dim_mapping.append(local_shop_mapping)
-
-            elif dim == 2:  # Board Masking
-                for idx in range(batch_size):
-                    local_board = []
-                    local_board_mapping = []
-                    board_counter = 0
-                    # Board masking
-                    # For all board + bench slots...
-                    for a in range(28):
-                        # rest of board slot locs for moving, last for sale
-                        for b in range(a, 37):
-                            if a == b:
-                                continue
-                            # if we are trying to move a non-existent champion, skip
-                            if not ((mask[idx][2][a]) or
-                                    ((b < 28 and mask[idx][2][b]) or (b > 27 and mask[idx][3][b - 28]))):
-                                board_counter += 1
-                                continue
-                            # if we're doing a bench to board move and board is full
-                            # and there is no champ at destination, skip
-                            if b > 27 and (not mask[idx][5][0] and not mask[idx][2][a]):
-                                board_counter += 1
-                                continue
-                            # if we're doing a board to bench move and there is no champion at that bench location
-                            if a < 28 and b > 27 and not mask[idx][3][b - 28]:
-                                board_counter += 1
-                                continue
-                            local_board.append(policy_logits[dim][idx][board_counter])
-                            local_board_mapping.append(f"_{a}_{b}")
-                            board_counter += 1
-                    masked_dim.append(local_board)
-                    masked_dim_mapping.append(local_board_mapping)
-
-            elif dim == 3:  # Item masking
-                for idx in range(batch_size):
-                    local_item = []
-                    local_item_mapping = []
-                    # For all board + bench slots...
-                    item_counter = 0
-                    for a in range(37):
-                        # For every item slot...
-                        for b in range(10):
-                            # if there is a unit and there is an item
-                            if not (((a < 28 and mask[idx][2][a] and not mask[idx][9][a] and not mask[idx][10][a])
-                                     or (a > 27 and mask[idx][3][a - 28])) and mask[idx][4][b]):
-                                item_counter += 1
-                                continue
-                            # if it is a legal action to put that item on the unit
-                            if (mask[idx][7][a] and mask[idx][8][b]) or mask[idx][6][a]:
-                                item_counter += 1
-                                continue
-                            local_item.append(policy_logits[dim][idx][item_counter])
-                            local_item_mapping.append(f"_{a}_{b}")
-                            item_counter += 1
-                    masked_dim.append(local_item)
-                    masked_dim_mapping.append(local_item_mapping)
-
-            elif dim == 4:  # Sell unit masking
-                #  Sell unit masking
-                for idx in range(batch_size):
-                    local_sell = []
-                    local_sell_mapping = []
-                    for a in range(9):  # Only include board commands
-                        # If unit exists
-                        if not (mask[idx][3][a]):
-                            continue
-                        local_sell.append(policy_logits[dim][idx][a])
-                        local_sell_mapping.append(f"_{a}")
-                    masked_dim.append(local_sell)
-                    masked_dim_mapping.append(local_sell_mapping)
-
+            for idx in range(batch_size):
+                legal_idx = np.flatnonzero(legal[dim][idx])
+                masked_dim.append(policy_logits[dim][idx][legal_idx].tolist())
+                masked_dim_mapping.append(legal_idx.tolist())
             masked_policy_logits.append(masked_dim)
             masked_policy_mappings.append(masked_dim_mapping)
 
-        type_dim = []
-        type_dim_mapping = []
-
-        for idx in range(batch_size):
-            local_type_dim = []
-            local_type_dim_mapping = []
-
-            # Always append pass action
-            local_type_dim.append(policy_logits[0][idx][0])
-            local_type_dim_mapping.append("0")
-
-            # For shop, board, item, and sell
-            for i in range(1, 5):
-                if masked_policy_logits[i][idx]:
-                    local_type_dim.append(policy_logits[0][idx][i])
-                    local_type_dim_mapping.append(f"{i}")
-
-            if mask[idx][0][4]:
-                local_type_dim.append(policy_logits[0][idx][5])
-                local_type_dim_mapping.append("5")
-
-            if mask[idx][0][5]:
-                local_type_dim.append(policy_logits[0][idx][6])
-                local_type_dim_mapping.append("6")
-
-            type_dim.append(local_type_dim)
-            type_dim_mapping.append(local_type_dim_mapping)
-
-        masked_policy_logits[0] = type_dim
-        masked_policy_mappings[0] = type_dim_mapping
-
         return masked_policy_logits, masked_policy_mappings
 
     """
@@ -367,87 +391,63 @@ class MCTS:
                   to 0 and comment out the following for loops or keep those variables at 6 and 2 and leave the for
                   loops in. The first option is a pure sample with no specific core actions. The second option gives 
                   you a set of core options to use. 
+                  All rows and policy heads are sampled at once and the samples are merged by action id.
     Inputs      - policy_logits - List
                       Output to either initial_inference or recurrent_inference for policy
-                  string_mapping - List
-                      A map that is equal to policy_logits.shape[-1] in size to map to the specified action
-                  byte_mapping - List
-                      Same as string mapping but used on the c++ side of the code
+                  mapping - List
+                      The index in the policy head of each entry of policy_logits, from encode_action_to_str.
+                      None when policy_logits are the whole unmasked heads.
                   num_samples - Int
                       Typically set to config.NUM_SAMPLES. Number of samples to use per expansion of the tree
-    Outputs     - output_logits - List
-                      The sampled policy logits 
-                  output_string_mapping - List
-                      The sampled string mapping. Size = output.logits.shape
-                  output_byte_mapping - List
-                      Same as output_string_mapping but for c++ side
-                  policy_sizes - List
+    Outputs     - output_logits - np.ndarray [batch_size, max samples]
+                      The sampled policy logits, padded with 0
+                  output_mapping - np.ndarray [batch_size, max samples]
+                      The action id (see MCTS_Util.ACTION_OFFSETS) of each sample, padded with 0
+                  policy_sizes - np.ndarray [batch_size]
                       Number of samples per player, can change if legal actions < num_samples
     """
-    def sample(self, policy_logits, string_mapping, num_samples):
-        # policy_logits [(8, 7), (8, 5), (8, 667), (8, 370), (8, 38)]
-        batch_size = len(policy_logits[0])  # 8
-
-        output_logits = []
-        output_string_mapping = []
-        output_byte_mapping = []
-        policy_sizes = []
-
-        for idx in range(batch_size):
-            local_logits = []
-            local_string = []
-            local_byte = []
-
-            probs = self.softmax_stable(policy_logits[0][idx])
-            policy_range = np.arange(stop=len(policy_logits[0][idx]))
-
-            samples = np.random.choice(a=policy_range, p=probs, size=num_samples)  # size 25
-            counts = np.bincount(samples, minlength=len(policy_logits[0][idx]))
-
-            for i, count in enumerate(counts):
-                dim_base_string = string_mapping[0][idx][i]
-                dim_idx_mapping = int(dim_base_string)
-
-                if dim_idx_mapping in config.NEEDS_2ND_DIM:
-                    local_dim_logits = []
-                    local_dim_string = []
-                    local_dim_byte = []
-
-                    dim_policy_logits = policy_logits[dim_idx_mapping][idx]
-
-                    dim_probs = self.softmax_stable(dim_policy_logits)
-                    dim_range = np.arange(stop=len(dim_policy_logits))
-
-                    dim_samples = np.random.choice(a=dim_range, p=dim_probs, size=count)
-
-                    for dim_sample in dim_samples:
-                        sampled_action = dim_base_string + string_mapping[dim_idx_mapping][idx][dim_sample]
-
-                        isSampled = False
-                        for j, action in enumerate(local_dim_string):
-                            if sampled_action == action:
-                                local_dim_logits[j] += (1 / num_samples)
-                                isSampled = True
-                                break
-                        if not isSampled:
-                            local_dim_logits.append((1 / num_samples))
-                            local_dim_string.append(sampled_action)
-                            local_dim_byte.append(bytes(sampled_action, "utf-8"))
-
-                    local_logits.extend(local_dim_logits)
-                    local_string.extend(local_dim_string)
-                    local_byte.extend(local_dim_byte)
-                else:
-                    local_logits.append(((1 / num_samples) * count))
-                    local_string.append(dim_base_string)
-                    local_byte.append(bytes(dim_base_string, "utf-8"))
-
-            output_logits.append(local_logits)
-            output_string_mapping.append(local_string)
-            output_byte_mapping.append(local_byte)
-            policy_sizes.append(len(local_logits))
-
-        return output_logits, output_string_mapping, output_byte_mapping, policy_sizes
+    def sample(self, policy_logits, mapping, num_samples):
+        # policy_logits [(8, 7), (8, 5), (8, 630), (8, 370), (8, 9)]
+        if mapping is None:
+            heads = [(logits, np.broadcast_to(np.arange(logits.shape[1]), logits.shape),
+                      np.full(logits.shape[0], logits.shape[1])) for logits in policy_logits]
+        else:
+            heads = [util.pad_head(logits, head_mapping) for logits, head_mapping in zip(policy_logits, mapping)]
+        type_logits, type_index, type_lengths = heads[0]
+        batch_size = len(type_lengths)  # 8
+        rows = np.arange(batch_size)[:, None]
+
+        # the type of every sample, then the entry of the policy head of that type if it has one
+        types = type_index[rows, util.sample_categorical(type_logits, type_lengths, num_samples)]
+        sampled_ids = util.ACTION_OFFSETS[types]
+        for dim in config.NEEDS_2ND_DIM:
+            of_dim = types == dim
+            if of_dim.any():
+                dim_logits, dim_index, dim_lengths = heads[dim]
+                dim_samples = dim_index[rows, util.sample_categorical(dim_logits, dim_lengths, num_samples)]
+                sampled_ids = np.where(of_dim, sampled_ids + dim_samples, sampled_ids)
+
+        # the types without a second head are always children of the node, even if they were not sampled
+        single = ~np.isin(type_index, config.NEEDS_2ND_DIM) & (np.arange(type_index.shape[1]) < type_lengths[:, None])
+        single_ids = util.ACTION_OFFSETS[type_index]
+
+        # merge the samples of each row by action id, one key per (row, action id)
+        keys = np.concatenate([(rows * util.NUM_ACTIONS + sampled_ids).ravel(),
+                               (rows * util.NUM_ACTIONS + single_ids)[single]])
+        weights = np.concatenate([np.ones(sampled_ids.size), np.zeros(np.count_nonzero(single))])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+
+        key_rows = keys // util.NUM_ACTIONS
+        policy_sizes = np.bincount(key_rows, minlength=batch_size)
+        columns = np.arange(len(keys)) - (np.cumsum(policy_sizes) - policy_sizes)[key_rows]
+
+        output_logits = np.zeros((batch_size, policy_sizes.max()), dtype=np.float32)
+        output_logits[key_rows, columns] = counts / num_samples
+        output_mapping = np.zeros((batch_size, policy_sizes.max()), dtype=np.int64)
+        output_mapping[key_rows, columns] = keys % util.NUM_ACTIONS
+
+        return output_logits, output_mapping, policy_sizes
 
     @staticmethod
     def softmax_stable(x):
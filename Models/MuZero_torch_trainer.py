@@ -4,7 +4,7 @@ import collections
 import torch
 import torch.nn.functional as F
 import numpy as np
-from Models.MCTS_Util import split_batch, sample_set_to_idx, create_target_and_mask
+from Models.MCTS_Util import POLICY_TARGET_HEADS
 
 Prediction = collections.namedtuple(
     'Prediction',
@@ -48,7 +48,7 @@ class Trainer(object):
     def train_network(self, batch, train_step):
 
         observation, action_history, value_mask, reward_mask, policy_mask, target_value, target_reward, target_policy, \
-            sample_set, importance_weights, tier_set, final_tier_set, champion_set, position = batch
+            importance_weights, tier_set, final_tier_set, champion_set, position = batch
 
         # disabling this for the moment while I get the rest working, will add back later.
         self.summary_writer.add_scalar('episode_info/average_position', position, train_step)
@@ -57,15 +57,22 @@ class Trainer(object):
 
         predictions = self.compute_forward(observation, action_history)
 
-        sample_set, target_policy = split_batch(sample_set, target_policy)
-
-        self.compute_loss(predictions, target_value, target_reward, target_policy, sample_set,  value_mask,
+        self.compute_loss(predictions, target_value, target_reward, target_policy, value_mask,
                           reward_mask, policy_mask, importance_weights, tier_set, final_tier_set, champion_set)
 
         self.backpropagate()
 
         self.write_summaries(train_step)
 
+        return self.value_errors(target_value, value_mask)
+
+    # |predicted value - target value| for every sample and unroll step, [batch_size, unroll_steps + 1], with the same
+    # 0.001 floor as the errors that the replay buffer gives the samples when they are stored.
+    # The global buffer turns these into the new priorities of the samples.
+    def value_errors(self, target_value, value_mask):
+        value = torch.stack(self.outputs.value, -1).detach().cpu().numpy().reshape(len(target_value), -1)
+        return np.maximum(np.abs(value - target_value) * value_mask, 0.001)
+
     def compute_forward(self, observation, action_history):
         self.network.train()
         grad_scale = 0.5
@@ -107,12 +114,17 @@ class Trainer(object):
 
         return predictions
 
-    def compute_loss(self, predictions, target_value, target_reward, target_policy, sample_set,
+    def compute_loss(self, predictions, target_value, target_reward, target_policy,
                      value_mask, reward_mask, policy_mask, importance_weights, tier_set, final_tier_set, champion_set):
         value_mask = torch.from_numpy(value_mask).to(config.DEVICE)
         reward_mask = torch.from_numpy(reward_mask).to(config.DEVICE)
         policy_mask = torch.from_numpy(policy_mask).to(config.DEVICE)
         importance_weights = torch.from_numpy(importance_weights).to(config.DEVICE)
+        # [batch_size, unroll_steps + 1, entries of all heads], split into the heads one step at a time
+        target_policy = torch.from_numpy(target_policy).to(config.DEVICE)
+        tier_set = torch.from_numpy(tier_set).to(config.DEVICE)
+        final_tier_set = torch.from_numpy(final_tier_set).to(config.DEVICE)
+        champion_set = torch.from_numpy(champion_set).to(config.DEVICE)
 
         target_value = self.encode_target(
             target_value, self.network.value_encoder).to(config.DEVICE)
@@ -144,27 +156,23 @@ class Trainer(object):
             reward_loss = self.value_or_reward_loss(step_reward, step_target_reward)
             self.scale_loss(reward_loss)
 
-            step_target_policy = self.fill_policy(target_policy[tstep], sample_set[tstep])
+            step_target_policy = torch.split(target_policy[:, tstep], POLICY_TARGET_HEADS, dim=1)
             policy_loss = self.policy_loss(prediction.policy_logits, step_target_policy)
             self.scale_loss(policy_loss)
             if config.CHAMP_DECIDER:
                 policy_loss.register_hook(lambda grad: grad * (1 / len(config.CHAMP_DECIDER_ACTION_DIM)))
 
-            # TODO: Figure out how to speed up the tier, final_tier, and champion losses
-            tier_target = [tier_set[a][tstep] for a in range(config.BATCH_SIZE)]
-            tier_target = [list(b) for b in zip(*tier_target)]
+            tier_target = torch.split(tier_set[:, tstep], config.TEAM_TIERS_VECTOR, dim=1)
             tier_loss = self.supervised_loss(prediction.comp, tier_target)
             self.scale_loss(tier_loss)
             tier_loss.register_hook(lambda grad: grad * (1 / len(config.TEAM_TIERS_VECTOR)))
 
-            final_tier_target = [final_tier_set[a][tstep] for a in range(config.BATCH_SIZE)]
-            final_tier_target = [list(b) for b in zip(*final_tier_target)]
+            final_tier_target = torch.split(final_tier_set[:, tstep], config.TEAM_TIERS_VECTOR, dim=1)
             final_tier_loss = self.supervised_loss(prediction.final_comp, final_tier_target)
             self.scale_loss(final_tier_loss)
             final_tier_loss.register_hook(lambda grad: grad * (1 / len(config.TEAM_TIERS_VECTOR)))
 
-            champion_target = [champion_set[a][tstep] for a in range(config.BATCH_SIZE)]
-            champion_target = [list(b) for b in zip(*champion_target)]
+            champion_target = torch.unbind(champion_set[:, tstep], dim=1)
             champ_loss = self.supervised_loss(prediction.champ, champion_target)
             self.scale_loss(tier_loss)
             champ_loss.register_hook(lambda grad: grad * (1 / len(config.CHAMPION_LIST_DIM)))
@@ -293,22 +301,6 @@ class Trainer(object):
         )
         return target_reshaped
 
-    # TODO: Maybe turn this off
-    # prediction [ [batch_size, action_dim_1], ...]
-    # target [ [batch_size, sampled_action_dim_1], ...] (smaller than prediction)
-    # sample_set [ [batch_size, sampled_action_dim_1], ...]
-    # We need to mask the prediction so that only the sampled actions are used in the loss.
-    # We also need to fill the target with zeros where the prediction is masked.
-    def fill_policy(self, target, sample_set):
-        if not config.CHAMP_DECIDER:
-            idx_set = sample_set_to_idx(sample_set)
-            target = create_target_and_mask(target, idx_set)
-            target = [torch.from_numpy(target_dim).to(config.DEVICE) for target_dim in target]
-        else:
-            target = [torch.tensor(target_dim).to(config.DEVICE) for target_dim in target]
-
-        return target
-
     def scale_loss(self, loss):
         scale_gradient(loss, 1.0 / config.UNROLL_STEPS)
 
@@ -325,9 +317,7 @@ class Trainer(object):
     def supervised_loss(self, prediction, target):
         loss = 0.0
         for pred_dim, target_dim in zip(prediction, target):
-            # print(pred_dim)
-            loss += cross_entropy_loss(pred_dim, torch.tensor(np.asarray(target_dim, dtype=np.int8),
-                                                              dtype=torch.float32).to(config.DEVICE))
+            loss += cross_entropy_loss(pred_dim, target_dim)
         return loss
 
     def l2_regularization(self):
@@ -1,14 +1,14 @@
 import numpy as np
 import config
 import time
-from Models.MCTS_Util import split_sample_decide
+from Models.MCTS_Util import split_sample_decide, policy_target_entries
 
 class ReplayBuffer:
     def __init__(self):
         self.gameplay_experiences = []
         self.rewards = []
         self.policy_distributions = []
-        self.string_samples = []
+        self.sampled_actions = []
         self.action_history = []
         self.root_values = []
         self.team_tiers = []
@@ -21,13 +21,13 @@ class ReplayBuffer:
         self.gameplay_experiences = []
         self.rewards = []
         self.policy_distributions = []
-        self.string_samples = []
+        self.sampled_actions = []
         self.action_history = []
         self.root_values = []
         self.team_tiers = []
         self.team_champions = []
 
-    def store_replay_buffer(self, observation, action, reward, policy, string_samples,
+    def store_replay_buffer(self, observation, action, reward, policy, sampled_actions,
                             root_value, team_tiers, team_champions):
         # Records a single step of gameplay experience
         # First few are self-explanatory
@@ -37,7 +37,7 @@ class ReplayBuffer:
         np.clip(reward, config.MINIMUM_REWARD, config.MAXIMUM_REWARD)
         self.rewards.append(reward)
         self.policy_distributions.append(policy)
-        self.string_samples.append(string_samples)
+        self.sampled_actions.append(sampled_actions)
         self.root_values.append(root_value)
         self.team_tiers.append(team_tiers)
         self.team_champions.append(team_champions)
@@ -74,125 +74,54 @@ class ReplayBuffer:
             # samples = random.sample(range(0, len(self.gameplay_experiences) -
             #   config.UNROLL_STEPS), samples_per_player)
             # samples = range(0, len(self.gameplay_experiences) - config.UNROLL_STEPS)
-            samples = range(0, len(self.gameplay_experiences))
+            samples = np.arange(len(self.gameplay_experiences))
             num_steps = len(self.gameplay_experiences)
-            reward_correction = []
-            prev_reward = 0
-            output_sample_set = []
-            for reward in self.rewards:
-                reward_correction.append(reward - prev_reward)  # Getting instant rewards not cumulative
-                prev_reward = reward
-            for sample in samples:
-                # Hard coding because I would be required to do a transpose if I didn't
-                # and that takes a lot of time.
-                action_set = []
-                value_mask_set = []
-                reward_mask_set = []
-                policy_mask_set = []
-                value_set = []
-                reward_set = []
-                policy_set = []
-                sample_set = []
-                priority_set = []
-                tier_set = []
-                final_tier_set = []
-                champion_set = []
+            # The arrays below are over the steps of the game followed by UNROLL_STEPS steps past its end, so that
+            # the unroll window [sample, sample + UNROLL_STEPS] of every sample is one row of indices into them.
+            steps = np.arange(num_steps + config.UNROLL_STEPS)
+            windows = samples[:, None] + np.arange(config.UNROLL_STEPS + 1)
+            # Getting instant rewards not cumulative
+            reward_correction = np.diff(np.asarray(self.rewards, dtype=np.float64), prepend=0.0)
 
-                for current_index in range(sample, sample + config.UNROLL_STEPS + 1):
-                    if config.TD_STEPS > 0:
-                        bootstrap_index = current_index + config.TD_STEPS
-                    else:
-                        bootstrap_index = len(reward_correction)
-                    if config.TD_STEPS > 0 and bootstrap_index < len(self.root_values):
-                        value = self.root_values[bootstrap_index] * config.DISCOUNT ** config.TD_STEPS
-                    else:
-                        value = 0.0
-                    # bootstrapping value back from rewards 
-                    for i, reward_corrected in enumerate(reward_correction[current_index:bootstrap_index]):
-                        value += reward_corrected * config.DISCOUNT ** i
-                    
-                    priority = 0.001
-                    if current_index < num_steps:
-                        priority = np.maximum(priority, np.abs(self.root_values[current_index] - value))
-                    priority_set.append(priority)
+            # bootstrapping value back from rewards: the discounted sum of the rewards from a step up to the
+            # bootstrap step, the end of the game without TD_STEPS, as the difference of two reverse cumulative sums
+            discounts = config.DISCOUNT ** np.arange(num_steps)
+            discounted_rewards = np.append(np.cumsum((reward_correction * discounts)[::-1])[::-1], 0.0)
+            start = np.minimum(steps, num_steps)
+            if config.TD_STEPS > 0:
+                bootstrap_index = np.minimum(steps + config.TD_STEPS, num_steps)
+            else:
+                bootstrap_index = np.full(len(steps), num_steps)
+            value = (discounted_rewards[start] - discounted_rewards[bootstrap_index]) / \
+                np.append(discounts, 1.0)[start]
+            if config.TD_STEPS > 0:
+                bootstrap = steps + config.TD_STEPS < num_steps
+                value[bootstrap] += np.asarray(self.root_values)[steps[bootstrap] + config.TD_STEPS] * \
+                    config.DISCOUNT ** config.TD_STEPS
 
-                    reward_mask = 1.0 if current_index > sample else 0.0
-                    if current_index < num_steps - 1:
-                        if current_index != sample:
-                            action_set.append(np.asarray(self.action_history[current_index]))
-                        else:
-                            if config.CHAMP_DECIDER:
-                                action_set.append([0 for _ in range(len(config.CHAMP_DECIDER_ACTION_DIM))])
-                            else:
-                                # To weed this out later when sampling the global buffer
-                                action_set.append([0, 0, 0])
-                        value_mask_set.append(1.0)
-                        reward_mask_set.append(reward_mask)
-                        policy_mask_set.append(1.0)
-                        value_set.append(value)
-                        # This is current_index - 1 in the Google's code but in my version
-                        # This is simply current_index since I store the reward with the same time stamp
-                        reward_set.append(reward_correction[current_index])
-                        policy_set.append(self.policy_distributions[current_index])
-                        sample_set.append(self.string_samples[current_index])
-                        tier_set.append(self.team_tiers[current_index])
-                        final_tier_set.append(self.team_tiers[-1])
-                        champion_set.append(self.team_champions[current_index])
-                    elif current_index == num_steps - 1:
-                        if config.CHAMP_DECIDER:
-                            action_set.append([0 for _ in range(len(config.CHAMP_DECIDER_ACTION_DIM))])
-                        else:
-                            # To weed this out later when sampling the global buffer
-                            action_set.append([0, 0, 0])
-                        value_mask_set.append(0.0)
-                        reward_mask_set.append(reward_mask)
-                        policy_mask_set.append(0.0)
-                        # This is 0.0 in Google's code but thinking this should be the same as the reward?
-                        # The value of the terminal state should equal
-                        # the value of the cumulative reward at the given state.
-                        value_set.append(0.0)
-                        reward_set.append(reward_correction[current_index])
-                        # 0 is ok here because this get masked out anyway
-                        policy_set.append(self.policy_distributions[0])
-                        sample_set.append(self.string_samples[0])
-                        tier_set.append(self.team_tiers[-1])
-                        final_tier_set.append(self.team_tiers[-1])
-                        champion_set.append(self.team_champions[-1])
-                    else:
-                        # States past the end of games is treated as absorbing states.
-                        if config.CHAMP_DECIDER:
-                            action_set.append([0 for _ in range(len(config.CHAMP_DECIDER_ACTION_DIM))])
-                        else:
-                            # To weed this out later when sampling the global buffer
-                            action_set.append([0, 0, 0])
-                        # I'm pretty sure this should be 0 and not 1.
-                        value_mask_set.append(0.0)
-                        reward_mask_set.append(0.0)
-                        policy_mask_set.append(0.0)
-                        value_set.append(0.0)
-                        reward_set.append(0.0)
-                        policy_set.append(self.policy_distributions[0])
-                        sample_set.append(self.string_samples[0])
-                        tier_set.append(self.team_tiers[-1])
-                        final_tier_set.append(self.team_tiers[-1])
-                        champion_set.append(self.team_champions[-1])
+            # error of the root value against the target, 0.001 past the end of the game
+            errors = np.full(len(steps), 0.001)
+            errors[:num_steps] = np.maximum(0.001, np.abs(np.asarray(self.root_values) - value[:num_steps]))
+            priorities = unroll_priority(errors[windows])
 
-                for i in range(len(sample_set)):
-                    split_mapping, split_policy = split_sample_decide(sample_set[i], policy_set[i])
-                    sample_set[i] = split_mapping
-                    policy_set[i] = split_policy
+            # The game goes to the global buffer once, as one trajectory of steps. The unroll windows of the samples
+            # are put together from it when a batch is sampled, see GlobalBuffer.assemble_batch.
+            observation = {label: np.stack([step[label] for step in self.gameplay_experiences]).astype(np.float32)
+                           for label in config.OBSERVATION_LABELS}
+            split_steps = [split_sample_decide(self.sampled_actions[step], self.policy_distributions[step])
+                           for step in range(num_steps)]
+            policy_columns, policy_values = policy_target_entries([split_sample for split_sample, _ in split_steps],
+                                                                  [split_policy for _, split_policy in split_steps])
+            # the trait tiers come as one array per trait
+            tier = np.asarray([np.concatenate(step) for step in self.team_tiers], dtype=np.float32)
+            trajectory = [observation, np.asarray(self.action_history, dtype=np.int64),
+                          value[:num_steps].astype(np.float32), reward_correction.astype(np.float32), policy_columns,
+                          policy_values, tier, np.asarray(self.team_champions, dtype=np.float32)]
+            global_buffer.store_replay_sequence([priorities, trajectory, self.ending_position])
 
-                # formula for priority over unroll steps,
-                # adding small randomness to get around a priority queue error where it crashes if you add two items
-                # with identical priorities
-                priority = priority_set[0]
-                div = -priority
-                for i in priority_set:
-                    div += i
-                priority = 1 / (priority / div) + np.random.rand() * 0.00001
 
-                # priority = 1 / priority because priority queue stores in ascending order.
-                output_sample_set.append([priority, [self.gameplay_experiences[sample], action_set, value_mask_set,
-                                                     reward_mask_set, policy_mask_set, value_set, reward_set,
-                                                     policy_set, sample_set, tier_set, final_tier_set, champion_set]])
-            global_buffer.store_replay_sequence([output_sample_set, self.ending_position])
+# formula for priority over unroll steps: the errors of the later steps over the error of the first one.
+# errors is [..., unroll steps + 1], the value errors with the 0.001 floor of store_global_buffer
+def unroll_priority(errors):
+    errors = np.asarray(errors)
+    return errors[..., 1:].sum(axis=-1) / errors[..., 0]
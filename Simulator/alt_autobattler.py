@@ -1,38 +1,57 @@
 from Simulator.pool_stats import cost_star_values
+from Simulator import stat_table
 import numpy as np
 
-def alt_auto_battle(player_1, player_2, round_damage=0):
-    blue_board = player_1.board
-    red_board = player_2.board
-    blue_score = 0
-    red_score = 0
+# The cheap stand-in for a real fight. A board is worth the cost_star_values of its units
+# plus (trait count * trait tier) for every trait, and the more valuable board wins by the difference.
+#
+# Boards are scored as dense arrays so that many fights can be evaluated with one call:
+#   champion ids  [N, 7, 4]  stat_table ids, 0 for an empty hex
+#   stars         [N, 7, 4]
+#   trait counts  [N, T]     player.team_composition values
+#   trait tiers   [N, T]     player.team_tiers values
+
+# [champion id, stars] -> what the unit adds to the board. stars 0 and the empty id 0 are worth nothing
+UNIT_VALUES = np.zeros((len(stat_table.NAMES), stat_table.STAR_LEVELS), dtype=np.int64)
+for c_id in range(1, len(stat_table.NAMES)):
+    UNIT_VALUES[c_id, 1:] = cost_star_values[stat_table.COST[c_id] - 1]
+
 
+def encode_board(player):
+    ids = np.zeros((7, 4), dtype=np.int64)
+    stars = np.zeros((7, 4), dtype=np.int64)
     for x in range(7):
         for y in range(4):
-            if blue_board[x][y]:
-                blue_score += cost_star_values[blue_board[x][y].cost - 1][blue_board[x][y].stars - 1]
-            if red_board[x][y]:
-                red_score += cost_star_values[red_board[x][y].cost - 1][red_board[x][y].stars - 1]
-
-    blue_values = list(player_1.team_composition.values())
-    blue_tier_values = list(player_1.team_tiers.values())
-
-    red_values = list(player_2.team_composition.values())
-    red_tier_values = list(player_2.team_tiers.values())
-
-    for i in range(len(player_1.team_composition)):
-        if blue_values[i] != 0:
-            blue_score += blue_values[i] * blue_tier_values[i]
-
-    for i in range(len(player_2.team_composition)):
-        if red_values[i] != 0:
-            red_score += red_values[i] * red_tier_values[i]
-    # print("blue_score: {}, red_score: {}, damage: {}".format(blue_score, red_score,
-    #                                                          np.absolute(blue_score - red_score) + round_damage))
-
-    if red_score == blue_score:
-        return 0, round_damage
-    elif blue_score > red_score:
-        return 1, blue_score - red_score + round_damage
-    elif red_score > blue_score:
-        return 2, red_score - blue_score + round_damage
+            unit = player.board[x][y]
+            if unit:
+                ids[x][y] = stat_table.IDS[unit.name]
+                stars[x][y] = unit.stars
+    counts = np.fromiter(player.team_composition.values(), dtype=np.int64)
+    tiers = np.fromiter(player.team_tiers.values(), dtype=np.int64)
+    return ids, stars, counts, tiers
+
+
+# the boards of several players as one batch for alt_auto_battle_batch
+def encode_boards(players):
+    boards = [encode_board(player) for player in players]
+    return tuple(np.stack(column) for column in zip(*boards))
+
+
+def board_values(ids, stars, counts, tiers):
+    return UNIT_VALUES[ids, stars].sum(axis=(-2, -1)) + (counts * tiers).sum(axis=-1)
+
+
+# blue and red are (champion ids, stars, trait counts, trait tiers) batches of the same size N.
+# round_damage is a number or an array of N.
+# returns (index_won, damage) arrays of N: index_won is 0 for a draw, 1 if blue won and 2 if red won
+def alt_auto_battle_batch(blue, red, round_damage=0):
+    blue_score = board_values(*blue)
+    red_score = board_values(*red)
+    index_won = np.where(blue_score > red_score, 1, np.where(red_score > blue_score, 2, 0))
+    damage = np.abs(blue_score - red_score) + round_damage
+    return index_won, damage
+
+
+def alt_auto_battle(player_1, player_2, round_damage=0):
+    index_won, damage = alt_auto_battle_batch(encode_boards([player_1]), encode_boards([player_2]), round_damage)
+    return int(index_won[0]), damage[0].item()
@@ -0,0 +1,152 @@
+import random
+import Simulator.config as config
+from Simulator.event_queue import EventQueue
+
+
+# One row of battle.coordinates. Works like a normal list but every write also updates battle.board_units
+# and battle.occupied, so units moving, dying or spawning keep those up to date without anyone having to think about it.
+class BoardRow(list):
+    def __init__(self, y, battle):
+        super().__init__([None] * 7)
+        self.y = y
+        self.battle = battle
+
+    def __setitem__(self, x, unit):
+        if x < 0:
+            x += len(self)
+        board_units = self.battle.board_units
+        old = list.__getitem__(self, x)
+        if old is not None:
+            units = board_units.get(old.team)
+            if units is not None and units.get((self.y, x)) is old:
+                del units[(self.y, x)]
+        list.__setitem__(self, x, unit)
+        bit = 1 << (self.y * 7 + x)
+        if unit is not None:
+            board_units.setdefault(unit.team, {})[(self.y, x)] = unit
+            self.battle.occupied |= bit
+        else:
+            self.battle.occupied &= ~bit
+
+
+# Everything a single fight needs to keep track of lives in here.
+# Every champion taking part in a fight holds a pointer to its battle (champion.battle),
+# so field.py, ability.py, items.py, active.py and origin_class.py reach the state through the unit they are given.
+# Nothing is shared between two battles, so several of them can be alive (or run from different threads) at once.
+class Battle:
+    tick = 25  # ms between two combat ticks
+
+    def __init__(self, warlord_wins=None, rng=random, event_skipping=None):
+        self.blue = []
+        self.red = []
+        # team name -> that team's unit list, and team name -> the other team's list
+        self.teams = {'blue': self.blue, 'red': self.red}
+        self.enemies = {'blue': self.red, 'red': self.blue}
+        self.que = EventQueue()
+        self.log = []
+
+        self.milliseconds = 0
+
+        # jump over ticks where no unit can act and no event is due. gives the same fight as ticking every 25ms
+        if event_skipping is None:
+            event_skipping = config.COMBAT_EVENT_SKIPPING
+        self.event_skipping = event_skipping
+
+        # Random number generator used by everything inside the fight.
+        # Defaults to the random module so that a seeded run gives the same fight as before.
+        # Pass a random.Random instance when battles are interleaved and need to be reproducible on their own.
+        self.random = rng
+
+        # warlord -trait. Copied so that changing config.WARLORD_WINS mid-fight does not leak into this battle.
+        if warlord_wins is None:
+            warlord_wins = config.WARLORD_WINS
+        self.warlord_wins = dict(warlord_wins)
+
+        # team -> {(y, x): unit} for every unit standing on the board. kept up to date by the BoardRows
+        self.board_units = {'blue': {}, 'red': {}}
+        # bit y * 7 + x is set when there's a unit on hex [y, x]. field.find_path caches paths by it
+        self.occupied = 0
+        self.coordinates = [BoardRow(y, self) for y in range(8)]
+
+        # champion_functions.py
+        self.damage_dealt = []
+        self.damage_dealt_teams = {'blue': 0, 'red': 0}
+        self.galio_spawned = {'blue': False, 'red': False}
+
+        # ability.py
+        self.kennen_hits = []
+        self.lulu_targeted = []
+        self.morgana_MR_list = []
+        self.riven_counter = []
+        self.riven_identifier_list = []
+        self.vi_armor_list = []
+        self.yone_list = []
+        self.yone_checking = False
+
+        # active.py
+        self.jhin_shots = []
+        self.kalista_targets = []
+        self.vayne_targets = []
+        self.zed_counter = []
+
+        # items.py
+        self.bramble_vest_list = []
+        self.deathblade_list = []
+        self.frozen_heart_list = []
+        self.gargoyle_stoneplate_list = []
+        self.hextech_gunblade_list = []
+        self.ionic_spark_list = []
+        self.last_whisper_list = []  # [target, ms]
+        self.statikk_shiv_list = []
+        self.titans_resolve_list = []  # [champion, stacks, maxxed]
+
+        # origin_class.py
+        self.cultist_stars = {'blue': 0, 'red': 0}  # chosen's stars counts as double
+        self.total_health_teams = {'blue': 0, 'red': 0}
+        self.galio_spawn_time = {'blue': 0, 'red': 0}
+
+        self.amounts = {
+            'cultist': {'blue': 0, 'red': 0},       # 0  in champion.py: champion object, champion.champion_functions.py
+            'divine': {'blue': 0, 'red': 0},        # 1  in champion.py: spell(), champion_functions.py: attack()
+            'dusk': {'blue': 0, 'red': 0},          # 2  in origin_class.py: total_origin_class()
+            'elderwood': {'blue': 0, 'red': 0},     # 3  in champion.py: main()
+            'enlightened': {'blue': 0, 'red': 0},   # 4  in origin_class.py: total_origin_class()
+            'exile': {'blue': 0, 'red': 0},         # 5  in origin_class.py: total_origin_class()
+            'ninja': {'blue': 0, 'red': 0},         # 6  in origin_class.py: total_origin_class()
+            'spirit': {'blue': 0, 'red': 0},        # 7  in ability.py: default_ability_calls()
+            'the_boss': {'blue': 0, 'red': 0},      # 8  in champion.py: spell(), champion_functions.py: attack()
+            'warlord': {'blue': 0, 'red': 0},       # 9  in origin_class.py: total_origin_class()
+            'adept': {'blue': 0, 'red': 0},         # 10 in origin_class.py: total_origin_class()
+            'assassin': {'blue': 0, 'red': 0},      # 11 in origin_class.py: total_origin_class()
+            'brawler': {'blue': 0, 'red': 0},       # 12 in origin_class.py: total_origin_class()
+            'dazzler': {'blue': 0, 'red': 0},       # 13 in champion.py: clear_que_dazzler(), spell()
+            'duelist': {'blue': 0, 'red': 0},       # 14 in origin_class.py: total_origin_class(), champion.py: attack()
+            'emperor': {'blue': 0, 'red': 0},       # 15 in origin_class.py: total_origin_class()
+            'hunter': {'blue': 0, 'red': 0},        # 16 in champion.py: main()
+            'keeper': {'blue': 0, 'red': 0},        # 17 in origin_class.py: total_origin_class()
+            'mage': {'blue': 0, 'red': 0},          # 18 in origin_class.py: total_origin_class(), champion.py: ability()
+            'mystic': {'blue': 0, 'red': 0},        # 19 in origin_class.py: total_origin_class()
+            'shade': {'blue': 0, 'red': 0},         # 20 in origin_class.py: total_origin_class()
+            'sharpshooter': {'blue': 0, 'red': 0},  # 21 in champion_functions.py: attack(), champion.py: spell()
+            'vanguard': {'blue': 0, 'red': 0},      # 22 in origin_class.py: total_origin_class()
+            'fortune': {'blue': 0, 'red': 0},       # 23 in player
+            'moonlight': {'blue': 0, 'red': 0},     # 24 in origin_class.py: My own implementation
+            'tormented': {'blue': 0, 'red': 0}
+        }
+
+        self.divine_attack_list = []  # [champion, attack_amount]
+        self.divine_list = []  # champion, champion, champion
+        self.elderwood_list = {'blue': 0, 'red': 0}
+        self.spirit_list = []  # champion, champion, champion (the ones who have casted)
+        self.duelist_helper_list = []  # [champion, stacks]
+        self.shade_helper_list = []  # [champion, attacks]
+
+    def millis(self):
+        return self.milliseconds
+
+    def milliseconds_increase(self):
+        self.milliseconds += self.tick
+
+    def printt(self, msg):
+        if config.PRINTMESSAGES:
+            self.log.append(msg)
@@ -3,23 +3,14 @@ import Simulator.origin_class as origin_class
 import Simulator.origin_class_stats as origin_class_stats
 import Simulator.champion_functions as champion_functions
 import time
-import random
 import itertools
+import math
 
 from math import ceil
-from Simulator.stats import AD, HEALTH, ARMOR, MR, AS, RANGE, MANA, MAXMANA, COST, MANALOCK, ABILITY_REQUIRES_TARGET, \
-    DODGE, INITIATIVE_ACTIVE, ABILITY_LENGTH, DAMAGE_PER_UNIT
-from Simulator.champion_functions import attack, die, MILLIS, MILLISECONDS_INCREASE, add_damage_dealt
-from Simulator import ability, active, field, item_stats, items
-
-que = []
-log = []
-
-
-def printt(msg):
-    if config.PRINTMESSAGES:
-        log.append(msg)
-
+from Simulator.stats import AD, HEALTH, DODGE, INITIATIVE_ACTIVE, ABILITY_LENGTH, DAMAGE_PER_UNIT
+from Simulator.champion_functions import attack, die, add_damage_dealt
+from Simulator import ability, active, field, item_stats, items, stat_table
+from Simulator.battle import Battle
 
 test_multiple = {'blue': 0, 'red': 0, 'bugged out': 0, 'draw': 0}
 
@@ -30,36 +21,60 @@ test_multiple = {'blue': 0, 'red': 0, 'bugged out': 0, 'draw': 0}
 
 
 class champion:
+    # every attribute a champion can have. a fight creates a lot of these, slots keep them small and quick to read.
+    # anything that sets a new attribute on a champion has to add it here.
+    # sandguard_overlord_coordinates is only set by player.py on azirs that are on the board
+    __slots__ = ('battle', 'champion', 'name', 'stars', 'champion_id', 'health', 'max_health', 'AD',
+                 'SP', 'AS', 'armor', 'MR', 'range', 'dodge', 'movement_delay', 'mana', 'maxmana',
+                 'cost', 'manalock', 'mana_cost_increased', 'mana_generation', 'castMS',
+                 'ability_requires_target', 'target', 'target_y', 'target_x', 'immune',
+                 'autoimmune', 'targetable', 'stunned', 'burning', 'disarmed', 'blinded', 'shields',
+                 'receive_increased_damage', 'receive_decreased_damage', 'damage_reduction',
+                 'deal_increased_damage', 'deal_bonus_true_damage',
+                 'spell_damage_reduction_percentage', 'heal_per_attack', 'lifesteal',
+                 'lifesteal_spells', 'healing_strength', 'crit_chance', 'crit_damage', 'team', 'x',
+                 'y', 'starting_x', 'starting_y', 'survive_combat', 'participated_in_combat',
+                 'bench_loc', 'underlords', 'overlord', 'overlord_coordinates', 'origin',
+                 'will_revive', 'idle', 'ability_active', 'items', 'num_items', 'ionic_sparked',
+                 'spell_has_used_ludens', 'AD_reduction_cc', 'pumped_up', 'done_situps',
+                 'start_time', 'chosen', 'kayn_form', 'target_dummy',
+                 'sandguard_overlord_coordinates')
+
     def __init__(self, name, team=None, y=-1, x=-1, stars=1, itemlist=None, overlord=None,
-                 sandguard_overlord_coordinates=None, chosen=False, kayn_form=None, target_dummy=False):
+                 sandguard_overlord_coordinates=None, chosen=False, kayn_form=None, target_dummy=False, battle=None):
 
         if itemlist is None:
             itemlist = []
+        # units on the bench, in the shop or on a player's board are not in a fight and have no battle.
+        # run() makes the units that take part in a fight with the battle of that fight
+        self.battle = battle
         self.champion = True
 
         self.name = name
         self.stars = stars
+        self.champion_id = stat_table.IDS[name]
+        c_id = self.champion_id
 
         # in case we're spawning a construct, galio or a turret, the rest are handled at the bottom of the object
         if name != 'construct' and name != 'galio' and name != 'aphelios_turret':
-            self.health = round(HEALTH[name] * config.STARMULTIPLIER ** (stars - 1), 1)
-            self.max_health = round(HEALTH[name] * config.STARMULTIPLIER ** (stars - 1), 1)
-            self.AD = round(AD[name] * config.STARMULTIPLIER ** (stars - 1), 1)
+            self.health = stat_table.HEALTH[c_id][stars]
+            self.max_health = stat_table.HEALTH[c_id][stars]
+            self.AD = stat_table.AD[c_id][stars]
 
         self.SP = config.SP
 
-        self.AS = AS[name]
-        self.armor = ARMOR[name]
-        self.MR = MR[name]
-        self.range = RANGE[name]
+        self.AS = stat_table.AS[c_id]
+        self.armor = stat_table.ARMOR[c_id]
+        self.MR = stat_table.MR[c_id]
+        self.range = stat_table.RANGE[c_id]
         self.dodge = DODGE
         self.movement_delay = config.MOVEMENTDELAY
 
-        self.mana = MANA[name]
-        self.maxmana = MAXMANA[name]
-        self.cost = COST[name]
+        self.mana = stat_table.MANA[c_id]
+        self.maxmana = stat_table.MAXMANA[c_id]
+        self.cost = stat_table.COST[c_id]
 
-        self.manalock = MANALOCK[name]
+        self.manalock = stat_table.MANALOCK[c_id]
         # not going to start changing the whole structure of the manalock code since that could create some bugs
         # shen is the only unit whose manalock scales by stars so just forcing the change here.
         if self.name == 'shen':
@@ -68,7 +83,7 @@ class champion:
         self.mana_cost_increased = False
         self.mana_generation = 1  # enlightened - trait
         self.castMS = -50000  # the timestamp of the last cast
-        self.ability_requires_target = ABILITY_REQUIRES_TARGET[name]
+        self.ability_requires_target = stat_table.ABILITY_REQUIRES_TARGET[c_id]
 
         self.target = None
         self.target_y = None
@@ -117,7 +132,8 @@ class champion:
 
         self.will_revive = [[None], [None]]  # consists of [[zilean_champion], [GA]]
 
-        field.coordinates[y][x] = self
+        if battle is not None:
+            battle.coordinates[y][x] = self
 
         self.idle = True
         self.ability_active = False
@@ -139,9 +155,9 @@ class champion:
         self.target_dummy = target_dummy
 
         if chosen:
-            self.health = round(HEALTH[name] * config.STARMULTIPLIER ** (stars - 1), 1)
-            self.max_health = round(HEALTH[name] * config.STARMULTIPLIER ** (stars - 1), 1)
-            self.AD = round(AD[name] * config.STARMULTIPLIER ** (stars - 1), 1)
+            self.health = stat_table.HEALTH[c_id][stars]
+            self.max_health = stat_table.HEALTH[c_id][stars]
+            self.AD = stat_table.AD[c_id][stars]
             self.stars = 2
             # self.cost = cost_star_values[COST[name]][self.stars]
             self.health += 200
@@ -161,10 +177,10 @@ class champion:
 
         if name == 'galio':
             self.health = HEALTH[name][stars] + HEALTH[name][stars] * config.GALIO_MULTIPLIER * \
-                          origin_class.cultist_stars[team]
+                          self.battle.cultist_stars[team]
             self.max_health = HEALTH[name][stars] + HEALTH[name][stars] * config.GALIO_MULTIPLIER * \
-                              origin_class.cultist_stars[team]
-            self.AD = AD[name][stars] + AD[name][stars] * config.GALIO_MULTIPLIER * origin_class.cultist_stars[team]
+                              self.battle.cultist_stars[team]
+            self.AD = AD[name][stars] + AD[name][stars] * config.GALIO_MULTIPLIER * self.battle.cultist_stars[team]
 
         if name == 'aphelios_turret':
             self.health = 1
@@ -239,7 +255,7 @@ class champion:
             if target.immune:
                 damage = 0
 
-            crit_random = random.randint(1, 100) / 100
+            crit_random = self.battle.random.randint(1, 100) / 100
             crit_string = ''
             # jeweled gauntlet -item     #bramble vest -item
             if 'jeweled_gauntlet' in self.items and crit_random < self.crit_chance \
@@ -252,7 +268,7 @@ class champion:
             # it's long as shit but gets the job done
             if crit_random < self.crit_chance and self != target and not 'bramble_vest' in target.items \
                     and not item_damage and crit_string == '' and origin_class.is_trait(self, 'assassin') \
-                    and origin_class.get_origin_class_tier(self.team, 'assassin') > 0:
+                    and origin_class.get_origin_class_tier(self.battle, self.team, 'assassin') > 0:
                 damage *= self.crit_damage
                 crit_string = 'crit'
 
@@ -269,7 +285,7 @@ class champion:
                 trait_string = ' {}'.format(trait_damage)
 
             # if the target has died to luden's, don't continue
-            if target in eval(enemy_team):
+            if target in self.battle.teams[enemy_team]:
 
                 if self.lifesteal_spells > 0 and not item_damage:
                     self.add_que('heal', -1, None, None, damage * self.lifesteal_spells)
@@ -301,7 +317,7 @@ class champion:
                            format(ceil(target.health), ceil(target.health - damage), ceil(shield_old),
                                   ceil(target.shield_amount()), crit_string, burn_string, item_string, trait_string))
                 target.health -= damage
-                if MILLIS() > target.castMS + target.manalock and not target.ability_active and target.maxmana > 0:
+                if self.millis() > target.castMS + target.manalock and not target.ability_active and target.maxmana > 0:
                     if not target.name == 'riven' or ability.riven_helper(target, {}):
                         old_mana = target.mana
                         target.mana += min((damage * config.MANA_DAMAGE_GAIN) *
@@ -339,10 +355,10 @@ class champion:
             else:
                 self.print(' moves from ({} , {})   to   ({} , {})        '.format(self.y, self.x, y, x))
 
-            field.coordinates[self.y][self.x] = None
+            self.battle.coordinates[self.y][self.x] = None
             self.x = x
             self.y = y
-            field.coordinates[y][x] = self
+            self.battle.coordinates[y][x] = self
             self.idle = False
             self.add_que('clear_idle', self.movement_delay)
 
@@ -363,14 +379,13 @@ class champion:
         return shield
 
     def enemy_team(self):
-        enemy_team = 'red' if self.team == 'blue' else 'blue'
-        return eval(enemy_team)
+        return self.battle.enemies[self.team]
 
+    # units without a team or outside of a fight (bench and shop units) have no team list
     def own_team(self):
-        try:
-            return eval(self.team)
-        except TypeError:
+        if self.battle is None:
             return False
+        return self.battle.teams.get(self.team, False)
 
     def ability(self):
         attackable_enemies = list(filter(lambda x: (x.champion and x.health > 0), self.enemy_team()))
@@ -378,7 +393,8 @@ class champion:
             field.find_target(self)
         if self.target:  # if still no target, the remaining enemies are under GA or zilean revive
             getattr(ability, self.name)(self)
-            if origin_class.get_origin_class_tier(self.team, 'mage') > 0 and origin_class.is_trait(self, 'mage'):
+            if origin_class.get_origin_class_tier(self.battle, self.team, 'mage') > 0 \
+                    and origin_class.is_trait(self, 'mage'):
                 if len(self.enemy_team()) > 0:
                     getattr(ability, self.name)(self)
 
@@ -395,16 +411,19 @@ class champion:
         if data is None:
             data = {}
         if 'underlord' in data.keys():
-            que.append([action, data['underlord'], MILLIS() + length, function, stat, value, data])
+            self.push_que([action, data['underlord'], self.millis() + length, function, stat, value, data])
         else:
             if action == 'change_stat' and length < 1:
                 change_stat(self, action, length, function, stat, value, data)
             elif action == 'shield' and length < 1:
                 shield(self, action, length, function, stat, value, data)
             else:
-                que.append([action, self, MILLIS() + length, function, stat, value, data])
+                self.push_que([action, self, self.millis() + length, function, stat, value, data])
 
-        que.sort(key=lambda x: x[2])
+    # events only happen in a fight. a unit outside of one drops them, run() sets it up again in the fight
+    def push_que(self, event):
+        if self.battle is not None:
+            self.battle.que.push(event)
 
     def burn(self, target):
         target.clear_que_burn_removal()
@@ -419,58 +438,39 @@ class champion:
         pass
 
     def clear_que_idle(self):
-        # not very beautiful is it? not trying to impress anyone tho
-        for i in range(0, 15):
-            for q in que:
-                if q[1] is self and q[0] == 'clear_idle':
-                    que.remove(q)
+        self.battle.que.cancel(self, 'clear_idle')
 
     def clear_que_healing_reduction(self):
-        for q in que:
-            if q[1] is self and q[0] == 'change_stat' and q[4] == 'healing_strength' and q[5] == 1:
-                que.remove(q)
+        self.battle.que.cancel(self, 'change_stat', 'healing_strength', lambda q: q[5] == 1)
 
     def clear_que_stunned_removal(self):
-        for q in que:
-            if q[1] is self and q[0] == 'change_stat' and q[4] == 'stunned' and not q[5]:
-                que.remove(q)
+        self.battle.que.cancel(self, 'change_stat', 'stunned', lambda q: not q[5])
 
     def clear_que_blinded_removal(self):
-        for q in que:
-            if q[1] is self and q[0] == 'change_stat' and q[4] == 'blinded' and not q[5]:
-                que.remove(q)
+        self.battle.que.cancel(self, 'change_stat', 'blinded', lambda q: not q[5])
 
     def clear_que_armor_removal(self):
-        for q in que:
-            if q[1] is self and q[0] == 'change_stat' and q[4] == 'armor':
-                que.remove(q)
+        self.battle.que.cancel(self, 'change_stat', 'armor')
 
+    # burns are filed under the unit that is burning, not the one who applied them
     def clear_que_burn_removal(self):
-        for i in range(0, 15):
-            for q in que:
-                if q[0] == 'burn' and q[5] == self:
-                    que.remove(q)
+        self.battle.que.cancel(self, 'burn')
 
     def clear_que_dazzler(self):
-        for i in range(0, 15):
-            for q in que:
-                if q[1] == self and q[0] == 'change_stat' and 'dazzler' in q[6]:
-                    que.remove(q)
+        for stat in ['AD', 'AD_reduction_cc']:
+            self.battle.que.cancel(self, 'change_stat', stat, lambda q: 'dazzler' in q[6])
 
     def red_append(self, champion):
-        red.append(champion)
+        self.battle.red.append(champion)
 
     def blue_append(self, champion):
-        blue.append(champion)
+        self.battle.blue.append(champion)
 
     def red_return(self):
-        return red
+        return self.battle.red
 
     def blue_return(self):
-        return blue
-
-    def que_return(self):
-        return que
+        return self.battle.blue
 
     def spawn(self, name, stars, y, x, team=None, is_champion=True):
         if not team:
@@ -483,24 +483,27 @@ class champion:
             for i in self.items:
                 if i == 'spear_of_shojin':
                     items.append(i)
-        unit = champion(name, stars=stars, team=team, y=y, x=x, itemlist=items, overlord=overlord)
+        unit = champion(name, stars=stars, team=team, y=y, x=x, itemlist=items, overlord=overlord, battle=self.battle)
         unit.champion = is_champion
-        eval(team).append(unit)
+        self.battle.teams[team].append(unit)
         return unit
 
-    def que_replace(self, q):
-        global que
-        que = q
-
     def millis(self):
-        return MILLIS()
+        # no time passes outside of a fight
+        if self.battle is None:
+            return 0
+        return self.battle.millis()
 
     def print(self, msg):
+        # there is no log outside of a fight
+        if self.battle is None:
+            return
         if self.team:
-            printt('{:<120}'.format('{:<8}'.format(self.team) + '{:<15}'.format(self.name) + msg)
-                   + '{:<12}'.format(str(MILLIS())) + str(time.time_ns() - self.start_time))
+            self.battle.printt('{:<120}'.format('{:<8}'.format(self.team) + '{:<15}'.format(self.name) + msg)
+                               + '{:<12}'.format(str(self.millis())) + str(time.time_ns() - self.start_time))
         else:
-            printt('{:<120}'.format('team_unassigned' + '{:<15}'.format(self.name) + msg) + str(MILLIS()))
+            self.battle.printt('{:<120}'.format('team_unassigned' + '{:<15}'.format(self.name) + msg)
+                               + str(self.millis()))
 
     def golden(self):
         self.stars += 1
@@ -513,31 +516,32 @@ class champion:
         self.max_health += 200
 
 
-global blue
-global red
-
-blue = []
-red = []
-
-
 # I think I am going to redo parts of this function. 
 # Essentially, I am just going to change the first 10 lines so it reads in the data from the two teams.
 # This will be an area I will look to optimize on later if need be but for now,
 # I want to keep things as simple as possible.
-def run(champion_q, player_1, player_2, round_damage=0):
-    reset_global_variables()
+# battle: the Battle object that holds all of the state of this fight. A fresh one is used when not given.
+# Pass one in if you need the log or the timer after the fight has ended.
+def run(champion_q, player_1, player_2, round_damage=0, battle=None):
+    if battle is None:
+        battle = Battle()
+    blue = battle.blue
+    red = battle.red
+    printt = battle.printt
 
     for x in range(0, 7):
         for y in range(0, 4):
             if player_1.board[x][y]:
                 blue.append(champion_q(player_1.board[x][y].name, 'blue', y, x, player_1.board[x][y].stars,
                                        player_1.board[x][y].items, False, None, player_1.board[x][y].chosen
-                                       , player_1.board[x][y].kayn_form, player_1.board[x][y].target_dummy))
+                                       , player_1.board[x][y].kayn_form, player_1.board[x][y].target_dummy,
+                                       battle=battle))
             if player_2.board[x][y]:
                 # Inverting because the combat system uses the whole board and does not mirror at start.
                 red.append(champion_q(player_2.board[x][y].name, 'red', 7 - y, 6 - x, player_2.board[x][y].stars,
                                       player_2.board[x][y].items, False, None, player_2.board[x][y].chosen,
-                                      player_2.board[x][y].kayn_form, player_2.board[x][y].target_dummy))
+                                      player_2.board[x][y].kayn_form, player_2.board[x][y].target_dummy,
+                                      battle=battle))
 
     printt('Player 1 (Blue) Team')
     for unit in blue:
@@ -573,7 +577,7 @@ def run(champion_q, player_1, player_2, round_damage=0):
     items.zzrot_portal(blue[0])  # zzrot_portal
     items.zephyr(blue[0])  # zephyr
 
-    origin_class.total_health(blue, red)
+    origin_class.total_health(battle)
     origin_class.total_origin_class(blue[0], red[0])  # count and execute some traits
     # Not sure what changed the length of one of these arrays at this point but this seems to fix the issue
     if len(blue) == 0 or len(red) == 0:
@@ -583,16 +587,16 @@ def run(champion_q, player_1, player_2, round_damage=0):
     # infinity_edge made sure that the crit damage bonus gets registered after everything else has gone through
 
     while True:
-        if MILLIS() > 150000:
+        if battle.millis() > 150000:
             test_multiple['bugged out'] += 1
             break
-        if MILLIS() > 0 and MILLIS() % origin_class_stats.length['elderwood'] == 0:
-            origin_class.elderwood(blue, red)  # elderwood -trait
-        if MILLIS() > 0 and MILLIS() % \
-                origin_class_stats.threshold['hunter'][origin_class.get_origin_class_tier('blue', 'hunter')] == 0:
+        if battle.millis() > 0 and battle.millis() % origin_class_stats.length['elderwood'] == 0:
+            origin_class.elderwood(battle)  # elderwood -trait
+        if battle.millis() > 0 and battle.millis() % origin_class_stats.threshold['hunter'][
+                origin_class.get_origin_class_tier(battle, 'blue', 'hunter')] == 0:
             origin_class.hunter(blue)  # hunter -trait
-        if MILLIS() > 0 and MILLIS() % \
-                origin_class_stats.threshold['hunter'][origin_class.get_origin_class_tier('red', 'hunter')] == 0:
+        if battle.millis() > 0 and battle.millis() % origin_class_stats.threshold['hunter'][
+                origin_class.get_origin_class_tier(battle, 'red', 'hunter')] == 0:
             origin_class.hunter(red)  # hunter -trait
 
         for b, o in itertools.zip_longest(blue, red):
@@ -601,38 +605,40 @@ def run(champion_q, player_1, player_2, round_damage=0):
             if o and not o.target_dummy:
                 field.action(o)
 
-        while len(que) > 0 and MILLIS() > que[0][2]:
-            champion_q = que[0][1]
-            data = que[0][6]
+        que = battle.que
+        while len(que) > 0 and battle.millis() > que.peek()[2]:
+            event = que.pop()
+            champion_q = event[1]
+            data = event[6]
             # make sure that teemo's poison darts deal damage even after teemo himself has died
             # morgana deals if the ult is running and she dies
             # if ahri dies, she will still ult. range reduced in the executed function
             if (champion_q in blue or champion_q in red) or \
-                    (champion_q.name == 'teemo' and champion_q.health <= 0 and que[0][3] and 'target' in que[0][3][1]) \
-                    or (champion_q.name == 'morgana' and champion_q.health <= 0 and que[0][3] and
-                        'coordinates' in que[0][3][1]) or \
-                    (champion_q.name == 'ahri' and champion_q.health <= 0 and que[0][3] and 'y' in que[0][3][1]):
+                    (champion_q.name == 'teemo' and champion_q.health <= 0 and event[3] and 'target' in event[3][1]) \
+                    or (champion_q.name == 'morgana' and champion_q.health <= 0 and event[3] and
+                        'coordinates' in event[3][1]) or \
+                    (champion_q.name == 'ahri' and champion_q.health <= 0 and event[3] and 'y' in event[3][1]):
 
-                if que[0][0] == 'clear_idle':
+                if event[0] == 'clear_idle':
                     champion_q.idle = True
                     champion_q.print(' cleared idle     ')
 
-                if que[0][0] == 'change_stat':
-                    change_stat(champion_q, que[0][0], 0, que[0][3], que[0][4], que[0][5], data)
+                if event[0] == 'change_stat':
+                    change_stat(champion_q, event[0], 0, event[3], event[4], event[5], data)
 
-                if que[0][0] == 'heal':
+                if event[0] == 'heal':
                     start_value = round(champion_q.health, 2)
-                    champion_q.health += (que[0][5] * champion_q.healing_strength)
+                    champion_q.health += (event[5] * champion_q.healing_strength)
                     if champion_q.health > champion_q.max_health:
                         champion_q.health = champion_q.max_health
                     champion_q.print(' {} {} --> {}'.format('health', start_value, round(champion_q.health, 2)))
 
-                if que[0][0] == 'shield':
-                    shield(champion_q, que[0][0], 0, que[0][3], que[0][4], que[0][5], data)
+                if event[0] == 'shield':
+                    shield(champion_q, event[0], 0, event[3], event[4], event[5], data)
 
-                if que[0][0] == 'change_target':
+                if event[0] == 'change_target':
                     old_target = champion_q.target
-                    new_target = que[0][5]
+                    new_target = event[5]
                     if new_target and new_target.health > 0:
                         champion_q.target = new_target
                         champion_q.target_y = new_target.y
@@ -644,19 +650,17 @@ def run(champion_q, player_1, player_2, round_damage=0):
                     else:
                         field.find_target(champion_q)
 
-                if que[0][0] == 'execute_function':
-                    if len(que[0][3]) > 1:
-                        (que[0][3][0])(champion_q, que[0][3][1])
-
-                if que[0][0] == 'burn':
-                    champion_q.spell(que[0][5], 0, que[0][5].max_health * config.BURN_DMG_PER_SLICE, True, True)
+                if event[0] == 'execute_function':
+                    if len(event[3]) > 1:
+                        (event[3][0])(champion_q, event[3][1])
 
-                if que[0][0] == 'kill':
-                    que[0][5].die()
+                if event[0] == 'burn':
+                    champion_q.spell(event[5], 0, event[5].max_health * config.BURN_DMG_PER_SLICE, True, True)
 
-            que.pop(0)
+                if event[0] == 'kill':
+                    event[5].die()
 
-        MILLISECONDS_INCREASE()
+        battle.milliseconds_increase()
         if len(blue) == 0 or len(red) == 0:
             if len(red) == 0:
                 printt('BLUE TEAM WON')
@@ -673,12 +677,65 @@ def run(champion_q, player_1, player_2, round_damage=0):
                 survive_combat(player_2, red)
                 return 2, (round_damage + DAMAGE_PER_UNIT[len(red)])
             break
-        if MILLIS() > 150000:
+        if battle.event_skipping:
+            battle.milliseconds = next_active_millis(battle)
+        if battle.millis() > 150000:
             # print("Round has gone on too long")
             return 0, round_damage
     return 0, round_damage
 
 
+# the first tick that comes after ms
+def first_tick_after(battle, ms):
+    t = math.floor(ms / battle.tick) * battle.tick
+    while t <= ms:
+        t += battle.tick
+    while t - battle.tick > ms:
+        t -= battle.tick
+    return t
+
+
+# the first tick (from now on) that is a multiple of interval
+def next_tick_multiple(battle, interval):
+    interval = math.lcm(battle.tick, int(interval))
+    return math.ceil(battle.millis() / interval) * interval
+
+
+# The tick where something can happen next. Used when battle.event_skipping is on.
+# A tick does nothing when no unit passes the checks in field.action() and no event in the que is due.
+# Then the next tick is the same as this one, so the clock can jump to the first tick where
+# a que event is due, a unit's mana lock runs out or an elderwood/hunter timer goes off.
+# Units that are idle next to an enemy do something every tick, so nothing is skipped while there are any.
+def next_active_millis(battle):
+    now = battle.millis()
+    # run() gives up after 150000ms, don't jump over that
+    wake_up = [first_tick_after(battle, 150000)]
+
+    for c in battle.blue + battle.red:
+        if c.target_dummy or c.stunned:
+            continue
+        enemy_team = c.enemy_team()
+        if len(enemy_team) == 0:
+            continue
+        if c.idle and any(x.champion and x.health > 0 for x in enemy_team):
+            return now
+        # the only thing a busy unit can do is to cast an ability that doesn't require a target
+        if c.champion and not c.ability_requires_target and 0 < c.maxmana <= c.mana \
+                and not (c.disarmed and not stat_table.ABILITY_WHILE_DISARMED[c.champion_id]):
+            wake_up.append(first_tick_after(battle, c.castMS + stat_table.MANALOCK[c.champion_id]))
+
+    event = battle.que.peek()
+    if event:
+        wake_up.append(first_tick_after(battle, event[2]))
+
+    wake_up.append(next_tick_multiple(battle, origin_class_stats.length['elderwood']))
+    for team in ['blue', 'red']:
+        tier = origin_class.get_origin_class_tier(battle, team, 'hunter')
+        wake_up.append(next_tick_multiple(battle, origin_class_stats.threshold['hunter'][tier]))
+
+    return max(now, min(wake_up))
+
+
 def shield(champion, action, length, function, stat, value, data):
     shield_before = champion.shield_amount()
     if 'shield_before' in data and data['shield_before']:
@@ -724,11 +781,13 @@ def change_stat(a_champion, action, length, function, stat, value, data):
         a_champion.print(' {} {} --> {}'.format('AD', round(start_value, 2), round(a_champion.AD, 2)))
 
     else:
-        if not ('quicksilver' in a_champion.items and MILLIS() <= item_stats.item_change_length['quicksilver'] and
+        if not ('quicksilver' in a_champion.items
+                and a_champion.millis() <= item_stats.item_change_length['quicksilver'] and
                 value and (stat == 'stunned' or stat == 'disarmed' or stat == 'blinded')):
             if not ('rapid_firecannon' in a_champion.items and value and stat == 'blinded'):
-                if not (a_champion.name == 'galio' and (MILLIS() - origin_class.galio_spawn_time[a_champion.team] <=
-                                                        origin_class_stats.cc_immune['cultist'])
+                if not (a_champion.name == 'galio'
+                        and (a_champion.millis() - a_champion.battle.galio_spawn_time[a_champion.team] <=
+                             origin_class_stats.cc_immune['cultist'])
                         and (stat == 'stunned' or stat == 'disarmed' or stat == 'blinded')):
                     end_value = value
                     start_value = getattr(a_champion, stat)
@@ -759,64 +818,6 @@ def change_stat(a_champion, action, length, function, stat, value, data):
             a_champion.print(' not {} because wears quicksilver'.format(stat))
 
 
-def reset_global_variables():
-    global blue
-    global red
-    global que
-    global log
-    blue = []
-    red = []
-    que = []
-    log = []
-
-    champion_functions.MILLISECONDS = 0
-    champion_functions.damage_dealt = []
-    champion_functions.damage_dealt_teams = {'blue': 0, 'red': 0}
-    champion_functions.galio_spawned = {'blue': False, 'red': False}
-
-    # global kennen_hits
-    # global l
-    ability.kennen_hits = []
-    ability.lulu_targeted = []
-    ability.morgana_MR_list = []
-    ability.riven_counter = []
-    ability.riven_identifier_list = []
-    ability.vi_armor_list = []
-    ability.yone_list = []
-    ability.yone_checking = False
-
-    active.jhin_shots = []
-    active.kalista_targets = []
-    active.vayne_targets = []
-    active.zed_counter = []
-
-    field.coordinates = [[None] * 7 for _ in range(8)]
-
-    items.bramble_vest_list = []
-    items.deathblade_list = []
-    items.frozen_heart_list = []
-    items.gargoyle_stoneplate_list = []
-    items.hextech_gunblade_list = []
-    items.ionic_spark_list = []
-    items.last_whisper_list = []
-    items.statikk_shiv_list = []
-    items.titans_resolve_list = []
-
-    origin_class.cultist_stars = {'blue': 0, 'red': 0}
-    origin_class.total_health_teams = {'blue': 0, 'red': 0}
-    origin_class.galio_spawn_time = {'blue': 0, 'red': 0}
-
-    for o in origin_class.amounts:
-        origin_class.amounts[o] = {'blue': 0, 'red': 0}
-
-    origin_class.divine_attack_list = []
-    origin_class.divine_list = []
-    origin_class.elderwood_list = {'blue': 0, 'red': 0}
-    origin_class.spirit_list = []
-    origin_class.duelist_helper_list = []
-    origin_class.shade_helper_list = []
-
-
 def survive_combat(player, champ_list):
     for champ in champ_list:
         if player.board[champ.starting_x][champ.starting_y]:
@@ -2,38 +2,20 @@ import Simulator.config as config
 import Simulator.origin_class as origin_class
 import Simulator.origin_class_stats as origin_class_stats
 import Simulator.stats as stats
-import random
 from math import ceil
 from Simulator import ability, active, field, item_stats, items
 from Simulator.stats import *
 
-MILLISECONDS = 0
 
-
-def MILLIS():
-    return MILLISECONDS
-
-
-def MILLISECONDS_INCREASE():
-    global MILLISECONDS
-    MILLISECONDS += 25
-
-
-damage_dealt = []
-damage_dealt_teams = {'blue': 0, 'red': 0}
-
-
-def get_damage_dealt():
-    return damage_dealt
-
-
-galio_spawned = {'blue': False, 'red': False}
+def get_damage_dealt(battle):
+    return battle.damage_dealt
 
 
 def add_damage_dealt(champion, damage, target):
-    global damage_dealt
-    global damage_dealt_teams
-    global galio_spawned
+    battle = champion.battle
+    damage_dealt = battle.damage_dealt
+    damage_dealt_teams = battle.damage_dealt_teams
+    galio_spawned = battle.galio_spawned
     added = False
 
     if champion.team == 'blue':
@@ -44,9 +26,9 @@ def add_damage_dealt(champion, damage, target):
     # cultists galio spawning
     teams = [['blue', 'red'], ['red', 'blue']]
     for t in teams:
-        if (not galio_spawned[t[0]] and origin_class.amounts['cultist'][t[0]]
+        if (not galio_spawned[t[0]] and battle.amounts['cultist'][t[0]]
                 >= origin_class_stats.tiers['cultist'][0]):
-            if damage_dealt_teams[t[1]] > origin_class.total_health_teams[t[0]] * config.GALIO_TEAM_HEALTH_PERCENTAGE:
+            if damage_dealt_teams[t[1]] > battle.total_health_teams[t[0]] * config.GALIO_TEAM_HEALTH_PERCENTAGE:
                 galio_spawned[t[0]] = True
                 origin_class.cultist(target, t[0])
 
@@ -59,11 +41,15 @@ def add_damage_dealt(champion, damage, target):
         damage_dealt.append({'champion': champion, 'damage': damage})
 
 
+# stat name -> its per-champion table in stats.py, e.g. 'AD' -> stats.AD
+stat_tables = {name: table for name, table in vars(stats).items() if name.isupper() and isinstance(table, dict)}
+
+
 def reset_stat(champion, stat):
     if stat in ['movement_delay']:
         return config.MOVEMENTDELAY
     else:
-        return eval(stat)[champion.name]
+        return stat_tables[stat][champion.name]
 
 
 def attack(champion, target, bonus_dmg=0, item_attack=False, trait_attack='', set_ad=None):
@@ -79,8 +65,8 @@ def attack(champion, target, bonus_dmg=0, item_attack=False, trait_attack='', se
         if champion.AS > 5:
             champion.add_que('change_stat', -1, None, 'AS', 5.00)
 
-        dodge_random = random.randint(1, 100) / 100
-        crit_random = random.randint(1, 100) / 100
+        dodge_random = champion.battle.random.randint(1, 100) / 100
+        crit_random = champion.battle.random.randint(1, 100) / 100
 
         items.deathblade(champion, target)  # deathblade (needs to take effect before AD is used)
         items.gargoyle_stoneplate(target)  # gargoyle_stoneplate (needs to take effect before armor or MR is used)
@@ -201,7 +187,7 @@ def attack(champion, target, bonus_dmg=0, item_attack=False, trait_attack='', se
                             target.shield_amount()), crit_string, dodge_string, item_string, trait_string))
                     # dealing the damage and killing the enemy if necessary
                     target.health -= damage
-                    if (MILLIS() > target.castMS + target.manalock
+                    if (champion.millis() > target.castMS + target.manalock
                             and not target.ability_active and target.maxmana > 0):
                         if not target.name == 'riven' or ability.riven_helper(target, {}):
                             old_mana = target.mana
@@ -233,7 +219,7 @@ def attack(champion, target, bonus_dmg=0, item_attack=False, trait_attack='', se
                         origin_class.sharpshooter(champion, target, None, bonus_dmg, False)
 
                 # apply manalock. only give mana of the attack if it has been 1000ms since the last ability cast
-                if (champion.champion and MILLIS() > champion.castMS + champion.manalock
+                if (champion.champion and champion.millis() > champion.castMS + champion.manalock
                         and not champion.ability_active and champion.maxmana > 0
                         and not item_attack and not trait_attack):
                     if not champion.name == 'riven' or ability.riven_helper(champion, {}):
@@ -245,7 +231,7 @@ def attack(champion, target, bonus_dmg=0, item_attack=False, trait_attack='', se
 
                 # aphelios turret triggering aphelios's shojins
                 if champion.name == 'aphelios_turret' and \
-                        MILLIS() > champion.overlord.castMS + champion.overlord.manalock and not trait_attack:
+                        champion.millis() > champion.overlord.castMS + champion.overlord.manalock and not trait_attack:
                     old_mana = champion.overlord.mana
                     champion.overlord.mana += (items.spear_of_shojin(champion) * champion.overlord.mana_generation)
                     # spear of shojin -item
@@ -284,7 +270,7 @@ def die(champion):
     if not champion.will_revive[0][0] and not champion.will_revive[1][0]:
 
         # free the coordinates
-        field.coordinates[champion.y][champion.x] = None
+        champion.battle.coordinates[champion.y][champion.x] = None
         # Ran into a bug with this being removed. I'll look into where own_team is defined later
         if champion in champion.own_team():
             champion.own_team().remove(champion)
@@ -303,7 +289,7 @@ def die(champion):
             for c in enemy_team:
                 if c.target == u:
                     c.target = None
-            field.coordinates[u.y][u.x] = None
+            champion.battle.coordinates[u.y][u.x] = None
             if u.name == 'aphelios_turret' or (u.name == 'sandguard' and u.health >= 0):
                 if u in champion.own_team():
                     champion.own_team().remove(u)
@@ -17,6 +17,9 @@ LOGMESSAGES = True
 MANA_DAMAGE_GAIN = 0.06
 MAX_MANA_FROM_DAMAGE = 42.5
 
+# skip combat ticks where nothing can happen. see champion.next_active_millis()
+COMBAT_EVENT_SKIPPING = True
+
 MOVEMENTDELAY = 550
 STARMULTIPLIER = 1.8
 
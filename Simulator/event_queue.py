@@ -0,0 +1,84 @@
+import heapq
+import itertools
+
+
+# The combat que. Holds the timed events of one battle: [action, champion, ms, function, stat, value, data].
+# Events come out ordered by ms. Events with the same ms come out in the order they were added,
+# which is what the old 'append + sort by ms' list did.
+#
+# Every event is also filed under (unit, action, stat) so the clear_que_* helpers can find the events
+# they want to remove without looking through the whole que.
+# Removing an event only marks it as cancelled. It stays in the heap until it reaches the top and is thrown away there.
+class EventQueue:
+    def __init__(self):
+        self.heap = []  # [ms, order, event]. event is set to None when cancelled
+        self.index = {}  # (unit, action, stat) -> {order: heap item}
+        self.counter = itertools.count()
+        self.live = 0
+
+    def __len__(self):
+        return self.live
+
+    # burn events are filed under the burned unit, that's who clear_que_burn_removal is called on
+    @staticmethod
+    def key(event):
+        if event[0] == 'burn':
+            return event[5], 'burn', None
+        return event[1], event[0], event[4]
+
+    def push(self, event):
+        order = next(self.counter)
+        item = [event[2], order, event]
+        heapq.heappush(self.heap, item)
+        self.index.setdefault(self.key(event), {})[order] = item
+        self.live += 1
+
+    # the earliest event that is still alive. None if the que is empty
+    def peek(self):
+        heap = self.heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0][2]
+        return None
+
+    # removes and returns the earliest event that is still alive
+    def pop(self):
+        if self.peek() is None:
+            raise IndexError('pop from an empty que')
+        item = heapq.heappop(self.heap)
+        event = item[2]
+        self.forget(event, item[1])
+        return event
+
+    # every live event of the unit with this action and stat, in the order they will be executed
+    def events(self, unit, action, stat=None):
+        bucket = self.index.get((unit, action, stat))
+        if not bucket:
+            return []
+        return [item[2] for item in sorted(bucket.values())]
+
+    # cancels the unit's events with this action and stat. condition(event) can narrow it down further
+    def cancel(self, unit, action, stat=None, condition=None):
+        bucket = self.index.get((unit, action, stat))
+        if not bucket:
+            return
+        for order, item in list(bucket.items()):
+            if condition is None or condition(item[2]):
+                del bucket[order]
+                item[2] = None
+                self.live -= 1
+        if not bucket:
+            del self.index[(unit, action, stat)]
+        # don't let the heap fill up with dead events
+        if len(self.heap) > 64 and self.live < len(self.heap) // 2:
+            self.heap = [item for item in self.heap if item[2] is not None]
+            heapq.heapify(self.heap)
+
+    def forget(self, event, order):
+        key = self.key(event)
+        bucket = self.index[key]
+        del bucket[order]
+        if not bucket:
+            del self.index[key]
+        self.live -= 1
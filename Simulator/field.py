@@ -1,8 +1,7 @@
 import math
-import Simulator.stats as stats
+import Simulator.stat_table as stat_table
 import Simulator.items as items
-
-coordinates = [[None] * 7 for _ in range(8)]
+import Simulator.hex_grid as hex_grid
 
 
 def action(champion):
@@ -11,13 +10,11 @@ def action(champion):
         # if ability cast is 'global', cast it right away
         if champion.millis() > 0 and champion.champion and not champion.ability_requires_target \
                 and 0 < champion.maxmana <= champion.mana \
-                and not (champion.disarmed and not stats.ABILITY_WHILE_DISARMED[champion.name]) \
-                and champion.millis() > champion.castMS + stats.MANALOCK[champion.name]:
+                and not (champion.disarmed and not stat_table.ABILITY_WHILE_DISARMED[champion.champion_id]) \
+                and champion.millis() > champion.castMS + stat_table.MANALOCK[champion.champion_id]:
             champion.ability()
 
-        attackable_enemies = list(filter(lambda x: (x.champion and x.health > 0), champion.enemy_team()))
-
-        if champion.idle and len(attackable_enemies) > 0:
+        if champion.idle and any(x.champion and x.health > 0 for x in champion.enemy_team()):
             # if not target --> find one
             if champion.target is None:
                 find_target(champion)
@@ -47,10 +44,10 @@ def action(champion):
                                 champion.move(m[0], m[1])
 
                 elif champion.millis() > 0 \
-                        and not (champion.ability_active and not stats.ATTACK_WHILE_ABILITY_ACTIVE[champion.name]):
+                        and not (champion.ability_active and not stat_table.ATTACK_WHILE_ABILITY_ACTIVE[champion.champion_id]):
                     if champion.champion and 0 < champion.maxmana <= champion.mana \
-                            and not (champion.disarmed and not stats.ABILITY_WHILE_DISARMED[champion.name]) \
-                            and champion.millis() > champion.castMS + stats.MANALOCK[champion.name]:
+                            and not (champion.disarmed and not stat_table.ABILITY_WHILE_DISARMED[champion.champion_id]) \
+                            and champion.millis() > champion.castMS + stat_table.MANALOCK[champion.champion_id]:
                         champion.ability()
                     elif not champion.disarmed and not champion.blinded:
                         champion.attack()
@@ -61,6 +58,7 @@ def action(champion):
 # find a tile that takes the champion one step closer to the target
 # doesn't require a clear path to the target (like 'find_path' does)
 def find_next_ranged_move(champion):
+    coordinates = champion.battle.coordinates
     neighbors_original = find_neighbors(champion.y, champion.x)
     neighbors = []
 
@@ -69,7 +67,7 @@ def find_next_ranged_move(champion):
             neighbors.append(n)
 
     for n in neighbors:
-        dist = distance({'y': n[0], 'x': n[1]}, {'y': champion.target.y, 'x': champion.target.x}, False)
+        dist = hex_distance(n[0], n[1], champion.target.y, champion.target.x)
         n.append(dist)
 
     neighbors = sorted(neighbors, key=lambda x: x[2])
@@ -80,109 +78,94 @@ def find_next_ranged_move(champion):
         return None
 
 
-# finds the shortest path from a champion's location to some target coordinates
-# the algorithm is not perfect
-# find the neighbors of the current tile under review,
-# sort them by distance to the target and follow the closest tile until at target.
-# not allowing visits at tiles that are already visited.
-# runs twice: 
-# 1. execute using the rules three lines above
-# 2. if there are two neighbor tiles with same distance to the target, use the second one instaed of the first one.
-# this sometimes brings a different, better result. a big clumsy way of doing it, but more or less does the job.
-def find_path(champion, target_y, target_x, use_second=False, secondary_result=[]):
-    path = []
-    visited = []
-    start_y = champion.y
-    stary_x = champion.x
+# (occupied, target hex) -> distance in steps from every hex to the target. see path_distances()
+path_cache = {}
+PATH_CACHE_SIZE = 20000
+
+
+# Breadth first search outwards from the target through free hexes.
+# Returns a list with the number of steps from every hex (index y * 7 + x) to the target, None if it can't get there.
+# The target's own hex is where the search starts, so it doesn't matter that there's a unit standing on it.
+# Only depends on which hexes are taken, so the result is shared by every unit (and every battle) with the same board.
+def path_distances(occupied, target_y, target_x):
+    key = (occupied, target_y, target_x)
+    steps = path_cache.get(key)
+    if steps is not None:
+        return steps
+
+    steps = [None] * (hex_grid.HEIGHT * hex_grid.WIDTH)
+    steps[target_y * hex_grid.WIDTH + target_x] = 0
+    frontier = [(target_y, target_x)]
+    neighbors = hex_grid.NEIGHBORS[False]
+    while frontier:
+        next_frontier = []
+        for h in frontier:
+            step = steps[h[0] * hex_grid.WIDTH + h[1]] + 1
+            for n in neighbors[h]:
+                index = n[0] * hex_grid.WIDTH + n[1]
+                if steps[index] is None and not occupied >> index & 1:
+                    steps[index] = step
+                    next_frontier.append(n)
+        frontier = next_frontier
+
+    if len(path_cache) >= PATH_CACHE_SIZE:
+        path_cache.clear()
+    path_cache[key] = steps
+    return steps
+
+
+# finds the shortest path from a champion's location to some target coordinates through free hexes.
+# when there are several shortest paths, the step that is closest to the target (as the crow flies) wins.
+# returns the path without the starting point, None if there is no way to the target
+def find_path(champion, target_y, target_x):
+    if [champion.y, champion.x] == [target_y, target_x]:
+        return []
+    steps = path_distances(champion.battle.occupied, target_y, target_x)
 
-    path.append([start_y, stary_x])
-    visited.append([start_y, stary_x])
-
-    count = 0
-    while path[len(path) - 1] != [target_y, target_x]:
-        count += 1
-        if count > 50:
-            break
-        neighbors_original = find_neighbors(path[-1][0], path[-1][1])
-        neighbors = []
-        # add into the neighbor -list if the tile is not visited, it's free or it contains the campion's target
-        for n in neighbors_original:
-            if not (coordinates[n[0]][n[1]] and coordinates[n[0]][n[1]] is not champion.target) or n in visited:
-                neighbors.append(n)
-
-        for n in neighbors:
-            dist = distance({'y': n[0], 'x': n[1]}, {'y': target_y, 'x': target_x}, False)
-            n.append(dist)
-
-        # sort the neighbors by 'distance to the target hex'
-        neighbors = sorted(neighbors, key=lambda x: x[2])
-
-        # if 'use_second' is True AND the first two elements in the sorted list are of same distance, flip them
-        if len(neighbors) > 1 and neighbors[0][2] == neighbors[1][2] and use_second is True:
-            a, b = neighbors[0], neighbors[1]
-            neighbors[1] = a
-            neighbors[0] = b
-
-        if len(neighbors) == 0:
-            break
-            # return None
-
-        path.append([neighbors[0][0], neighbors[0][1]])
-        visited.append([neighbors[0][0], neighbors[0][1]])
+    path = []
+    current = (champion.y, champion.x)
+    while current != (target_y, target_x):
+        best = None
+        for n in hex_grid.NEIGHBORS[False][current]:
+            step = steps[n[0] * hex_grid.WIDTH + n[1]]
+            if step is not None:
+                option = (step, hex_distance(n[0], n[1], target_y, target_x))
+                if best is None or option < best[0]:
+                    best = (option, n)
+        if best is None:
+            return None
+        current = best[1]
+        path.append([current[0], current[1]])
+    return path
 
-    if not use_second:
-        return find_path(champion, target_y, target_x, True, path)
 
-    else:
-        if secondary_result and path:
-            # if there was no answer found
-            target = [target_y, target_x]
-            if [path[-1][0], path[-1][1]] != target and [secondary_result[-1][0], secondary_result[-1][1]] != target:
-                return None
-
-            # return the shortest path of the two test runs
-            # dont include the starting point
-            elif len(path) < len(secondary_result):
-                return path[1:]
-            else:
-                return secondary_result[1:]
+def find_neighbors(y, x, allow_outside_map=False):
+    return hex_grid.neighbors(y, x, allow_outside_map)
 
 
-def find_neighbors(y, x, allow_outside_map=False):
-    directions = [
-        [[+1, 0], [+1, +1], [0, -1],
-         [0, +1], [-1, 0], [-1, +1]],
-        [[+1, -1], [+1, 0], [0, -1],
-         [0, +1], [-1, -1], [-1, 0]],
-    ]
-
-    parity = y & 1
-    neighbors = []
-    for c in directions[parity]:
-        nY = c[0] + y
-        nX = c[1] + x
-        if allow_outside_map or (0 <= nY <= 7 and 0 <= nX <= 6):
-            neighbors.append([nY, nX])
-    return neighbors
+# everyone on the board who is not on the champion's team as [(y, x), unit], row by row like a scan of the board
+def units_against(champion):
+    cells = []
+    for team, units in champion.battle.board_units.items():
+        if team != champion.team:
+            cells.extend(units.items())
+    cells.sort(key=lambda cell: cell[0])
+    return cells
 
 
 def find_target(c):
-    c_coords = to_cube_coords(c)
     old_target = c.target
 
     current_target = {'champion': None, 'distance': None}
 
     # roll through everyone
     # find the closest one
-    for y in coordinates:
-        for x in y:
-            if x is not None and x.team is not c.team and x.champion and x.health > 0:
-                x_coords = to_cube_coords(x)
-                dist = (abs(c_coords['x'] - x_coords['x']) + abs(c_coords['y'] - x_coords['y'])
-                        + abs(c_coords['z'] - x_coords['z'])) / 2
-                if not current_target['distance'] or dist < current_target['distance']:
-                    current_target['champion'] = x
-                    current_target['distance'] = dist
+    for _, x in units_against(c):
+        if x.champion and x.health > 0:
+            dist = distance(c, x, True)
+            if not current_target['distance'] or dist < current_target['distance']:
+                current_target['champion'] = x
+                current_target['distance'] = dist
 
     if current_target['champion']:
         c.target = current_target['champion']
@@ -195,13 +178,11 @@ def find_target(c):
 
 # find enemies and sort them by distance
 def find_enemies(champion):
-    c = coordinates
     enemies = []
-    for i, a_line in enumerate(c):
-        for j, col in enumerate(a_line):
-            if c[i][j] and c[i][j].team != champion.team and c[i][j].champion:
-                d = distance(champion, c[i][j], True)
-                enemies.append([c[i][j], d])
+    for _, e in units_against(champion):
+        if e.champion:
+            d = distance(champion, e, True)
+            enemies.append([e, d])
     enemies.sort(key=lambda x: x[1])
     return enemies
 
@@ -209,55 +190,33 @@ def find_enemies(champion):
 # find enemies in x distance of a coordinate
 def enemies_in_distance(champion, target_y, target_x, radius):
     enemies_within = []
-    c = coordinates
-    for i, line in enumerate(c):
-        for j, col in enumerate(line):
-            if (c[i][j] and
-                    c[i][j].team != champion.team and
-                    c[i][j].champion and
-                    distance({'y': j, 'x': i}, {'y': target_y, 'x': target_x}, False) <= radius):
-                enemies_within.append(c[i][j])
+    for (i, j), e in units_against(champion):
+        # i is the row here, so y and x are the wrong way around. that's how this has always worked
+        if e.champion and hex_distance(j, i, target_y, target_x) <= radius:
+            enemies_within.append(e)
 
     return enemies_within
 
 
 # find hexes that are within a certain distance
 def hexes_in_distance(target_y, target_x, radius, allow_outside_map=False):
-    hexes_within = []
-    c = coordinates
-    for i in range(-100, 100):
-        for j in range(-100, 100):
-            if allow_outside_map or (i >= 0 and i <= 7 and j >= 0 and j <= 6):
-                if distance({'y': i, 'x': j}, {'y': target_y, 'x': target_x}, False) <= radius:
-                    hexes_within.append([i, j])
-
-    return hexes_within
+    return hex_grid.hexes_within(target_y, target_x, radius, allow_outside_map)
 
 
 # find hexes exactly x away from a coordinate
 def hexes_distance_away(target_y, target_x, radius, allow_outside_map=False):
-    hexes_within = []
-    for i in range(-10, 20):
-        for j in range(-10, 20):
-            if allow_outside_map or (i >= 0 and i <= 7 and j >= 0 and j <= 6):
-                if distance({'y': i, 'x': j}, {'y': target_y, 'x': target_x}, False) == radius:
-                    hexes_within.append([i, j])
-
-    return hexes_within
+    return hex_grid.hexes_at(target_y, target_x, radius, allow_outside_map)
 
 
 def distance(champion1, champion2, objects):
     if objects:
-        c1_coords = to_cube_coords(champion1)
-        c2_coords = to_cube_coords(champion2)
-    else:
-        c1_coords = to_cube_coords_nonobj(champion1)
-        c2_coords = to_cube_coords_nonobj(champion2)
+        return hex_grid.distance(champion1.y, champion1.x, champion2.y, champion2.x)
+    return hex_grid.distance(champion1['y'], champion1['x'], champion2['y'], champion2['x'])
+
 
-    dist = (abs(c1_coords['x'] - c2_coords['x']) +
-            abs(c1_coords['y'] - c2_coords['y']) +
-            abs(c1_coords['z'] - c2_coords['z'])) / 2
-    return dist
+# distance between two hexes given as coordinates
+def hex_distance(y1, x1, y2, x2):
+    return hex_grid.distance(y1, x1, y2, x2)
 
 
 def to_cube_coords(c):
@@ -319,8 +278,7 @@ def cube_round(cube):
 
 
 def line(starting_point, end_point):
-    N = distance({'y': starting_point['y'], 'x': starting_point['x']},
-                 {'y': end_point['y'], 'x': end_point['x']}, False)
+    N = hex_distance(starting_point['y'], starting_point['x'], end_point['y'], end_point['x'])
     results = []
     if N != 0:
         for i in range(0, int(N) + 1):
@@ -381,7 +339,7 @@ def rectangle_from_champion_to_wall_behind_target(champion, width, target_y, tar
         affected_hexes.append([])
         for h in hexline:
             if allow_outside_map or (h[0] >= 0 and h[0] <= 7 and h[1] >= 0 and h[1] <= 6):
-                d = distance({'y': champion.y, 'x': champion.x}, {'y': h[0], 'x': h[1]}, False)
+                d = hex_distance(champion.y, champion.x, h[0], h[1])
                 h.append(d)
                 affected_hexes[i].append(h)
 
@@ -389,6 +347,7 @@ def rectangle_from_champion_to_wall_behind_target(champion, width, target_y, tar
 
 
 def leap_to_back_line(champion, data):
+    coordinates = champion.battle.coordinates
     trait = data['trait']
 
     # set the preferred coordinate which matches the other side of the baord (y-wise) at still somewhat same x-line
@@ -4,9 +4,9 @@ import time
 import random
 import numpy as np
 from Simulator import champion, minion
-from Simulator.champion_functions import MILLIS
+from Simulator.battle import Battle
 from Simulator.carousel import carousel
-from Simulator.alt_autobattler import alt_auto_battle
+from Simulator.alt_autobattler import alt_auto_battle, alt_auto_battle_batch, encode_boards
 
 
 class Game_Round:
@@ -87,7 +87,12 @@ class Game_Round:
         round_index = 0
         while player_round > self.ROUND_DAMAGE[round_index][0]:
             round_index += 1
-        for match in self.matchups:
+        battles = []
+        # decide up front which matches are fought out so the rest can be scored in one batch
+        standard_battles = [global_config.AUTO_BATTLER_PERCENTAGE < np.random.rand() for _ in self.matchups]
+        alt_results = self.alt_combat_results(players, standard_battles, self.ROUND_DAMAGE[round_index][1])
+        for match_index, match in enumerate(self.matchups):
+            standard_battle = standard_battles[match_index]
             if not match[1] == "ghost":
                 # Assigning a battle
                 players[match[0]].opponent = players[match[1]]
@@ -98,14 +103,14 @@ class Game_Round:
                 config.WARLORD_WINS['blue'] = players[match[0]].win_streak
                 config.WARLORD_WINS['red'] = players[match[1]].win_streak
 
-                standard_battle = global_config.AUTO_BATTLER_PERCENTAGE < np.random.rand()
                 if standard_battle:
                     # Main simulation call
+                    battle = Battle()
+                    battles.append(battle)
                     index_won, damage = champion.run(champion.champion, players[match[0]], players[match[1]],
-                                                     self.ROUND_DAMAGE[round_index][1])
+                                                     self.ROUND_DAMAGE[round_index][1], battle)
                 else:
-                    index_won, damage = alt_auto_battle(players[match[0]], players[match[1]],
-                                                        self.ROUND_DAMAGE[round_index][1])
+                    index_won, damage = alt_results[match_index]
 
                 # Draw
                 if index_won == 0:
@@ -149,12 +154,13 @@ class Game_Round:
                 players[match[0]].opponent = players[match[2]]
                 config.WARLORD_WINS['blue'] = players[match[0]].win_streak
                 config.WARLORD_WINS['red'] = players[match[2]].win_streak
-                if global_config.AUTO_BATTLER_PERCENTAGE < np.random.rand():
+                if standard_battle:
+                    battle = Battle()
+                    battles.append(battle)
                     index_won, damage = champion.run(champion.champion, players[match[0]], players[match[2]],
-                                                     self.ROUND_DAMAGE[round_index][1])
+                                                     self.ROUND_DAMAGE[round_index][1], battle)
                 else:
-                    index_won, damage = alt_auto_battle(players[match[0]], players[match[2]],
-                                                        self.ROUND_DAMAGE[round_index][1])
+                    index_won, damage = alt_results[match_index]
                 if index_won == 2 or index_won == 0:
                     players[match[0]].health -= damage
                     players[match[0]].loss_round(damage)
@@ -168,9 +174,30 @@ class Game_Round:
                                 alive.append(other)
                     for other in alive:
                         other.spill_reward(damage / len(alive))
-        log_to_file_combat()
+        log_to_file_combat(battles)
         return True
 
+    def alt_combat_results(self, players, standard_battles, round_damage):
+        """
+        Scores every match that is not fought out with one alt_auto_battle_batch call.
+
+        args:
+            players: Dict[player_id, player]
+            standard_battles: List[bool] for each of self.matchups, True when the match gets a real fight
+            round_damage: int
+        returns:
+            Dict[match index, (index_won, damage)]
+        """
+        alt_matches = [i for i, standard_battle in enumerate(standard_battles) if not standard_battle]
+        if not alt_matches:
+            return {}
+        # a ghost match is [player, "ghost", ghost player]
+        opponents = [self.matchups[i][2] if self.matchups[i][1] == "ghost" else self.matchups[i][1]
+                     for i in alt_matches]
+        index_won, damage = alt_auto_battle_batch(encode_boards([players[self.matchups[i][0]] for i in alt_matches]),
+                                                  encode_boards([players[o] for o in opponents]), round_damage)
+        return {i: (int(won), dmg.item()) for i, won, dmg in zip(alt_matches, index_won, damage)}
+
     def single_combat_phase(self, players):
         """
         Plays a single round of combat between 2 players. Used by the positioning and item models for an environment.
@@ -185,10 +212,13 @@ class Game_Round:
         config.WARLORD_WINS['blue'] = players[0].win_streak
         config.WARLORD_WINS['red'] = players[1].win_streak
 
+        battles = []
         standard_battle = global_config.AUTO_BATTLER_PERCENTAGE < np.random.rand()
         if standard_battle:
             # Main simulation call
-            index_won, damage = champion.run(champion.champion, players[0], players[1])
+            battle = Battle()
+            battles.append(battle)
+            index_won, damage = champion.run(champion.champion, players[0], players[1], 0, battle)
         else:
             index_won, damage = alt_auto_battle(players[0], players[1])
 
@@ -207,7 +237,7 @@ class Game_Round:
             players[0].loss_round(damage)
             players[1].won_round(damage)
 
-        log_to_file_combat()
+        log_to_file_combat(battles)
         return True
 
     def decide_player_combat(self):
@@ -330,7 +360,6 @@ class Game_Round:
         # Will implement check dead later
         # if self.check_dead(agent, buffer, game_episode):
         #     return True
-        log_to_file_combat()
         return False
 
     # executes carousel round for all players
@@ -376,18 +405,18 @@ def log_end_turn(game_round):
 
 
 # This one is for the champion and logging the battles.
-def log_to_file_combat():
+def log_to_file_combat(battles):
     if config.LOGMESSAGES and config.LOG_COMBAT:
         with open('log.txt', "a") as out:
-            if len(champion.log) > 0:
-                if MILLIS() < 75000:
-                    if champion.log[-1] == 'BLUE TEAM WON':
-                        champion.test_multiple['blue'] += 1
-                    if champion.log[-1] == 'RED TEAM WON':
-                        champion.test_multiple['red'] += 1
-                elif MILLIS() < 200000:
-                    champion.test_multiple['draw'] += 1
-                for line in champion.log:
-                    out.write(str(line))
-                    out.write('\n')
-    champion.log = []
+            for battle in battles:
+                if len(battle.log) > 0:
+                    if battle.millis() < 75000:
+                        if battle.log[-1] == 'BLUE TEAM WON':
+                            champion.test_multiple['blue'] += 1
+                        if battle.log[-1] == 'RED TEAM WON':
+                            champion.test_multiple['red'] += 1
+                    elif battle.millis() < 200000:
+                        champion.test_multiple['draw'] += 1
+                    for line in battle.log:
+                        out.write(str(line))
+                        out.write('\n')
@@ -0,0 +1,135 @@
+import math
+
+# Lookup tables for the hex board. Built once when the module is imported so that field.py doesn't have to
+# loop over the board (or a 200x200 grid around it) every time an ability asks which hexes are in range.
+# Coordinates are [y, x] like in battle.coordinates: 0 <= y < 8, 0 <= x < 7. odd rows are shifted right.
+
+HEIGHT = 8
+WIDTH = 7
+
+# hexes_in_distance() with allow_outside_map looks at y and x in range(-100, 100),
+# hexes_distance_away() with allow_outside_map at range(-10, 20)
+WITHIN_WINDOW = (-100, 100)
+RING_WINDOW = (-10, 20)
+
+# radius tables for hexes off the board / with allow_outside_map go up to this. bigger ones are calculated
+MAX_OFFSET_RADIUS = 20
+
+DIRECTIONS = [
+    [[+1, 0], [+1, +1], [0, -1],
+     [0, +1], [-1, 0], [-1, +1]],
+    [[+1, -1], [+1, 0], [0, -1],
+     [0, +1], [-1, -1], [-1, 0]],
+]
+
+
+def on_board(y, x):
+    return 0 <= y < HEIGHT and 0 <= x < WIDTH
+
+
+def cube_distance(y1, x1, y2, x2):
+    c1_x = x1 - (y1 + (y1 & 1)) / 2
+    c1_z = y1
+    c1_y = -c1_x - c1_z
+    c2_x = x2 - (y2 + (y2 & 1)) / 2
+    c2_z = y2
+    c2_y = -c2_x - c2_z
+    return (abs(c1_x - c2_x) + abs(c1_y - c2_y) + abs(c1_z - c2_z)) / 2
+
+
+def calculate_neighbors(y, x, allow_outside_map):
+    neighbors = []
+    for c in DIRECTIONS[y & 1]:
+        n_y = c[0] + y
+        n_x = c[1] + x
+        if allow_outside_map or on_board(n_y, n_x):
+            neighbors.append((n_y, n_x))
+    return neighbors
+
+
+BOARD = [(y, x) for y in range(HEIGHT) for x in range(WIDTH)]
+
+# (y, x) -> neighbor hexes, same order as the directions above
+NEIGHBORS = {allow: {(y, x): calculate_neighbors(y, x, allow) for y, x in BOARD} for allow in [False, True]}
+
+# (y1, x1, y2, x2) -> distance between two hexes on the board
+DISTANCE = {(y1, x1, y2, x2): cube_distance(y1, x1, y2, x2) for y1, x1 in BOARD for y2, x2 in BOARD}
+MAX_DISTANCE = int(max(DISTANCE.values()))
+
+# (y, x) -> [hexes within radius 0, hexes within radius 1, ...] up to MAX_DISTANCE (which is the whole board)
+WITHIN = {}
+# (y, x) -> [hexes exactly 0 away, hexes exactly 1 away, ...] up to MAX_DISTANCE
+RING = {}
+for o_y, o_x in BOARD:
+    WITHIN[(o_y, o_x)] = [[h for h in BOARD if DISTANCE[(o_y, o_x) + h] <= r] for r in range(MAX_DISTANCE + 1)]
+    RING[(o_y, o_x)] = [[h for h in BOARD if DISTANCE[(o_y, o_x) + h] == r] for r in range(MAX_DISTANCE + 1)]
+
+# The distance between two hexes only depends on dy, dx and whether the first row is odd or even.
+# row parity -> radius -> [dy, dx] offsets sorted by (dy, dx), the same order the old board scans returned them in
+WITHIN_OFFSETS = [[], []]
+RING_OFFSETS = [[], []]
+for parity in [0, 1]:
+    offsets = [(dy, dx) for dy in range(-MAX_OFFSET_RADIUS, MAX_OFFSET_RADIUS + 1)
+               for dx in range(-2 * MAX_OFFSET_RADIUS, 2 * MAX_OFFSET_RADIUS + 1)]
+    offset_distance = {o: cube_distance(parity, 0, parity + o[0], o[1]) for o in offsets}
+    for r in range(MAX_OFFSET_RADIUS + 1):
+        WITHIN_OFFSETS[parity].append([o for o in offsets if offset_distance[o] <= r])
+        RING_OFFSETS[parity].append([o for o in offsets if offset_distance[o] == r])
+
+
+def distance(y1, x1, y2, x2):
+    d = DISTANCE.get((y1, x1, y2, x2))
+    if d is None:
+        return cube_distance(y1, x1, y2, x2)
+    return d
+
+
+def neighbors(y, x, allow_outside_map=False):
+    table = NEIGHBORS[allow_outside_map].get((y, x))
+    if table is None:
+        table = calculate_neighbors(y, x, allow_outside_map)
+    return [[n[0], n[1]] for n in table]
+
+
+def translate(y, x, offsets, window, allow_outside_map):
+    if allow_outside_map:
+        low, high = window
+        return [[y + dy, x + dx] for dy, dx in offsets if low <= y + dy < high and low <= x + dx < high]
+    return [[y + dy, x + dx] for dy, dx in offsets if on_board(y + dy, x + dx)]
+
+
+# all hexes within radius of [y, x]. distances are whole numbers so a radius of 2.5 is the same as 2
+def hexes_within(y, x, radius, allow_outside_map=False):
+    if radius < 0:
+        return []
+    r = math.floor(radius)
+    if not allow_outside_map and (y, x) in WITHIN:
+        table = WITHIN[(y, x)]
+        return [[h[0], h[1]] for h in table[min(r, MAX_DISTANCE)]]
+    if r > MAX_OFFSET_RADIUS:
+        return scan(y, x, lambda d: d <= radius, WITHIN_WINDOW, allow_outside_map)
+    return translate(y, x, WITHIN_OFFSETS[y & 1][r], WITHIN_WINDOW, allow_outside_map)
+
+
+# all hexes exactly radius away from [y, x]
+def hexes_at(y, x, radius, allow_outside_map=False):
+    if radius < 0 or radius != math.floor(radius):
+        return []
+    r = int(radius)
+    if not allow_outside_map and (y, x) in RING:
+        if r > MAX_DISTANCE:
+            return []
+        return [[h[0], h[1]] for h in RING[(y, x)][r]]
+    if r > MAX_OFFSET_RADIUS:
+        return scan(y, x, lambda d: d == radius, RING_WINDOW, allow_outside_map)
+    return translate(y, x, RING_OFFSETS[y & 1][r], RING_WINDOW, allow_outside_map)
+
+
+# the slow way, for radiuses that are not in the tables
+def scan(y, x, condition, window, allow_outside_map):
+    hexes = []
+    for i in range(*window):
+        for j in range(*window):
+            if (allow_outside_map or on_board(i, j)) and condition(cube_distance(i, j, y, x)):
+                hexes.append([i, j])
+    return hexes
@@ -2,6 +2,7 @@ import collections
 import numpy as np
 import config
 from Simulator.stats import COST
+from Simulator.stat_table import IDS
 from Simulator.origin_class import team_traits, game_comp_tiers
 
 '''
@@ -137,7 +138,7 @@ class Observation:
                         shop_costs[x] = 3 * COST[shop[x]] - 1
                 else:
                     shop_costs[x] = COST[shop[x]]
-                i_index = list(COST.keys()).index(shop[x])
+                i_index = IDS[shop[x]]
                 if i_index == 0:
                     self.shop_mask[x] = 0
                 # This should update the item name section of the vector
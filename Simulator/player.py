@@ -9,6 +9,7 @@ from Simulator.item_stats import basic_items, item_builds, thieves_gloves_items,
     starting_items, trait_items, uncraftable_items
 
 from Simulator.stats import COST
+from Simulator.stat_table import IDS
 from Simulator.pool_stats import cost_star_values
 from Simulator.origin_class_stats import tiers, fortune_returns
 from Simulator.default_agent import Default_Agent
@@ -445,7 +446,7 @@ class Player:
                 champion_info_array = np.zeros(6 * 4 + 2, dtype=np.float32)
                 if self.board[x][y]:
                     curr_champ = self.board[x][y]
-                    c_index = list(COST.keys()).index(curr_champ.name)
+                    c_index = IDS[curr_champ.name]
 
                     # create the label for the champion to help with training
                     if c_index < len(CHAMPION_ACTION_DIM):
@@ -503,7 +504,7 @@ class Player:
             champion_info_array = np.zeros(6 * 4 + 2, dtype=np.float32)
             if self.bench[x_bench]:
                 curr_champ = self.bench[x_bench]
-                c_index = list(COST.keys()).index(curr_champ.name)
+                c_index = IDS[curr_champ.name]
                 champion_info_array[0:6] = utils.champ_binary_encode(c_index)
                 champion_info_array[6] = curr_champ.stars / 3
                 champion_info_array[7] = curr_champ.cost / 5
@@ -1680,7 +1681,7 @@ class Player:
         for x in range(9):
             if self.bench[x]:
                 if self.bench[x].name == 'kayn':
-                    self.bench[x].kaynform = kayn_item
+                    self.bench[x].kayn_form = kayn_item
 
     """
     Description - Updates shop costs to use for the shop mask
@@ -0,0 +1,45 @@
+import numpy as np
+import Simulator.config as config
+import Simulator.stats as stats
+
+# The per champion stats of stats.py as tables indexed by champion id, built once when the module is imported.
+# A champion keeps its id (champion.champion_id) so combat can index a list instead of hashing the name,
+# and health / AD already have the star multiplier applied.
+# Ids follow the order of stats.COST, the same numbers the observation vectors use to encode a champion.
+
+NAMES = list(stats.COST)  # champion id -> name. id 0 is the empty ' ' slot
+IDS = {name: i for i, name in enumerate(NAMES)}
+
+# per star tables are indexed by stars, index 0 is unused like in the [0, 1 star, 2 star, 3 star] lists of stats.py
+STAR_LEVELS = 4
+
+
+def by_id(table, default=0):
+    return [table.get(name, default) for name in NAMES]
+
+
+# health and AD grow by config.STARMULTIPLIER per star. construct and galio have their own per star lists
+def star_scaled(value, stars):
+    if isinstance(value, list):
+        return value[stars] if stars < len(value) else 0
+    return round(value * config.STARMULTIPLIER ** (stars - 1), 1)
+
+
+HEALTH = [[star_scaled(h, s) for s in range(STAR_LEVELS)] for h in by_id(stats.HEALTH)]
+AD = [[star_scaled(a, s) for s in range(STAR_LEVELS)] for a in by_id(stats.AD)]
+AS = by_id(stats.AS)
+ARMOR = by_id(stats.ARMOR)
+MR = by_id(stats.MR)
+RANGE = by_id(stats.RANGE)
+MANA = by_id(stats.MANA)
+MAXMANA = by_id(stats.MAXMANA)
+COST = by_id(stats.COST)
+MANALOCK = by_id(stats.MANALOCK)
+ABILITY_REQUIRES_TARGET = by_id(stats.ABILITY_REQUIRES_TARGET, False)
+ABILITY_WHILE_DISARMED = by_id(stats.ABILITY_WHILE_DISARMED, False)
+ATTACK_WHILE_ABILITY_ACTIVE = by_id(stats.ATTACK_WHILE_ABILITY_ACTIVE, False)
+
+# The base stats again as one array for code that looks at many units at once: [champion id, stars, column]
+COLUMNS = ['health', 'AD', 'AS', 'armor', 'MR', 'range', 'mana', 'maxmana', 'cost']
+BASE_STATS = np.array([[[HEALTH[i][s], AD[i][s], AS[i], ARMOR[i], MR[i], RANGE[i], MANA[i], MAXMANA[i], COST[i]]
+                        for s in range(STAR_LEVELS)] for i in range(len(NAMES))], dtype=np.float32)
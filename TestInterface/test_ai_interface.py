@@ -33,8 +33,9 @@ class AIInterface:
             data_workers.collect_gameplay_experience(env, buffers, weights)
 
             while global_buffer.available_batch():
-                gameplay_experience_batch = global_buffer.sample_batch()
-                trainer.train_network(gameplay_experience_batch, train_step)
+                gameplay_experience_batch, slots = global_buffer.sample_batch()
+                value_errors = trainer.train_network(gameplay_experience_batch, train_step)
+                global_buffer.update_priorities(slots, value_errors)
                 train_step += 1
                 if train_step % 100 == 0:
                     global_agent.tft_save_model(train_step)
@@ -2,6 +2,7 @@ import time
 import config
 from Models.MuZero_torch_agent import MuZeroNetwork as TFTNetwork
 from Simulator import utils
+import Models.MCTS_Util as util
 from Models.MCTS_torch import MCTS
 from Models.MCTS_default_torch import Default_MCTS
 from Models.Muzero_default_agent import MuZeroDefaultNetwork as DefaultNetwork
@@ -76,8 +77,8 @@ class DataWorker(object):
         # While the game is still going on.
         while not all(terminated.values()):
             # Ask our model for an action and policy. Use on normal case or if we only have current versions left
-            actions, policy, string_samples, root_values = self.model_call(player_observation, info)
-            storage_actions = utils.decode_action(actions)
+            actions, policy, sampled_actions, root_values = self.model_call(player_observation, info)
+            storage_actions = util.action_vectors(actions)
             step_actions = self.getStepActions(terminated, storage_actions)
 
             # Take that action within the environment and return all of our information for the next player
@@ -93,7 +94,7 @@ class DataWorker(object):
                         # Store the information in a buffer to train on later.
                         buffers.store_replay_buffer(key, self.get_obs_idx(player_observation[0], i),
                                                     storage_actions[i], reward[key], policy[i],
-                                                    string_samples[i], root_values[i], current_comp[key],
+                                                    sampled_actions[i], root_values[i], current_comp[key],
                                                     current_champs[key])
 
             offset = 0
@@ -136,8 +137,8 @@ class DataWorker(object):
                 if info_values[0]['start_turn']:
                     # Ask our model for an action and policy.
                     # Use on normal case or if we only have current versions left
-                    c_actions, policy, string_samples, root_values = self.agent_network.policy(player_observation[:2])
-                    storage_actions = utils.decode_action(c_actions)
+                    c_actions, policy, sampled_actions, root_values = self.agent_network.policy(player_observation[:2])
+                    storage_actions = util.action_vectors(c_actions)
                     step_actions = self.getStepActions(terminated, storage_actions)
                     for player_id in step_actions.keys():
                         info[player_id]['player'].default_champion_list(step_actions[player_id])
@@ -146,13 +147,13 @@ class DataWorker(object):
                     for i, key in enumerate(terminated.keys()):
                         # Store the information in a buffer to train on later.
                         buffers.store_replay_buffer(key, player_observation[0][i], storage_actions[i],
-                                                    reward[key], policy[i], string_samples[i], root_values[i])
+                                                    reward[key], policy[i], sampled_actions[i], root_values[i])
 
                 actions = ["0"] * len(self.default_agent)
                 for i, default_agent in enumerate(self.default_agent):
                     actions[i] = info_values[i]["player"].default_policy(info_values[i]["game_round"],
                                                                          info_values[i]["shop"])
-                storage_actions = utils.decode_action(actions)
+                storage_actions = util.action_vectors(actions)
                 step_actions = self.getStepActions(terminated, storage_actions)
                 # Take that action within the environment and return all of our information for the next player
                 next_observation, reward, terminated, _, info = env.step(step_actions)
@@ -275,26 +276,26 @@ class DataWorker(object):
 
     def model_call(self, player_observation, info):
         if config.IMITATION:
-            actions, policy, string_samples, root_values = self.imitation_learning(player_observation[:2], info)
+            actions, policy, sampled_actions, root_values = self.imitation_learning(player_observation[:2], info)
         # If all of our agents are current versions
         elif (self.live_game or not any(self.past_version)) and not any(self.default_agent):
-            actions, policy, string_samples, root_values = self.agent_network.policy(player_observation[:2])
+            actions, policy, sampled_actions, root_values = self.agent_network.policy(player_observation[:2])
         # Ff all of our agents are past versions. (Should exceedingly rarely come here)
         elif all(self.past_version) and not any(self.default_agent):
-            actions, policy, string_samples, root_values = self.past_network.policy(player_observation[:2])
+            actions, policy, sampled_actions, root_values = self.past_network.policy(player_observation[:2])
         # If all of our versions are default agents
         elif all(self.default_agent):
-            actions, policy, string_samples, root_values = self.default_model_call(info)
+            actions, policy, sampled_actions, root_values = self.default_model_call(info)
         # If there are no default agents but a mix of past and present
         elif not any(self.default_agent):
-            actions, policy, string_samples, root_values = self.mixed_ai_model_call(player_observation[:2])
+            actions, policy, sampled_actions, root_values = self.mixed_ai_model_call(player_observation[:2])
         # Implement the remaining mixes of agents here.
         elif not any(self.past_version):
-            actions, policy, string_samples, root_values = self.live_default_model_call(player_observation[:2], info)
+            actions, policy, sampled_actions, root_values = self.live_default_model_call(player_observation[:2], info)
         # If we only have default_agents remaining.
         else:
-            actions, policy, string_samples, root_values = self.default_model_call(info)
-        return actions, policy, string_samples, root_values
+            actions, policy, sampled_actions, root_values = self.default_model_call(info)
+        return actions, policy, sampled_actions, root_values
 
     def mixed_ai_model_call(self, player_observation):
         # I need to send the observations that are part of the past players to one vector
@@ -322,32 +323,32 @@ class DataWorker(object):
                 past_agent_masks.append(player_observation[1][i])
         live_observation = [np.asarray(live_agent_observations), live_agent_masks]
         past_observation = [np.asarray(past_agent_observations), past_agent_masks]
-        live_actions, live_policy, live_string_samples, live_root_values = self.agent_network.policy(live_observation)
-        past_actions, past_policy, past_string_samples, past_root_values = self.past_network.policy(past_observation)
+        live_actions, live_policy, live_sampled_actions, live_root_values = self.agent_network.policy(live_observation)
+        past_actions, past_policy, past_sampled_actions, past_root_values = self.past_network.policy(past_observation)
         actions = [None] * len(self.past_version)
         policy = [None] * len(self.past_version)
-        string_samples = [None] * len(self.past_version)
+        sampled_actions = [None] * len(self.past_version)
         root_values = [None] * len(self.past_version)
         counter_live, counter_past = 0, 0
         for i, past_version in enumerate(self.past_version):
             if past_version:
                 actions[i] = past_actions[counter_past]
                 policy[i] = past_policy[counter_past]
-                string_samples[i] = past_string_samples[counter_past]
+                sampled_actions[i] = past_sampled_actions[counter_past]
                 root_values[i] = past_root_values[counter_past]
                 counter_past += 1
             else:
                 actions[i] = live_actions[counter_live]
                 policy[i] = live_policy[counter_live]
-                string_samples[i] = live_string_samples[counter_live]
+                sampled_actions[i] = live_sampled_actions[counter_live]
                 root_values[i] = live_root_values[counter_live]
                 counter_live += 1
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     def live_default_model_call(self, player_observation, info):
         actions = ["0"] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [0] * len(self.default_agent)
 
         live_agent_observations = []
@@ -360,7 +361,7 @@ class DataWorker(object):
 
         live_observation = [live_agent_observations, live_agent_masks]
         if len(live_observation[0]) != 0:
-            live_actions, live_policy, live_string_samples, live_root_values = \
+            live_actions, live_policy, live_sampled_actions, live_root_values = \
                 self.agent_network.policy(live_observation)
 
             counter_live, counter_default = 0, 0
@@ -373,7 +374,7 @@ class DataWorker(object):
                 else:
                     actions[i] = live_actions[counter_live]
                     policy[i] = live_policy[counter_live]
-                    string_samples[i] = live_string_samples[counter_live]
+                    sampled_actions[i] = live_sampled_actions[counter_live]
                     root_values[i] = live_root_values[counter_live]
                     counter_live += 1
         else:
@@ -386,42 +387,42 @@ class DataWorker(object):
                                                                         local_info[i]["shop"])
                     # Turn action into one hot policy
                     counter_default += 1
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     def past_default_model_call(self, info):
         actions = [None] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [None] * len(self.default_agent)
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     def live_past_default_model_call(self, info):
         actions = [None] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [None] * len(self.default_agent)
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     def default_model_call(self, info):
         actions = ["0"] * len(self.default_agent)
         policy = [None] * len(self.default_agent)
-        string_samples = [None] * len(self.default_agent)
+        sampled_actions = [None] * len(self.default_agent)
         root_values = [1] * len(self.default_agent)
         local_info = list(info.values())
         for i, default_agent in enumerate(self.default_agent):
             if default_agent:
                 actions[i] = local_info[i]["player"].default_policy(local_info[i]["game_round"], local_info[i]["shop"])
-        return actions, policy, string_samples, root_values
+        return actions, policy, sampled_actions, root_values
 
     def imitation_learning(self, player_observation, info):
         policy = [[1.0] for _ in range(len(self.default_agent))]
-        string_samples = [[] for _ in range(len(self.default_agent))]
+        sampled_actions = [[] for _ in range(len(self.default_agent))]
         root_values = [0 for _ in range(len(self.default_agent))]
         actions = ["0" for _ in range(len(self.default_agent))]
 
         local_info = list(info.values())
         for i, default_agent in enumerate(self.default_agent):
-            string_samples[i] = [local_info[i]["player"].default_policy(local_info[i]["game_round"],
+            sampled_actions[i] = [local_info[i]["player"].default_policy(local_info[i]["game_round"],
                                                                         local_info[i]["shop"])]
-            actions[i] = string_samples[i][0]
-        return actions, policy, string_samples, root_values
+            actions[i] = sampled_actions[i][0]
+        return actions, policy, sampled_actions, root_values
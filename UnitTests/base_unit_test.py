@@ -4,6 +4,9 @@ import UnitTests.drop_rate_test as DropRateTests
 import UnitTests.MCTS_test as MCTSTest
 import UnitTests.mapping_test as MappingTests
 import UnitTests.checkpoint_test as CheckpointTests
+import UnitTests.battle_test as BattleTests
+import UnitTests.inference_test as InferenceTests
+import UnitTests.replay_test as ReplayTests
 import config
 
 
@@ -20,4 +23,9 @@ def runTest():
         MappingTests.test_list()
     if config.RUN_CHECKPOINT_TESTS:
         CheckpointTests.test_list()
-
+    if config.RUN_BATTLE_TESTS:
+        BattleTests.test_list()
+    if config.RUN_INFERENCE_TESTS:
+        InferenceTests.test_list()
+    if config.RUN_REPLAY_TESTS:
+        ReplayTests.test_list()
@@ -0,0 +1,206 @@
+import random
+import threading
+from Simulator.player import Player
+from Simulator.pool import pool
+from Simulator.battle import Battle
+from Simulator.event_queue import EventQueue
+from Simulator import champion as c_object
+from Simulator import alt_autobattler
+from Simulator import champion_functions, field, hex_grid, item_stats, items, origin_class, origin_class_stats, \
+    stat_table, stats
+
+
+def setup(units, player_num=0) -> Player:
+    """Creates a player with the given [name, stars, items] units on its board"""
+    player = Player(pool(), player_num)
+    for i, (name, stars, items) in enumerate(units):
+        player.board[i][i % 4] = c_object.champion(name, stars=stars, itemlist=list(items))
+    return player
+
+
+BLUE_UNITS = [['kennen', 2, ['sunfire_cape']], ['morgana', 1, []], ['yone', 2, ['infinity_edge']],
+              ['jhin', 2, []], ['riven', 1, ['bramble_vest']]]
+RED_UNITS = [['lulu', 2, ['ionic_spark']], ['vi', 2, []], ['zed', 1, ['deathblade']],
+             ['kalista', 2, []], ['vayne', 1, ['statikk_shiv']]]
+
+
+def play(seed, event_skipping=True):
+    battle = Battle(rng=random.Random(seed), event_skipping=event_skipping)
+    result = c_object.run(c_object.champion, setup(BLUE_UNITS), setup(RED_UNITS, 1), 0, battle)
+    assert board_units_match(battle)
+    # champion.print() ends each line with wall clock nanoseconds, leave those out
+    return result, battle.millis(), [line[:132] for line in battle.log]
+
+
+def state_is_per_battle_test():
+    first = Battle()
+    second = Battle()
+    c_object.champion('vi', 'blue', 0, 0, battle=first)
+    first.amounts['divine']['blue'] += 1
+    first.yone_list.append('unit')
+    assert second.coordinates[0][0] is None
+    assert second.amounts['divine']['blue'] == 0
+    assert second.yone_list == []
+    # units outside of a fight do not get one, their events and log lines are dropped
+    bench = c_object.champion('kennen', itemlist=['sunfire_cape'])
+    assert bench.battle is None and bench.own_team() is False and bench.millis() == 0
+
+
+def event_queue_test():
+    que = EventQueue()
+    unit, other = object(), object()
+    que.push(['change_stat', unit, 100, None, 'stunned', False, {}])
+    que.push(['heal', unit, 50, None, None, 10, {}])
+    que.push(['change_stat', unit, 100, None, 'armor', 20, {}])
+    que.push(['burn', other, 100, None, None, unit, {}])
+    que.push(['change_stat', unit, 150, None, 'stunned', False, {}])
+    assert len(que) == 5
+    assert len(que.events(unit, 'burn')) == 1
+
+    # a cancelled event is never popped and the ones left keep their order
+    que.cancel(unit, 'change_stat', 'stunned', lambda q: q[2] == 100)
+    assert len(que) == 4
+    que.cancel(unit, 'burn')
+    assert [e[0] for e in que.events(unit, 'change_stat', 'armor')] == ['change_stat']
+
+    # same ms comes out in the order it was added
+    que.push(['clear_idle', other, 100, None, None, None, {}])
+    popped = []
+    while len(que) > 0:
+        popped.append(que.pop())
+    assert [(e[0], e[2]) for e in popped] == [('heal', 50), ('change_stat', 100), ('clear_idle', 100),
+                                              ('change_stat', 150)]
+    assert que.peek() is None
+
+
+def hex_grid_test():
+    # the tables have to give the same answers as checking every hex one by one
+    for y, x in [[0, 0], [3, 4], [7, 6], [-1, 2], [9, 8]]:
+        for allow_outside_map in [False, True]:
+            for radius in [0, 1, 2.5, 3, 8]:
+                within = hex_grid.scan(y, x, lambda d: d <= radius, hex_grid.WITHIN_WINDOW, allow_outside_map)
+                assert hex_grid.hexes_within(y, x, radius, allow_outside_map) == within
+                ring = hex_grid.scan(y, x, lambda d: d == radius, hex_grid.RING_WINDOW, allow_outside_map)
+                assert hex_grid.hexes_at(y, x, radius, allow_outside_map) == ring
+    assert hex_grid.neighbors(0, 0) == [[1, 0], [1, 1], [0, 1]]
+    assert len(hex_grid.neighbors(0, 0, True)) == 6
+    assert hex_grid.distance(0, 0, 7, 6) == hex_grid.cube_distance(0, 0, 7, 6) == 9
+
+
+# battle.board_units has to hold exactly the units standing on battle.coordinates
+def board_units_match(battle):
+    on_board = {}
+    for y, row in enumerate(battle.coordinates):
+        for x, unit in enumerate(row):
+            if unit:
+                on_board.setdefault(unit.team, {})[(y, x)] = unit
+    return {team: units for team, units in battle.board_units.items() if units} == on_board
+
+
+def board_units_test():
+    battle = Battle()
+    blue = c_object.champion('vi', 'blue', 0, 0, battle=battle)
+    red = c_object.champion('zed', 'red', 5, 3, battle=battle)
+    assert battle.board_units['red'] == {(5, 3): red}
+    blue.move(1, 0)
+    assert battle.board_units['blue'] == {(1, 0): blue}
+    battle.coordinates[5][3] = None
+    assert battle.board_units['red'] == {}
+    assert board_units_match(battle)
+
+
+def find_path_test():
+    battle = Battle()
+    vi = c_object.champion('vi', 'blue', 2, 0, battle=battle)
+    zed = c_object.champion('zed', 'red', 2, 3, battle=battle)
+    for y, x in [[2, 1], [2, 2], [1, 1], [3, 1]]:
+        c_object.champion('lulu', 'blue', y, x, battle=battle)
+    # the way straight ahead is blocked, going around takes 6 steps and ends on the target
+    path = field.find_path(vi, zed.y, zed.x)
+    assert len(path) == 6 and path[-1] == [2, 3]
+    for a, b in zip([[2, 0]] + path, path):
+        assert field.hex_distance(a[0], a[1], b[0], b[1]) == 1
+        assert b == [2, 3] or battle.coordinates[b[0]][b[1]] is None
+    # shut in
+    c_object.champion('lulu', 'blue', 1, 0, battle=battle)
+    c_object.champion('lulu', 'blue', 3, 0, battle=battle)
+    assert field.find_path(vi, zed.y, zed.x) is None
+    assert field.find_path(vi, vi.y, vi.x) == []
+
+
+def dispatch_tables_test():
+    # every name the fight can ask for has to be in the tables
+    assert set(items.initiative_functions) == set(item_stats.initiative_items)
+    assert set(origin_class.trait_functions) == set(origin_class_stats.initiate_traits)
+    vi = c_object.champion('vi', battle=Battle())
+    assert champion_functions.reset_stat(vi, 'AD') == 65
+    assert champion_functions.reset_stat(vi, 'movement_delay') == champion_functions.config.MOVEMENTDELAY
+    # a unit without a team has no team list
+    assert vi.own_team() is False
+    assert c_object.champion('vi', 'blue', 0, 0, battle=vi.battle).own_team() is vi.battle.blue
+
+
+def stat_table_test():
+    assert list(stat_table.IDS) == list(stats.COST)
+    for name in ['vi', 'kayn', 'zilean']:
+        for stars in [1, 2, 3]:
+            unit = c_object.champion(name, stars=stars, battle=Battle())
+            c_id = stat_table.IDS[name]
+            assert unit.champion_id == c_id
+            assert unit.health == stat_table.HEALTH[c_id][stars] == stat_table.BASE_STATS[c_id, stars, 0]
+            assert unit.AD == round(stats.AD[name] * champion_functions.config.STARMULTIPLIER ** (stars - 1), 1)
+            assert stat_table.MANALOCK[c_id] == stats.MANALOCK[name]
+
+
+def alt_auto_battle_test():
+    blue, red = setup(BLUE_UNITS), setup(RED_UNITS[:3], 1)
+    blue.update_team_tiers()
+    red.update_team_tiers()
+    one_by_one = [alt_autobattler.alt_auto_battle(blue, red, 2), alt_autobattler.alt_auto_battle(red, blue, 2),
+                  alt_autobattler.alt_auto_battle(blue, blue, 2)]
+    index_won, damage = alt_autobattler.alt_auto_battle_batch(alt_autobattler.encode_boards([blue, red, blue]),
+                                                              alt_autobattler.encode_boards([red, blue, blue]), 2)
+    assert list(zip(index_won.tolist(), damage.tolist())) == one_by_one
+    assert one_by_one[0][0] == 1 and one_by_one[1][0] == 2 and one_by_one[2] == (0, 2)
+
+
+def sequential_battles_test():
+    # Same seed, same fight. Running another fight in between must not change that.
+    first = play(1)
+    play(2)
+    assert play(1) == first
+
+
+def event_skipping_test():
+    # jumping over the quiet ticks must not change anything
+    for seed in range(3):
+        assert play(seed, event_skipping=True) == play(seed, event_skipping=False)
+
+
+def threaded_battles_test():
+    expected = {seed: play(seed) for seed in range(4)}
+    results = {}
+
+    def worker(seed):
+        results[seed] = play(seed)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == expected
+
+
+def test_list():
+    state_is_per_battle_test()
+    event_queue_test()
+    hex_grid_test()
+    board_units_test()
+    find_path_test()
+    dispatch_tables_test()
+    stat_table_test()
+    alt_auto_battle_test()
+    sequential_battles_test()
+    event_skipping_test()
+    threaded_battles_test()
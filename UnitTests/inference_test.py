@@ -0,0 +1,75 @@
+import threading
+import numpy as np
+import torch
+import config
+
+if not torch.cuda.is_available():
+    config.DEVICE = "cpu"
+
+from Concurrency.inference_server import InferenceBatcher, InferenceClient, to_numpy, to_torch, take_rows
+from UnitTests.mcts_benchmark import random_observation
+
+
+def outputs_match(first, second):
+    if isinstance(first, dict):
+        return all(outputs_match(first[key], second[key]) for key in first)
+    if isinstance(first, list):
+        return all(outputs_match(a, b) for a, b in zip(first, second))
+    # batched matrix products round a little differently
+    return np.allclose(first, second, rtol=1e-3, atol=1e-4)
+
+
+def batcher_rows_test():
+    batcher = InferenceBatcher(max_batch=1000, deadline=0.2)
+    network = InferenceBatcher.load_model().to(config.DEVICE)
+    batcher.set_weights("test", network.get_weights())
+
+    # callers with different numbers of players, all of them get into one batch and back only their own rows
+    rng = np.random.default_rng(0)
+    observations = [random_observation(rng, players)[0] for players in [1, 3, 8, 2, 5]]
+    results = {}
+
+    def worker(index):
+        initial = batcher.initial_inference("test", observations[index])
+        action = np.zeros((len(observations[index]["shop"]), 3), dtype=np.int64)
+        action[:, 0] = index
+        results[index] = [initial, batcher.recurrent_inference("test", initial["hidden_state"], action), action]
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(len(observations))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with torch.no_grad():
+        for index, observation in enumerate(observations):
+            initial, recurrent, action = results[index]
+            direct = to_numpy(network.initial_inference(observation))
+            assert outputs_match(initial, direct)
+            hidden_state = to_torch(direct["hidden_state"], config.DEVICE)
+            assert outputs_match(recurrent, to_numpy(network.recurrent_inference(hidden_state, action)))
+    assert take_rows(np.arange(5), 1, 3).tolist() == [1, 2]
+
+
+def batcher_versions_test():
+    batcher = InferenceBatcher()
+    weights = InferenceBatcher.load_model().get_weights()
+    try:
+        batcher.initial_inference("live_0", random_observation(np.random.default_rng(0), 1)[0])
+        assert False
+    except ValueError as error:
+        assert "live_0" in str(error)
+
+    # a shared version stays until its last client moves on to a newer one
+    first, second = InferenceClient(batcher), InferenceClient(batcher)
+    first.use_version("live_0", weights)
+    second.use_version("live_0", weights)
+    first.use_version("live_1", weights)
+    assert set(batcher.networks) == {"live_0", "live_1"}
+    second.use_version("live_1", weights)
+    assert set(batcher.networks) == {"live_1"} and batcher.users == {"live_1": 2}
+
+
+def test_list():
+    batcher_rows_test()
+    batcher_versions_test()
@@ -1,3 +1,5 @@
+import numpy as np
+import config
 from Models import MCTS_Util as utils
 
 def setup():
@@ -41,5 +43,136 @@ def mapping_test():
                 mapped_idx = int(sell_action[1:])  # "_15" -> "15"
                 assert sell_action == local_mapping[mapped_idx]
 
+def action_id_test():
+    default_mapping = setup()
+
+    # every id points back at its entry of the default mapping and the string gives the id back
+    for action_id, action in enumerate(utils.ACTION_STRINGS):
+        action_type = utils.ACTION_TYPES[action_id]
+        assert action.startswith(default_mapping[0][0][action_type])
+        if action_type in utils.config.NEEDS_2ND_DIM:
+            assert action[1:] == default_mapping[action_type][0][utils.ACTION_HEAD_INDEX[action_id]]
+    assert utils.action_ids(list(utils.ACTION_STRINGS)).tolist() == list(range(utils.NUM_ACTIONS))
+    assert utils.action_vectors([0, "2_13_30", utils.action_ids(["3_36_9"])[0]]).tolist() == \
+        [[0, 0, 0], [2, 13, 30], [3, 36, 9]]
+
+    # a board move is the same action either way round
+    assert utils.action_ids(["2_30_13"]).tolist() == utils.action_ids(["2_13_30"]).tolist()
+    # vectors that are not actions are named instead of wrapping around to the last id
+    for action in ["2_3_3", "2_0_37", "7"]:
+        try:
+            utils.action_ids([0, action])
+            assert False
+        except ValueError as error:
+            assert action in str(error)
+
+    split_sample, split_policy = utils.split_sample_set([1, 3, 0, 1016], [0.25, 0.25, 0.25, 0.25])
+    assert split_sample == [[1, 0, 6], [0, 2], [], [], []]
+    assert split_policy == [[0.5, 0.25, 0.25], [0.25, 0.25], [], [], []]
+
+
+def sample_categorical_test():
+    logits = np.array([[0.0, 1.0, 2.0, utils.PAD_LOGIT], [5.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+    samples = utils.sample_categorical(logits, np.array([3, 1]), 2000)
+    assert samples.shape == (2, 2000)
+    # padding is never drawn and a row of length one always gives its only entry
+    assert samples[0].max() <= 2 and (samples[1] == 0).all()
+    frequencies = np.bincount(samples[0], minlength=3) / 2000
+    assert np.allclose(frequencies, utils.softmax_stable(logits[0][:3]), atol=0.05)
+
+
+def gumbel_helpers_test():
+    # pass and two shop slots are legal: p(pass) = p(shop) = 1/2 and the shop half is split by the shop head
+    policy_logits = [[[0.0, 0.0]], [[0.0, np.log(3.0)]], [[]], [[]], [[]]]
+    mapping = [[[0, 1]], [[0, 4]], [[]], [[]], [[]]]
+    joint = np.exp(utils.joint_log_policy(policy_logits, mapping)[0])
+    assert np.isclose(joint.sum(), 1)
+    assert np.allclose(joint[[0, 1, 5]], [0.5, 0.125, 0.375])
+    # sequential halving: 4 children get a visit each, then the best 2 share the rest
+    assert utils.considered_visits(4, 10) == [0, 0, 0, 0, 1, 1, 2, 2, 3, 3]
+    assert utils.considered_visits(1, 3) == [0, 1, 2]
+
+
+def champ_decider_split_test():
+    heads = len(config.CHAMP_DECIDER_ACTION_DIM)
+    first = "_".join(["1"] * heads)
+    second = "_".join(["2"] + ["1"] * (heads - 1))
+    split_sample, split_policy = utils.split_sample_set_champ_decider([first, second], [0.25, 0.75])
+    assert [len(head) for head in split_sample] == config.CHAMP_DECIDER_ACTION_DIM
+    assert split_policy[0] == [0, 0.25, 0.75, 0, 0]
+    assert split_policy[-1] == [0, 1, 0]
+
+
+def policy_target_entries_test():
+    columns, policy = utils.policy_target_entries([[[0, 3], [], [], [369], []], [[1], [2], [], [], []]],
+                                                  [[[0.4, 0.6], [], [], [0.6], []], [[1.0], [1.0], [], [], []]])
+    assert columns.shape == policy.shape == (2, utils.MAX_POLICY_TARGET_ENTRIES)
+    # the columns of the heads follow each other, the padding points past the last head
+    assert columns[0, :4].tolist() == [0, 3, 642 + 369, 1021] and columns[1, :3].tolist() == [1, 7 + 2, 1021]
+    assert np.allclose(policy[0, :4], [0.4, 0.6, 0.6, 0]) and np.isclose(policy.sum(), 3.6)
+
+
+def tree_reuse_test():
+    # imported here, the network and the tree are only needed by this test
+    import torch
+    if not torch.cuda.is_available():
+        config.DEVICE = "cpu"
+    from Models.MCTS_torch import MCTS, tree
+    from Models.MuZero_torch_agent import MuZeroNetwork
+    from UnitTests.mcts_benchmark import random_observation
+
+    torch.manual_seed(0)
+    np.random.seed(0)
+    mcts = MCTS(MuZeroNetwork())
+    mcts.network.eval()
+    mcts.tree_reuse = True
+    rng = np.random.default_rng(0)
+    players = ["player_{}".format(i) for i in range(config.NUM_PLAYERS)]
+    mcts.policy(random_observation(rng) + [players])
+    previous_roots, previous_pool, previous_actions, _ = mcts.previous_search
+    previous_visits = previous_roots.get_distributions()
+
+    # a root with every action as a child gets the visits of every expanded child of the chosen node
+    roots = tree.Roots(config.NUM_PLAYERS, 3 * mcts.num_simulations, utils.MAX_CHILDREN)
+    roots.prepare_no_noise([0.0] * config.NUM_PLAYERS, [[0.0] * utils.NUM_ACTIONS] * config.NUM_PLAYERS,
+                           [list(range(utils.NUM_ACTIONS))] * config.NUM_PLAYERS,
+                           [utils.NUM_ACTIONS] * config.NUM_PLAYERS)
+    roots.reuse(previous_roots, previous_actions, mcts.num_simulations + 1, 2 * (mcts.num_simulations + 1),
+                config.DISCOUNT, tree.MinMaxStatsList(config.NUM_PLAYERS))
+    for visits, old_visits, action in zip(roots.get_distributions(), previous_visits, previous_actions):
+        # the first visit of the chosen node expanded it, every other one went on to one of its children
+        assert sum(visits) == max(old_visits[action] - 1, 0)
+
+    # the next search of the same players moves the hidden states of the copied nodes after its own rows
+    searches = []
+    run_batch_mcts = mcts.run_batch_mcts
+
+    def record(roots_cpp, hidden_state_pool, min_max_stats_lst=None, reused_states=None):
+        searches.append(reused_states)
+        return run_batch_mcts(roots_cpp, hidden_state_pool, min_max_stats_lst, reused_states)
+
+    mcts.run_batch_mcts = record
+    actions, target_policy, sampled_actions, root_values = mcts.policy(random_observation(rng) + [players])
+    old_x, old_y, new_x = searches[0][1]
+    assert len(new_x) > 0 and min(new_x) == mcts.num_simulations + 1 and max(new_x) <= 2 * mcts.num_simulations + 1
+    pool = mcts.previous_search[1]
+    for label in config.OBSERVATION_LABELS:
+        assert torch.equal(pool[label][new_x, old_y], previous_pool[label][old_x, old_y])
+    assert np.allclose([sum(policy) for policy in target_policy], 1)
+    # the roots count the copied visits on top of their own
+    visits = [sum(distribution) for distribution in mcts.previous_search[0].get_distributions()]
+    assert min(visits) >= mcts.num_simulations and max(visits) > mcts.num_simulations
+
+    # other players in the rows start from a new tree
+    mcts.policy(random_observation(rng) + [players[::-1]])
+    assert searches[-1] is None
+
+
 def test_list():
     mapping_test()
+    action_id_test()
+    sample_categorical_test()
+    gumbel_helpers_test()
+    champ_decider_split_test()
+    policy_target_entries_test()
+    tree_reuse_test()
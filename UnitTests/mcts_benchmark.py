@@ -0,0 +1,52 @@
+import time
+import numpy as np
+import torch
+import config
+
+# Moves per second of the search of both agent types: MCTS with the MuZero network and Default_MCTS with the
+# champion decider network. Observations and masks are random, 8 players a move.
+# run with: python -m UnitTests.mcts_benchmark
+if not torch.cuda.is_available():
+    config.DEVICE = "cpu"
+
+from Models.MCTS_torch import MCTS
+from Models.MCTS_default_torch import Default_MCTS
+from Models.MuZero_torch_agent import MuZeroNetwork
+from Models.Muzero_default_agent import MuZeroDefaultNetwork
+
+INPUT_SIZES = {"shop": config.SHOP_INPUT_SIZE, "board": config.BOARD_INPUT_SIZE, "bench": config.BENCH_INPUT_SIZE,
+               "states": config.STATE_INPUT_SIZE, "game_comp": config.COMP_INPUT_SIZE,
+               "other_players": config.OTHER_PLAYER_INPUT_SIZE}
+# the 11 masks of a player, see MCTS.encode_action_to_str
+MASK_SIZES = [6, 5, 28, 9, 10, 3, 37, 37, 10, 28, 28]
+
+
+def random_observation(rng, players=config.NUM_PLAYERS):
+    observation = {label: rng.random((players, size), dtype=np.float32) for label, size in INPUT_SIZES.items()}
+    masks = [tuple((rng.random(size) < 0.5).astype(np.int8) for size in MASK_SIZES) for _ in range(players)]
+    return [observation, masks]
+
+
+def moves_per_second(agent, moves, seed=0):
+    rng = np.random.default_rng(seed)
+    observations = [random_observation(rng) for _ in range(moves + 1)]
+    agent.policy(observations[-1])  # warm up
+    start = time.perf_counter()
+    for observation in observations[:moves]:
+        agent.policy(observation)
+    return moves * config.NUM_PLAYERS / (time.perf_counter() - start)
+
+
+def benchmark(moves=10):
+    agents = [("MuZero MCTS", MCTS(MuZeroNetwork())),
+              ("MuZero MCTS, Gumbel", MCTS(MuZeroNetwork(), gumbel=True)),
+              ("default agent MCTS", Default_MCTS(MuZeroDefaultNetwork()))]
+    print('{} moves of {} players on {}'.format(moves, config.NUM_PLAYERS, config.DEVICE))
+    for name, agent in agents:
+        agent.network.eval()
+        print('{:<22} {:.1f} player moves per second, {} simulations'.format(
+            name, moves_per_second(agent, moves), agent.num_simulations))
+
+
+if __name__ == '__main__':
+    benchmark()
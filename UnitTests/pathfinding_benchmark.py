@@ -0,0 +1,110 @@
+import random
+import time
+from types import SimpleNamespace
+from Simulator import champion as c_object
+from Simulator import field, hex_grid, stats
+from Simulator.battle import Battle
+from Simulator.player import Player
+from Simulator.pool import pool
+
+# Compares field.find_path with the greedy walk it replaced, on boards recorded from real fights.
+# run with: python -m UnitTests.pathfinding_benchmark
+
+
+def random_player(rng, player_num):
+    player = Player(pool(), player_num)
+    names = [name for name, cost in stats.COST.items() if cost > 0]
+    cells = [[x, y] for x in range(7) for y in range(4)]
+    rng.shuffle(cells)
+    for x, y in cells[:rng.randint(3, 9)]:
+        player.board[x][y] = c_object.champion(rng.choice(names), stars=rng.choice([1, 2, 3]))
+    return player
+
+
+# plays seeded fights and writes down every board find_path was asked about
+def record_boards(fights=100, seed=0):
+    rng = random.Random(seed)
+    boards = []
+    original = field.find_path
+
+    def recording_find_path(champion, target_y, target_x):
+        boards.append([champion.battle.occupied, champion.y, champion.x, target_y, target_x])
+        return original(champion, target_y, target_x)
+
+    field.find_path = recording_find_path
+    try:
+        for _ in range(fights):
+            battle = Battle(rng=random.Random(rng.random()))
+            c_object.run(c_object.champion, random_player(rng, 0), random_player(rng, 1), 0, battle)
+    finally:
+        field.find_path = original
+    return boards
+
+
+# the old find_path: walk to the neighbor closest to the target, twice (the second time taking the second of two
+# equally close neighbors) and keep the shorter walk. gives up after 50 steps
+def greedy_path(occupied, start_y, start_x, target_y, target_x, use_second=False, secondary_result=None):
+    def free(n):
+        return [n[0], n[1]] == [target_y, target_x] or not occupied >> (n[0] * hex_grid.WIDTH + n[1]) & 1
+
+    path = [[start_y, start_x]]
+    visited = [[start_y, start_x]]
+    count = 0
+    while path[-1] != [target_y, target_x]:
+        count += 1
+        if count > 50:
+            break
+        neighbors = [n + [field.hex_distance(n[0], n[1], target_y, target_x)]
+                     for n in field.find_neighbors(path[-1][0], path[-1][1]) if free(n) or n in visited]
+        neighbors = sorted(neighbors, key=lambda x: x[2])
+        if len(neighbors) > 1 and neighbors[0][2] == neighbors[1][2] and use_second:
+            neighbors[0], neighbors[1] = neighbors[1], neighbors[0]
+        if len(neighbors) == 0:
+            break
+        path.append(neighbors[0][:2])
+        visited.append(neighbors[0][:2])
+
+    if not use_second:
+        return greedy_path(occupied, start_y, start_x, target_y, target_x, True, path)
+    if [path[-1][0], path[-1][1]] != [target_y, target_x] and \
+            [secondary_result[-1][0], secondary_result[-1][1]] != [target_y, target_x]:
+        return None
+    if len(path) < len(secondary_result):
+        return path[1:]
+    return secondary_result[1:]
+
+
+def benchmark(fights=100, repeats=5):
+    boards = record_boards(fights)
+    units = [SimpleNamespace(battle=SimpleNamespace(occupied=b[0]), y=b[1], x=b[2]) for b in boards]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        greedy = [greedy_path(*b) for b in boards]
+    greedy_time = (time.perf_counter() - start) / repeats
+
+    field.path_cache.clear()
+    start = time.perf_counter()
+    shortest = [field.find_path(u, b[3], b[4]) for u, b in zip(units, boards)]
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        shortest = [field.find_path(u, b[3], b[4]) for u, b in zip(units, boards)]
+    warm_time = (time.perf_counter() - start) / repeats
+
+    only_shortest = sum(1 for g, s in zip(greedy, shortest) if g is None and s is not None)
+    only_greedy = sum(1 for g, s in zip(greedy, shortest) if g is not None and s is None)
+    longer = sum(1 for g, s in zip(greedy, shortest) if g is not None and s is not None and len(g) > len(s))
+
+    print('{} boards from {} fights'.format(len(boards), fights))
+    print('greedy walk:           {:.1f} us per call'.format(greedy_time / len(boards) * 1e6))
+    print('shortest path (cold):  {:.1f} us per call'.format(cold_time / len(boards) * 1e6))
+    print('shortest path (warm):  {:.1f} us per call'.format(warm_time / len(boards) * 1e6))
+    print('greedy found no path but there is one: {}'.format(only_shortest))
+    print('greedy path longer than the shortest:  {}'.format(longer))
+    print('greedy "found" a path that does not exist: {}'.format(only_greedy))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import numpy as np
+import config
+from Concurrency.priority_queue import SumTree
+from Concurrency.column_storage import ColumnStorage
+from Models.replay_muzero_buffer import ReplayBuffer
+from Concurrency.global_buffer import OBSERVATION_SIZES
+from TestInterface.test_global_buffer import GlobalBuffer
+
+
+def sum_tree_test():
+    tree = SumTree(5)
+    assert list(tree.insert([1.0, 2.0, 3.0, 0.0])) == [0, 1, 2, 3]
+    assert tree.total() == 6.0 and tree.drawable == 3
+
+    # draws follow the priorities and come back with their probabilities
+    slots, probabilities = tree.sample(60000, np.random.default_rng(0))
+    assert np.allclose(probabilities, tree.priorities(slots) / 6.0)
+    assert np.allclose(np.bincount(slots, minlength=5) / 60000, [1 / 6, 2 / 6, 3 / 6, 0, 0], atol=0.01)
+
+    # a slot given twice keeps the last priority, the sums above follow
+    tree.update([0, 2, 2], [4.0, 0.0, 1.0])
+    assert list(tree.priorities([0, 1, 2])) == [4.0, 2.0, 1.0] and tree.total() == 7.0 and tree.drawable == 3
+
+    # once full the ring writes over the oldest slots
+    assert list(tree.insert([1.0, 5.0])) == [4, 0]
+    assert tree.size == 5 and tree.total() == 9.0 and tree.drawable == 4
+    assert set(tree.sample(1000, np.random.default_rng(1))[0]) == {0, 1, 2, 4}
+
+
+def column_storage_test():
+    columns = {"value": ((2,), np.float32), "action": ((), np.int64)}
+    with tempfile.TemporaryDirectory() as directory:
+        storage = ColumnStorage(10, columns, directory, segment_size=4, hot_segments=1)
+        # the ring goes through all 3 segments, only the last one written stays in memory
+        storage.set("value", np.arange(10), np.arange(20).reshape(10, 2))
+        storage.set("action", [9, 2, 5], [7, 8, 9])
+        assert storage.hot == [2]
+        assert storage.get("value", [9, 0, 9]).tolist() == [[18, 19], [0, 1], [18, 19]]
+        assert storage.get("action", [2, 5, 9, 0]).tolist() == [8, 9, 7, 0]
+
+        storage.save({"counters": np.array([10, 3])})
+        resumed = ColumnStorage(10, columns, directory, segment_size=4, hot_segments=1, resume=True)
+        assert resumed.index["counters"].tolist() == [10, 3]
+        assert resumed.get("value", np.arange(10)).tolist() == storage.get("value", np.arange(10)).tolist()
+        assert resumed.get("action", [2, 5, 9]).tolist() == [8, 9, 7]
+
+        # rows written out after the save go to new files, a resume still sees the save
+        storage.set("action", [0, 4, 8], [1, 1, 1])
+        assert storage.hot == [2]
+        resumed = ColumnStorage(10, columns, directory, segment_size=4, hot_segments=1, resume=True)
+        assert resumed.get("action", [0, 2, 4, 5, 8, 9]).tolist() == [0, 8, 0, 9, 0, 7]
+        # the next save names the new files and removes the old ones
+        storage.save({"counters": np.array([10, 6])})
+        assert len(os.listdir(directory)) == 1 + 3 * len(columns)
+        resumed = ColumnStorage(10, columns, directory, segment_size=4, hot_segments=1, resume=True)
+        assert resumed.get("action", [0, 2, 4, 5, 8, 9]).tolist() == [1, 8, 1, 9, 1, 7]
+        # a different layout starts over
+        assert ColumnStorage(12, columns, directory, segment_size=4, resume=True).index is None
+
+
+class Catch:
+    def store_replay_sequence(self, samples):
+        self.samples = samples
+
+
+def replay_game():
+    buffer = ReplayBuffer()
+    rewards = [1.0, 3.0, 2.0, 6.0, 6.0, 10.0, 9.0]
+    for step, reward in enumerate(rewards):
+        observation = {label: np.full(size, step) for label, size in zip(config.OBSERVATION_LABELS, OBSERVATION_SIZES)}
+        buffer.store_replay_buffer(observation, [step, 0, 0], reward, [1.0], [0], 0.5,
+                                   [np.full(config.TIERS_FLATTEN_LENGTH, step)],
+                                   np.full((len(config.CHAMPION_LIST_DIM), 2), step))
+    catch = Catch()
+    buffer.store_global_buffer(catch)
+    return rewards, catch.samples
+
+
+def replay_targets_test():
+    rewards, [priorities, trajectory, position] = replay_game()
+    [observation, action, value, reward, policy_columns, policy_values, tier, champion] = trajectory
+    assert len(priorities) == len(value) == len(rewards)
+
+    # the value target is the discounted sum of the instant rewards to the end of the game
+    instant = np.diff(rewards, prepend=0.0)
+    targets = [sum(r * config.DISCOUNT ** i for i, r in enumerate(instant[step:])) for step in range(len(rewards))]
+    assert np.allclose(value, targets) and np.allclose(reward, instant)
+    assert observation[config.OBSERVATION_LABELS[0]][:, 0].tolist() == list(range(len(rewards)))
+    assert action[2].tolist() == [2, 0, 0] and tier[3, 0] == 3
+
+    errors = np.maximum(0.001, np.abs(0.5 - np.append(targets, [0.0] * config.UNROLL_STEPS)))
+    errors[len(rewards):] = 0.001
+    assert np.isclose(priorities[0], errors[1:config.UNROLL_STEPS + 1].sum() / errors[0])
+
+
+def unroll_window_test():
+    rewards, samples = replay_game()
+    samples[0] = np.full(len(rewards), 2.0)
+    samples[0][-1] = 0.5
+    buffer = GlobalBuffer()
+    buffer.store_replay_sequence(samples)
+    # the last step is stored for the windows before it but is never drawn
+    assert buffer.gameplay_experiences.size == len(rewards) and buffer.gameplay_experiences.drawable == len(rewards) - 1
+    batch, slots = buffer.assemble_batch()
+    [observation, action_history, value_mask, reward_mask, policy_mask, value, reward, policy, weights, tier,
+     final_tier, champion, position] = batch
+
+    # the unroll window of a sample is gathered from the steps after it, the first game starts at slot 0
+    unroll = np.arange(config.UNROLL_STEPS + 1)
+    last = len(rewards) - 1
+    for row, step in enumerate(slots):
+        assert observation[config.OBSERVATION_LABELS[0]][row, 0] == step
+        assert value_mask[row].tolist() == (step + unroll < last).tolist() == policy_mask[row].tolist()
+        assert reward_mask[row].tolist() == ((step + unroll <= last) & (unroll > 0)).tolist()
+        assert np.allclose(value[row], np.where(step + unroll < last, samples[1][2][np.minimum(step + unroll, last)],
+                                                0))
+        assert action_history[row, :, 0].tolist() == np.where(step + unroll[1:] < last, step + unroll[1:], 0).tolist()
+        # past the end of the game the labels stay on the last step
+        assert tier[row, :, 0].tolist() == np.where(step + unroll < last, step + unroll, last).tolist()
+        assert (final_tier[row] == last).all() and champion[row, -1, 0, 0] == min(step + unroll[-1], last)
+
+
+def test_list():
+    sum_tree_test()
+    column_storage_test()
+    replay_targets_test()
+    unroll_window_test()
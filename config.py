@@ -6,6 +6,7 @@ GPU_SIZE_PER_WORKER = 0.16
 STORAGE_GPU_SIZE = 0.1
 BUFFER_GPU_SIZE = 0.01
 TRAINER_GPU_SIZE = 0.2
+INFERENCE_SERVER_GPU_SIZE = 0.2
 # NUM_CPUS = 8
 # GPU_SIZE_PER_WORKER = 0.0
 # STORAGE_GPU_SIZE = 0.0
@@ -49,6 +50,16 @@ TEAM_TIERS_VECTOR = [4, 5, 4, 4, 4, 3, 3, 3, 2, 4, 4, 4, 5, 3, 5, 2, 3, 5, 4, 4,
 TIERS_FLATTEN_LENGTH = 97
 CHANCE_BUFFER_SEND = 1
 GLOBAL_BUFFER_SIZE = 20000
+# Samples are drawn with probability priority ^ ALPHA / sum, importance weights are (N * P(i)) ^ -BETA
+PRIORITY_ALPHA = 1.0
+PRIORITY_BETA = 1.0
+# The global buffer is kept in memory mapped files in this directory, None keeps it in memory. It is saved with
+# every checkpoint and picked up again when training resumes with --starting_episode.
+# A full buffer takes about half a GB on disk, "./ReplayBuffer" is ignored by git.
+GLOBAL_BUFFER_DIRECTORY = None
+# Slots per file of the global buffer and the number of those files, the newest ones, that are held in memory
+GLOBAL_BUFFER_SEGMENT_SIZE = 4096
+GLOBAL_BUFFER_HOT_SEGMENTS = 2
 ITEM_POSITIONING_BUFFER_SIZE = 2000
 MINIMUM_POP_AMOUNT = 100
 
@@ -75,9 +86,24 @@ N_HEAD_HIDDEN_LAYERS = 2
 ### TIME RELATED VALUES ###
 ACTIONS_PER_TURN = 15
 CONCURRENT_GAMES = 16
+# Evaluate the models of all data workers together in one InferenceServer instead of one model per worker
+INFERENCE_SERVER = False
+# Most players the server evaluates in one batch and how long (seconds) a request waits for others to join it
+INFERENCE_MAX_BATCH = 256
+INFERENCE_DEADLINE = 0.002
 NUM_PLAYERS = 8 
 NUM_SAMPLES = 30
 NUM_SIMULATIONS = 50
+# Keep the subtree below the chosen action and start the next search of the same players from it
+MCTS_TREE_REUSE = False
+# Gumbel MuZero search (Gumbel top-k at the root, sequential halving, completed Q policy targets) instead of PUCT
+# for the data workers with a rank below GUMBEL_WORKERS. It needs far fewer simulations.
+GUMBEL_WORKERS = 0
+GUMBEL_SIMULATIONS = 16
+# Most children of the root that the halving starts with
+GUMBEL_NUM_CONSIDERED = 16
+GUMBEL_C_VISIT = 50
+GUMBEL_C_SCALE = 0.1
 
 # Set to -1 to turn off.
 TD_STEPS = -1 
@@ -114,4 +140,7 @@ RUN_DROP_TESTS = False
 RUN_MCTS_TESTS = False
 RUN_MAPPING_TESTS = False
 RUN_CHECKPOINT_TESTS = True
+RUN_BATTLE_TESTS = False
+RUN_INFERENCE_TESTS = False
+RUN_REPLAY_TESTS = False
 LOG_COMBAT = False
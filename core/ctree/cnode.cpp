@@ -24,7 +24,7 @@ namespace tree {
         this->value_sum = 0;
         this->reward = 0.0;
         this->ptr_node_pool = nullptr;
-        this->mappings = std::vector<std::string>{};
+        this->mappings = std::vector<int>{};
     }
 
     CNode::CNode(float prior, std::vector<CNode>* ptr_node_pool) {
@@ -36,7 +36,7 @@ namespace tree {
         this->ptr_node_pool = ptr_node_pool;
         this->hidden_state_index_x = -1;
         this->hidden_state_index_y = -1;
-        this->mappings = std::vector<std::string>{};
+        this->mappings = std::vector<int>{};
     }
 
     CNode::~CNode() {}
@@ -45,16 +45,13 @@ namespace tree {
     // or if we do a weighted softmax which is what is done below.
     // The alpha-go paper uses .67 as their weight but we appear to use e instead.
     void CNode::expand(int hidden_state_index_x, int hidden_state_index_y, float reward,
-                       const std::vector<float> &policy_logits, const std::vector<char*> &mappings, int act_num) {
+                       const std::vector<float> &policy_logits, const std::vector<int> &mappings, int act_num) {
         // Index for finding the hidden state on python side, x is search path location, y is the player
         this->hidden_state_index_x = hidden_state_index_x;
         this->hidden_state_index_y = hidden_state_index_y;
         this->reward = reward;
-        // Mapping to turn a set of samples into a 3 dimensional output that the simulation can understand
-        this->mappings = std::vector<std::string> {};
-        for (auto i = 0; i < mappings.size(); i++) {
-            this->mappings.push_back(std::string(mappings[i]));
-        }
+        // Action id of each sample, the python side turns it into an output that the simulation can understand
+        this->mappings = mappings;
 
         // number of unique actions this node contains. Changes based on number of unique samples
         this->action_num = act_num;
@@ -152,6 +149,8 @@ namespace tree {
     CRoots::CRoots() {
         this->root_num = 0;
         this->pool_size = 0;
+        this->c_visit = 0;
+        this->c_scale = 0;
     }
 
     // root_num is the number of agents in the batch (NUM_PLAYERS in our base case)
@@ -161,6 +160,8 @@ namespace tree {
         // For whatever reason, print statements do not work inside this function.
         this->root_num = root_num;
         this->pool_size = pool_size;
+        this->c_visit = 0;
+        this->c_scale = 0;
 
         this->node_pools.reserve(root_num);
         this->roots.reserve(root_num);
@@ -180,7 +181,7 @@ namespace tree {
     // Creating the tree so this method does not get called.
     void CRoots::prepare(float root_exploration_fraction, const std::vector<std::vector<float>> &noises,
                          const std::vector<float> &value_prefixs, const std::vector<std::vector<float>> &policies,
-                         const std::vector<std::vector<char*>> &mappings, const std::vector<int> &action_nums) {
+                         const std::vector<std::vector<int>> &mappings, const std::vector<int> &action_nums) {
         for(int i = 0; i < this->root_num; ++i) {
             this->roots[i].expand(0, i, value_prefixs[i], policies[i], mappings[i], action_nums[i]);
             this->roots[i].add_exploration_noise(root_exploration_fraction, noises[i]);
@@ -190,7 +191,7 @@ namespace tree {
 
     void CRoots::prepare_no_noise(const std::vector<float> &value_prefixs,
                                   const std::vector<std::vector<float>> &policies,
-                                  const std::vector<std::vector<char*>> &mappings,
+                                  const std::vector<std::vector<int>> &mappings,
                                   const std::vector<int> &action_nums) {
         for(int i = 0; i < this->root_num; ++i) {
             this->roots[i].expand(0, i, value_prefixs[i], policies[i], mappings[i], action_nums[i]);
@@ -216,32 +217,181 @@ namespace tree {
         return values;
     }
 
-    // Takes in a string action like "2_15_30" and turns into a vector of [2, 15, 30]
-    std::vector<int> decode_action(std::string& action) {
-        size_t index = action.find("_");
-        size_t last_index = 0;
-        std::vector<int> element_list;
-        while(index != std::string::npos) {
-            size_t next_index = action.find("_", index + 1);
-            if(next_index > action.size()) {
-                next_index = action.size();
+    // Gumbel MuZero (Danihelka et al. 2022) at the root, PUCT stays below it.
+    // gumbels[i] holds the Gumbel noise of every child of root i, the children are the actions that won the
+    // Gumbel top-k on the python side. considered_visits[i][s] is the visit count a child of root i needs to be
+    // picked in simulation s, which is how sequential halving drops the weaker half of the children after each
+    // phase. network_values are the values of the roots from the prediction network.
+    void CRoots::prepare_gumbel(const std::vector<std::vector<float>> &gumbels,
+                                const std::vector<std::vector<int>> &considered_visits,
+                                const std::vector<float> &network_values, float c_visit, float c_scale) {
+        this->gumbels = gumbels;
+        this->considered_visits = considered_visits;
+        this->network_values = network_values;
+        this->c_visit = c_visit;
+        this->c_scale = c_scale;
+    }
+
+    // log prior + sigma(completed q) (+ gumbel) of every child of root index.
+    // Children without visits get the mixed value of the network value and the q values of the visited children.
+    // The completed q values are scaled to [0, 1] and sigma multiplies them by (c_visit + most visits) * c_scale.
+    std::vector<float> CRoots::gumbel_scores(int index, float discount, bool with_gumbel) {
+        CNode *root = &this->roots[index];
+        int total_visits = 0, max_visits = 0;
+        float visited_prior = 0.0, visited_q = 0.0;
+        for(int a = 0; a < root->action_num; ++a) {
+            CNode *child = root->get_child(a);
+            if(child->visit_count > 0) {
+                total_visits += child->visit_count;
+                max_visits = std::max(max_visits, child->visit_count);
+                visited_prior += child->prior;
+                visited_q += child->prior * child->qvalue(discount);
+            }
+        }
+        float mixed_value = this->network_values[index];
+        if(total_visits > 0 && visited_prior > 0) {
+            mixed_value = (mixed_value + total_visits * visited_q / visited_prior) / (1 + total_visits);
+        }
+
+        std::vector<float> completed(root->action_num);
+        float q_min = FLOAT_MAX, q_max = FLOAT_MIN;
+        for(int a = 0; a < root->action_num; ++a) {
+            CNode *child = root->get_child(a);
+            completed[a] = child->visit_count > 0 ? child->qvalue(discount) : mixed_value;
+            q_min = std::min(q_min, completed[a]);
+            q_max = std::max(q_max, completed[a]);
+        }
+
+        std::vector<float> scores(root->action_num);
+        float sigma_scale = (this->c_visit + max_visits) * this->c_scale / std::max(q_max - q_min, (float) 1e-8);
+        for(int a = 0; a < root->action_num; ++a) {
+            scores[a] = log(std::max(root->get_child(a)->prior, (float) 1e-30)) + sigma_scale * (completed[a] - q_min);
+            if(with_gumbel) {
+                scores[a] += this->gumbels[index][a];
             }
-            std::string newstr = action.substr(last_index, next_index - index - 1);
-            element_list.push_back(std::stoi(newstr));
-            last_index = index + 1;
-            index = action.find("_", index + 1);
         }
-        std::string newstr = action.substr(last_index, action.size() - last_index);
-        element_list.push_back(std::stoi(newstr));
+        return scores;
+    }
 
-        if(index != std::string::npos) {
-            std::string newstr = action.substr(index + 1, 1);
-            element_list.push_back(std::stoi(newstr));
+    // The child of root index with the best gumbel score among the ones with the given visit count
+    int CRoots::gumbel_select(int index, int visits, float discount) {
+        CNode *root = &this->roots[index];
+        std::vector<float> scores = this->gumbel_scores(index, discount, true);
+        int action = -1;
+        for(int a = 0; a < root->action_num; ++a) {
+            if(root->get_child(a)->visit_count == visits && (action < 0 || scores[a] > scores[action])) {
+                action = a;
+            }
         }
-        while(element_list.size() < 3) {
-            element_list.push_back(0);
+        if(action < 0) {
+            action = std::max_element(scores.begin(), scores.end()) - scores.begin();
+        }
+        return action;
+    }
+
+    // The action of each player after a Gumbel search, the best of the children that made it to the last phase
+    std::vector<int> CRoots::get_gumbel_actions(float discount) {
+        std::vector<int> actions;
+        for(int i = 0; i < this->root_num; ++i) {
+            std::vector<int> visits = this->roots[i].get_children_distribution();
+            actions.push_back(this->gumbel_select(i, *std::max_element(visits.begin(), visits.end()), discount));
+        }
+        return actions;
+    }
+
+    // The improved policy softmax(log prior + sigma(completed q)) over the children of each root, the policy
+    // target of a Gumbel search
+    std::vector<std::vector<float>> CRoots::get_gumbel_policies(float discount) {
+        std::vector<std::vector<float>> policies;
+        for(int i = 0; i < this->root_num; ++i) {
+            std::vector<float> scores = this->gumbel_scores(i, discount, false);
+            float score_max = *std::max_element(scores.begin(), scores.end());
+            float total = 0.0;
+            for(float &score : scores) {
+                score = exp(score - score_max);
+                total += score;
+            }
+            for(float &score : scores) {
+                score /= total;
+            }
+            policies.push_back(scores);
+        }
+        return policies;
+    }
+
+    // Tree reuse. The root of this tree was just expanded for the next decision of each player. previous is the
+    // search of the decision before and previous_actions the child each player took there. Every child of the new
+    // root that the previous search had also expanded below the taken child gets that subtree with its statistics,
+    // so the search starts from the visits it already has. The new root keeps its own priors and noise.
+    // The copied nodes get hidden_state_index_x values from hidden_state_offset up to hidden_state_end. Nodes are
+    // copied breadth first, so when there are more than that the deepest ones stay leaves.
+    // Returns [old x, old y, new x] of every copied node so the python side can move the hidden states.
+    std::vector<std::vector<int>> CRoots::reuse(CRoots *previous, const std::vector<int> &previous_actions,
+                                                int hidden_state_offset, int hidden_state_end, float discount,
+                                                tools::CMinMaxStatsList *min_max_stats_lst) {
+        std::vector<std::vector<int>> reused_states(3);
+        for(int i = 0; i < this->root_num; ++i) {
+            CNode *old_child = previous->roots[i].get_child(previous_actions[i]);
+            CNode *root = &this->roots[i];
+            if(!old_child->expanded()) {
+                continue;
+            }
+            // [index in the node pool, node of the previous tree] still to copy
+            std::deque<std::pair<int, CNode*>> queue;
+            for(int a = 0; a < root->action_num; ++a) {
+                for(int b = 0; b < old_child->action_num; ++b) {
+                    if(old_child->mappings[b] == root->mappings[a]) {
+                        if(old_child->get_child(b)->expanded()) {
+                            queue.push_back(std::make_pair(root->children_index[a], old_child->get_child(b)));
+                        }
+                        break;
+                    }
+                }
+            }
+            int next_x = hidden_state_offset;
+            while(!queue.empty() && next_x < hidden_state_end) {
+                ccopy_node(this->node_pools[i], queue.front().first, queue.front().second, next_x, reused_states, queue);
+                queue.pop_front();
+                next_x += 1;
+            }
+            // the root counts the copied visits as if it had made them itself
+            for(int a = 0; a < root->action_num; ++a) {
+                CNode *child = root->get_child(a);
+                if(child->expanded()) {
+                    root->visit_count += child->visit_count;
+                    root->value_sum += child->qvalue(discount) * child->visit_count;
+                    min_max_stats_lst->stats_lst[i].update(child->qvalue(discount));
+                }
+            }
+        }
+        return reused_states;
+    }
+
+    // Copies the statistics of old_node into pool[index], a new node that keeps its own prior, and gives it
+    // children. The expanded children go on the queue. Nodes are found by index because pushing to the pool
+    // can move them.
+    void ccopy_node(std::vector<CNode> &pool, int index, CNode *old_node, int hidden_state_index_x,
+                    std::vector<std::vector<int>> &reused_states, std::deque<std::pair<int, CNode*>> &queue) {
+        reused_states[0].push_back(old_node->hidden_state_index_x);
+        reused_states[1].push_back(old_node->hidden_state_index_y);
+        reused_states[2].push_back(hidden_state_index_x);
+
+        pool[index].hidden_state_index_x = hidden_state_index_x;
+        pool[index].hidden_state_index_y = old_node->hidden_state_index_y;
+        pool[index].visit_count = old_node->visit_count;
+        pool[index].value_sum = old_node->value_sum;
+        pool[index].reward = old_node->reward;
+        pool[index].action_num = old_node->action_num;
+        pool[index].mappings = old_node->mappings;
+
+        int first = pool.size();
+        for(int a = 0; a < old_node->action_num; ++a) {
+            pool.push_back(CNode(old_node->get_child(a)->prior, &pool));
+            pool[index].children_index.push_back(first + a);
+            if(old_node->get_child(a)->expanded()) {
+                queue.push_back(std::make_pair(first + a, old_node->get_child(a)));
+            }
         }
-        return element_list;
     }
 
     void cback_propagate(std::vector<CNode*> &search_path, tools::CMinMaxStats &min_max_stats, float value,
@@ -270,7 +420,7 @@ namespace tree {
     void cbatch_back_propagate(int hidden_state_index_x, float discount, const std::vector<float> &rewards,
                                const std::vector<float> &values, const std::vector<std::vector<float>> &policy,
                                tools::CMinMaxStatsList *min_max_stats_lst, CSearchResults &results,
-                               std::vector<std::vector<char*>> &mappings, const std::vector<int> &action_nums) {
+                               std::vector<std::vector<int>> &mappings, const std::vector<int> &action_nums) {
         // For each player
         for(int i = 0; i < results.num; ++i) {
             // Expand the node
@@ -336,8 +486,8 @@ namespace tree {
 
     void cbatch_traverse(CRoots *roots, int pb_c_base, float pb_c_init, float discount,
                          tools::CMinMaxStatsList *min_max_stats_lst, CSearchResults &results) {
-        // Last action is a multidimensional action so a vector is required. 3 dimensions in our case
-        std::vector<int> last_action{0};
+        // Action id of the last action on the search path
+        int last_action = 0;
 
         results.search_lens = std::vector<int>();
 
@@ -351,15 +501,21 @@ namespace tree {
             while(node->expanded()) {
 
                 // pick the next action to simulate
-                int action = cselect_child(node, min_max_stats_lst->stats_lst[i], pb_c_base, pb_c_init, discount);
-
-                // Error here on seg fault, decode_action on stoi.
-                // Pick the action from the mappings.
-                std::string str_action = node->mappings[action];
-
-
-                // Turn the internal next action into one that the model and environment can understand
-                last_action = decode_action(str_action);
+                int action;
+                if(search_len == 0 && !roots->gumbels.empty()) {
+                    // the root of a Gumbel search, the simulations so far tell which phase of the halving it is in
+                    std::vector<int> visits = node->get_children_distribution();
+                    std::vector<int> &considered = roots->considered_visits[i];
+                    int simulation = std::min(std::accumulate(visits.begin(), visits.end(), 0),
+                                              (int) considered.size() - 1);
+                    action = roots->gumbel_select(i, considered[simulation], discount);
+                }
+                else {
+                    action = cselect_child(node, min_max_stats_lst->stats_lst[i], pb_c_base, pb_c_init, discount);
+                }
+
+                // Pick the action id from the mappings.
+                last_action = node->mappings[action];
 
                 // get next node
                 node = node->get_child(action);
@@ -378,4 +534,107 @@ namespace tree {
             results.nodes.push_back(node);
         }
     }
+
+    // The same sampling as MCTS.sample on the python side, for the full policy heads of one leaf.
+    // Draws num_samples action types and for the types with a policy head of their own an entry of that head.
+    // policy_logits holds the heads one after the other, head t starts at head_offsets[t] and head 0 is the type.
+    // The samples are merged by action id (action_offsets[type] + entry) and sorted by it. The prior of a child is
+    // the share of the samples that drew it. The types without a head of their own are always children, with 0 if
+    // they were not drawn.
+    void csample_policy(const float *policy_logits, const std::vector<int> &head_offsets,
+                        const std::vector<int> &action_offsets, int num_samples, std::mt19937 &rng,
+                        std::vector<float> &policy, std::vector<int> &mappings) {
+        int type_num = head_offsets[1];
+        std::uniform_real_distribution<float> uniform(0.0, 1.0);
+        // action id -> number of samples
+        std::map<int, float> counts;
+        // the cdf of every head, made the first time a sample needs it
+        std::vector<std::vector<float>> cdfs(head_offsets.size() - 1);
+
+        // an entry of the head, drawn from the softmax of its logits
+        auto draw = [&](int head) {
+            std::vector<float> &cdf = cdfs[head];
+            const float *logits = policy_logits + head_offsets[head];
+            int size = head_offsets[head + 1] - head_offsets[head];
+            if(cdf.empty()) {
+                float logit_max = FLOAT_MIN;
+                for(int a = 0; a < size; ++a) {
+                    logit_max = std::max(logit_max, logits[a]);
+                }
+                float total = 0.0;
+                for(int a = 0; a < size; ++a) {
+                    total += exp(logits[a] - logit_max);
+                    cdf.push_back(total);
+                }
+            }
+            int entry = std::upper_bound(cdf.begin(), cdf.end(), uniform(rng) * cdf.back()) - cdf.begin();
+            // float error can put the draw past the last entry
+            return std::min(entry, size - 1);
+        };
+
+        for(int s = 0; s < num_samples; ++s) {
+            int type = draw(0);
+            if(action_offsets[type + 1] - action_offsets[type] == 1) {
+                counts[action_offsets[type]] += 1;
+            }
+            else {
+                counts[action_offsets[type] + draw(type)] += 1;
+            }
+        }
+        for(int t = 0; t < type_num; ++t) {
+            if(action_offsets[t + 1] - action_offsets[t] == 1) {
+                counts[action_offsets[t]] += 0;
+            }
+        }
+
+        policy.clear();
+        mappings.clear();
+        for(auto &count : counts) {
+            mappings.push_back(count.first);
+            policy.push_back(count.second / num_samples);
+        }
+    }
+
+    // The whole search of MCTS.run_batch_mcts in one call. Every simulation goes down the tree, asks model_callback
+    // for the leaves, samples their children and backs the value up. The hidden states stay on the python side,
+    // the states of simulation x get hidden_state_index_x = x.
+    // Returns 0, or -1 as soon as the model fails. search_depth is the mean search length of the last simulation.
+    int cbatch_search(CRoots *roots, int num_simulations, int pb_c_base, float pb_c_init, float discount,
+                      tools::CMinMaxStatsList *min_max_stats_lst, const std::vector<int> &head_sizes,
+                      const std::vector<int> &action_offsets, int num_samples, unsigned int seed,
+                      cmodel_callback model_callback, void *model, float &search_depth) {
+        int num = roots->root_num;
+        std::vector<int> head_offsets(1, 0);
+        for(int size : head_sizes) {
+            head_offsets.push_back(head_offsets.back() + size);
+        }
+        int policy_width = head_offsets.back();
+
+        // filled by the model every simulation
+        std::vector<float> rewards(num), values(num), policy_logits(num * policy_width);
+        std::vector<float> policy;
+        std::vector<int> mappings;
+        std::mt19937 rng(seed);
+
+        for(int x = 1; x <= num_simulations; ++x) {
+            CSearchResults results(num);
+            cbatch_traverse(roots, pb_c_base, pb_c_init, discount, min_max_stats_lst, results);
+
+            if(model_callback(model, x, results.hidden_state_index_x_lst.data(), results.hidden_state_index_y_lst.data(),
+                              results.last_actions.data(), rewards.data(), values.data(), policy_logits.data()) != 0) {
+                return -1;
+            }
+
+            search_depth = 0;
+            for(int i = 0; i < num; ++i) {
+                csample_policy(&policy_logits[i * policy_width], head_offsets, action_offsets, num_samples, rng,
+                               policy, mappings);
+                results.nodes[i]->expand(x, i, rewards[i], policy, mappings, mappings.size());
+                cback_propagate(results.search_paths[i], min_max_stats_lst->stats_lst[i], values[i], discount);
+                search_depth += results.search_lens[i];
+            }
+            search_depth /= num;
+        }
+        return 0;
+    }
 }
\ No newline at end of file
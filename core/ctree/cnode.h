@@ -3,7 +3,10 @@
 
 #include <vector>
 #include <stack>
-#include <string>
+#include <deque>
+#include <map>
+#include <numeric>
+#include <random>
 #include <cmath>
 #include <algorithm>
 #include "cminimax.h"
@@ -18,16 +21,16 @@ namespace tree {
             float reward, prior, value_sum;
             std::vector<int> children_index;
             std::vector<CNode>* ptr_node_pool;
-            // This is used to map the action from the 1d to the multi dim that the environment can use
-            // I wish this could be a string vector but Cython does not support strings, only char *
-            std::vector<std::string> mappings;
+            // The action id (see MCTS_Util.ACTION_OFFSETS) of each child.
+            // The python side turns the ids into the multi dim actions that the environment and the model use
+            std::vector<int> mappings;
 
             CNode();
             CNode(float prior, std::vector<CNode> *ptr_node_pool);
             ~CNode();
 
             void expand(int hidden_state_index_x, int hidden_state_index_y, float reward,
-                        const std::vector<float> &policy_logits, const std::vector<char*> &mappings,
+                        const std::vector<float> &policy_logits, const std::vector<int> &mappings,
                         int act_num);
             void add_exploration_noise(float exploration_fraction, const std::vector<float> &noises);
 
@@ -45,6 +48,11 @@ namespace tree {
             int root_num, pool_size;
             std::vector<CNode> roots;
             std::vector<std::vector<CNode>> node_pools;
+            // Gumbel MuZero, see prepare_gumbel. gumbels is empty when the roots use PUCT.
+            std::vector<std::vector<float>> gumbels;
+            std::vector<std::vector<int>> considered_visits;
+            std::vector<float> network_values;
+            float c_visit, c_scale;
 
             CRoots();
             CRoots(int root_num, int pool_size);
@@ -52,11 +60,21 @@ namespace tree {
 
             void prepare(float root_exploration_fraction, const std::vector<std::vector<float>> &noises,
                          const std::vector<float> &rewards, const std::vector<std::vector<float>> &policies,
-                         const std::vector<std::vector<char*>> &mappings, const std::vector<int> &action_nums);
+                         const std::vector<std::vector<int>> &mappings, const std::vector<int> &action_nums);
             void prepare_no_noise(const std::vector<float> &rewards, const std::vector<std::vector<float>> &policies,
-                                  const std::vector<std::vector<char*>> &mappings, const std::vector<int> &action_nums);
+                                  const std::vector<std::vector<int>> &mappings, const std::vector<int> &action_nums);
             std::vector<std::vector<int>> get_distributions();
             std::vector<float> get_values();
+            void prepare_gumbel(const std::vector<std::vector<float>> &gumbels,
+                                const std::vector<std::vector<int>> &considered_visits,
+                                const std::vector<float> &network_values, float c_visit, float c_scale);
+            std::vector<float> gumbel_scores(int index, float discount, bool with_gumbel);
+            int gumbel_select(int index, int visits, float discount);
+            std::vector<int> get_gumbel_actions(float discount);
+            std::vector<std::vector<float>> get_gumbel_policies(float discount);
+            std::vector<std::vector<int>> reuse(CRoots *previous, const std::vector<int> &previous_actions,
+                                                int hidden_state_offset, int hidden_state_end, float discount,
+                                                tools::CMinMaxStatsList *min_max_stats_lst);
 
     };
 
@@ -64,7 +82,7 @@ namespace tree {
         public:
             int num;
             std::vector<int> hidden_state_index_x_lst, hidden_state_index_y_lst, search_lens;
-            std::vector<std::vector<int>> last_actions;
+            std::vector<int> last_actions;
             std::vector<CNode*> nodes;
             std::vector<std::vector<CNode*>> search_paths;
 
@@ -75,19 +93,33 @@ namespace tree {
     };
 
 
+    // The model of cbatch_search. Gets the hidden_state_index_x that the new states get, the hidden state index
+    // (x, y) of the parent of every leaf and the action id that leads to the leaf. Fills the reward, the value and
+    // all policy heads one after the other of every leaf. Returns 0, or -1 if the model failed.
+    typedef int (*cmodel_callback)(void *model, int hidden_state_index_x, const int *index_x, const int *index_y,
+                                   const int *last_actions, float *rewards, float *values, float *policy_logits);
+
     //*********************************************************
-    std::vector<int> decode_action(std::string& action);
+    void ccopy_node(std::vector<CNode> &pool, int index, CNode *old_node, int hidden_state_index_x,
+                    std::vector<std::vector<int>> &reused_states, std::deque<std::pair<int, CNode*>> &queue);
     void cback_propagate(std::vector<CNode*> &search_path, tools::CMinMaxStats &min_max_stats, float value,
                          float discount);
     void cbatch_back_propagate(int hidden_state_index_x, float discount, const std::vector<float> &rewards,
                                const std::vector<float> &values, const std::vector<std::vector<float>> &policy,
                                tools::CMinMaxStatsList *min_max_stats_lst, CSearchResults &results,
-                               std::vector<std::vector<char*>> &mappings, const std::vector<int> &action_nums);
+                               std::vector<std::vector<int>> &mappings, const std::vector<int> &action_nums);
     int cselect_child(CNode* root, tools::CMinMaxStats &min_max_stats, int pb_c_base, float pb_c_init, float discount);
     float cucb_score(CNode *child, tools::CMinMaxStats &min_max_stats, float total_children_visit_counts,
                      float pb_c_base, float pb_c_init, float discount);
     void cbatch_traverse(CRoots *roots, int pb_c_base, float pb_c_init, float discount,
                          tools::CMinMaxStatsList *min_max_stats_lst, CSearchResults &results);
+    void csample_policy(const float *policy_logits, const std::vector<int> &head_offsets,
+                        const std::vector<int> &action_offsets, int num_samples, std::mt19937 &rng,
+                        std::vector<float> &policy, std::vector<int> &mappings);
+    int cbatch_search(CRoots *roots, int num_simulations, int pb_c_base, float pb_c_init, float discount,
+                      tools::CMinMaxStatsList *min_max_stats_lst, const std::vector<int> &head_sizes,
+                      const std::vector<int> &action_offsets, int num_samples, unsigned int seed,
+                      cmodel_callback model_callback, void *model, float &search_depth);
 }
 
 #endif
\ No newline at end of file
@@ -34,10 +34,10 @@ cdef extern from "cnode.h" namespace "tree":
         float reward, prior, value_sum
         vector[int] children_index
         vector[CNode]* ptr_node_pool
-        vector[char*] mappings
+        vector[int] mappings
 
         void expand(int hidden_state_index_x, int hidden_state_index_y, float reward,
-                    vector[float] policy_logits, vector[char*] mappings, int act_num)
+                    vector[float] policy_logits, vector[int] mappings, int act_num)
         void add_exploration_noise(float exploration_fraction, vector[float] noises)
 
         int expanded()
@@ -55,23 +55,36 @@ cdef extern from "cnode.h" namespace "tree":
 
         void prepare(float root_exploration_fraction, const vector[vector[float]] &noises,
                      const vector[float] &rewards, const vector[vector[float]] &policies,
-                     vector[vector[char*]] mappings, vector[int] action_nums)
+                     vector[vector[int]] mappings, vector[int] action_nums)
         void prepare_no_noise(const vector[float] &rewards, const vector[vector[float]] &policies,
-                              vector[vector[char*]] mappings, vector[int] action_nums)
+                              vector[vector[int]] mappings, vector[int] action_nums)
         vector[vector[int]] get_distributions()
         vector[float] get_values()
+        void prepare_gumbel(const vector[vector[float]] &gumbels, const vector[vector[int]] &considered_visits,
+                            const vector[float] &network_values, float c_visit, float c_scale)
+        vector[int] get_gumbel_actions(float discount)
+        vector[vector[float]] get_gumbel_policies(float discount)
+        vector[vector[int]] reuse(CRoots *previous, vector[int] previous_actions, int hidden_state_offset,
+                                  int hidden_state_end, float discount, CMinMaxStatsList *min_max_stats_lst)
 
     cdef cppclass CSearchResults:
         CSearchResults() except +
         CSearchResults(int num) except +
         int num
         vector[int] hidden_state_index_x_lst, hidden_state_index_y_lst, search_lens
-        vector[vector[int]] last_actions
+        vector[int] last_actions
         vector[CNode*] nodes
 
+    ctypedef int (*cmodel_callback)(void *model, int hidden_state_index_x, const int *index_x, const int *index_y,
+                                    const int *last_actions, float *rewards, float *values, float *policy_logits)
+
     cdef void cback_propagate(vector[CNode*] &search_path, CMinMaxStats &min_max_stats, float value, float discount)
     void cbatch_back_propagate(int hidden_state_index_x, float discount, vector[float] rewards,
                                vector[float] values, vector[vector[float]] policy, CMinMaxStatsList *min_max_stats_lst,
-                               CSearchResults &results, vector[vector[char*]] mappings, vector[int] action_nums)
+                               CSearchResults &results, vector[vector[int]] mappings, vector[int] action_nums)
     void cbatch_traverse(CRoots *roots, int pb_c_base, float pb_c_init, float discount,
                          CMinMaxStatsList *min_max_stats_lst, CSearchResults &results)
+    int cbatch_search(CRoots *roots, int num_simulations, int pb_c_base, float pb_c_init, float discount,
+                      CMinMaxStatsList *min_max_stats_lst, vector[int] head_sizes, vector[int] action_offsets,
+                      int num_samples, unsigned int seed, cmodel_callback model_callback, void *model,
+                      float &search_depth) nogil
@@ -1,7 +1,8 @@
 # distutils: language=c++
 import ctypes
 cimport cython
-from ctree cimport CMinMaxStatsList, CNode, CRoots, CSearchResults, cbatch_back_propagate, cbatch_traverse
+from ctree cimport CMinMaxStatsList, CNode, CRoots, CSearchResults, cbatch_back_propagate, cbatch_traverse, \
+    cbatch_search
 from libcpp.vector cimport vector
 from libc.stdlib cimport malloc, free
 from libcpp.list cimport list as cpplist
@@ -56,6 +57,20 @@ cdef class Roots:
     def prepare_no_noise(self, list reward_pool, list policy_logits_pool, list mappings, list action_nums):
         self.roots[0].prepare_no_noise(reward_pool, policy_logits_pool, mappings, action_nums)
 
+    def prepare_gumbel(self, list gumbels, list considered_visits, list network_values, float c_visit, float c_scale):
+        self.roots[0].prepare_gumbel(gumbels, considered_visits, network_values, c_visit, c_scale)
+
+    def get_gumbel_actions(self, float discount):
+        return self.roots[0].get_gumbel_actions(discount)
+
+    def get_gumbel_policies(self, float discount):
+        return self.roots[0].get_gumbel_policies(discount)
+
+    def reuse(self, Roots previous, list previous_actions, int hidden_state_offset, int hidden_state_end,
+              float discount, MinMaxStatsList min_max_stats_lst):
+        return self.roots[0].reuse(previous.roots, previous_actions, hidden_state_offset, hidden_state_end,
+                                   discount, min_max_stats_lst.cmin_max_stats_lst)
+
     def get_distributions(self):
         return self.roots[0].get_distributions()
 
@@ -103,3 +118,65 @@ def batch_traverse(Roots roots, int pb_c_base, float pb_c_init, float discount,
     cbatch_traverse(roots.roots, pb_c_base, pb_c_init, discount, min_max_stats_lst.cmin_max_stats_lst, results.cresults)
 
     return results.cresults.hidden_state_index_x_lst, results.cresults.hidden_state_index_y_lst, results.cresults.last_actions
+
+
+cdef class SearchModel:
+    cdef object model
+    cdef object error
+    cdef int num, policy_width
+
+    def __cinit__(self, model, int num, int policy_width):
+        self.model = model
+        self.error = None
+        self.num = num
+        self.policy_width = policy_width
+
+
+cdef float[:] as_float_buffer(value):
+    return np.ascontiguousarray(value, dtype=np.float32).reshape(-1)
+
+
+# Hands the leaves of a simulation of cbatch_search to the python model and copies what it returns into the buffers
+cdef int model_callback(void *model, int hidden_state_index_x, const int *index_x, const int *index_y,
+                        const int *last_actions, float *rewards, float *values, float *policy_logits) noexcept with gil:
+    cdef SearchModel search_model = <SearchModel> model
+    cdef int num = search_model.num
+    cdef float[:] reward_buffer = <float[:num]> rewards
+    cdef float[:] value_buffer = <float[:num]> values
+    cdef float[:] policy_buffer = <float[:num * search_model.policy_width]> policy_logits
+    try:
+        reward, value, policy = search_model.model(hidden_state_index_x,
+                                                   np.array(<int[:num]> <int *> index_x),
+                                                   np.array(<int[:num]> <int *> index_y),
+                                                   np.array(<int[:num]> <int *> last_actions))
+        reward_buffer[:] = as_float_buffer(reward)
+        value_buffer[:] = as_float_buffer(value)
+        policy_buffer[:] = as_float_buffer(policy)
+    except BaseException as error:
+        search_model.error = error
+        return -1
+    return 0
+
+
+def batch_search(Roots roots, int num_simulations, int pb_c_base, float pb_c_init, float discount,
+                 MinMaxStatsList min_max_stats_lst, list head_sizes, list action_offsets, int num_samples,
+                 unsigned int seed, model):
+    """
+    Runs every simulation of the search without coming back to python except for the model.
+    model(hidden_state_index_x, index_x, index_y, last_actions) gets the hidden state index of the parent of every
+    leaf and the action id that leads to it and returns (rewards [N], values [N], policy logits [N, sum of
+    head_sizes]) for the leaves. The states it makes get hidden_state_index_x.
+    Returns the mean search length of the last simulation.
+    """
+    cdef vector[int] chead_sizes = head_sizes
+    cdef vector[int] caction_offsets = action_offsets
+    cdef SearchModel search_model = SearchModel(model, roots.root_num, sum(head_sizes))
+    cdef float search_depth = 0
+    cdef int status
+    with nogil:
+        status = cbatch_search(roots.roots, num_simulations, pb_c_base, pb_c_init, discount,
+                               min_max_stats_lst.cmin_max_stats_lst, chead_sizes, caction_offsets, num_samples, seed,
+                               model_callback, <void *> search_model, search_depth)
+    if status != 0:
+        raise search_model.error
+    return search_depth